@@ -1,9 +1,9 @@
-import os, sys, logging
-from dotenv import load_dotenv
-load_dotenv()
+import sys, logging
+from typing import Optional, Tuple
 
 from ..tools import posting_tools
-from langchain_google_genai import ChatGoogleGenerativeAI
+from ..tools.tweet_text import TWEET_MAX_WEIGHT, URL_WEIGHT, compact_tweet, fits, truncate_tweet, tweet_length
+from ..utils.factories import env, get_llm
 
 
 # Posting Config
@@ -14,7 +14,11 @@ MODE = "score"
 
 # Model Config (LLM for crafting tweet text)
 MODEL_NAME = "gemini-2.5-flash"
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+# LLM drafts per post; a draft is only regenerated when local compaction cannot make it fit
+TWEET_MAX_ATTEMPTS = 3
+
+# Queued posts (new and retried) sent per run at most; see tools/post_queue.py
+X_POSTS_PER_RUN = 3
 
 
 logging.basicConfig(
@@ -29,7 +33,7 @@ def get_result(
     date=DATE,
     mode=MODE):
     """
-    Return a single best entry from fetch_filtered_items.
+    Return a single best entry (see posting_tools.select_top_k).
 
     Args:
         source: which source to use
@@ -42,29 +46,14 @@ def get_result(
     Falls back automatically if dates/scores are missing.
     """
 
-    payload = posting_tools.fetch_filtered_items(source, min_usefulness_score, date)
-    items = payload.get("results", [])
-    meta  = payload.get("meta", {})
+    payload = posting_tools.select_top_k(source, min_usefulness_score, date, mode, k=1)
+    items = payload["results"]
+    meta = payload["meta"]
 
     if not items:
-        return {"result": None,
-                "meta": {**meta, "selection_mode": "none", "error": "No results."}}
-
-    if mode == "date":
-        best = posting_tools._pick_best_by_date(items)
-        selection = "date"
-        if not best or posting_tools._parse_publish_date(best.get("publish_date")) is None:
-            best = posting_tools._pick_best_by_score(items)
-            selection = "score_fallback"
-    else:  # mode == "score"
-        best = posting_tools._pick_best_by_score(items)
-        selection = "score"
-        if not best or posting_tools._safe_int(best.get("usefulness_score")) < 0:
-            best = posting_tools._pick_best_by_date(items)
-            selection = "date_fallback"
-
-    return {"result": best,
-            "meta": {**meta, "selection_mode": selection}}
+        return {"result": None, "meta": {**meta, "error": "No results."}}
+
+    return {"result": items[0], "meta": meta}
 
 
 def craft_tweet_text(entry_data):
@@ -73,13 +62,12 @@ def craft_tweet_text(entry_data):
     if not entry:
         return None  # nothing to tweet
 
-    llm = ChatGoogleGenerativeAI(
-        model=MODEL_NAME,
-        temperature=0,
-        google_api_key=GOOGLE_API_KEY,
-    )
+    # imported here: metrics pulls in langchain_core / langgraph, which the posting path never needs otherwise
+    from ..utils.metrics import metrics_callbacks
 
-    prompt = f"""
+    llm = get_llm(MODEL_NAME)
+
+    base_prompt = f"""
     - Write a tweet that:
          * Briefly summarizes the methodology (1–2 short sentences or a crisp clause).
          * Includes the full URL (e.g., "https://...").
@@ -94,64 +82,96 @@ def craft_tweet_text(entry_data):
     {entry} 
     """
 
-    response = llm.invoke(prompt)
-    tweet_text = response.content.strip() if hasattr(response, "content") else str(response).strip()
+    prompt = base_prompt
+    tweet_text = None
+    for attempt in range(1, TWEET_MAX_ATTEMPTS + 1):
+        response = llm.invoke(prompt, config={"callbacks": metrics_callbacks("X")})
+        draft = response.content.strip() if hasattr(response, "content") else str(response).strip()
+        tweet_text = compact_tweet(draft)
+        if fits(tweet_text):
+            return tweet_text
+
+        length = tweet_length(tweet_text)
+        logging.info(f"Tweet draft {attempt}/{TWEET_MAX_ATTEMPTS} is {length}/{TWEET_MAX_WEIGHT} weighted characters after compaction.")
+        prompt = base_prompt + f"""
+    - Your previous draft below is {length} characters as X counts them (any URL counts as {URL_WEIGHT}).
+      Rewrite it to at most {TWEET_MAX_WEIGHT - 20} characters, keeping the URL and the hashtag:
+    {tweet_text}
+    """
+
+    # still too long after every attempt: cut the prose, keep the URL and hashtag
+    return truncate_tweet(tweet_text) if tweet_text else None
+
+
+def _posting_reason() -> str:
+    return (
+        f"The entry was posted with source: {SOURCE}, "
+        f"min usefulness score: {X_MIN_USEFULNESS}, date: {DATE}. "
+        f"Selection mode: {MODE}."
+    )
 
-    return tweet_text
+
+# Environment variables holding the X API credentials, in get_x_client's argument order
+X_CREDENTIAL_VARS = ("X_API_KEY", "X_API_KEY_SECRET", "X_ACCESS_TOKEN", "X_ACCESS_TOKEN_SECRET")
+
+
+def _credentials() -> Optional[Tuple[str, str, str, str]]:
+    """The X API credentials, or None (logged) when any of them is missing or empty."""
+    values = tuple(env(name) for name in X_CREDENTIAL_VARS)
+    missing = [name for name, value in zip(X_CREDENTIAL_VARS, values) if not value]
+    if missing:
+        logging.error(f"Credentials cannot be empty: {', '.join(missing)} not set; nothing drafted or posted.")
+        return None
+    return values
 
 
 def main():
+    from ..tools.post_queue import get_post_queue
+
     try:
-        entry_data = get_result()  
-        tweet_text = craft_tweet_text(entry_data)
+        # checked first: without them a drain would only fail, after an LLM call for the draft
+        credentials = _credentials()
+        if credentials is None:
+            return 1
 
-        if not tweet_text:
+        queue = get_post_queue()
+        entry_data = get_result()
+        entry = entry_data.get("result") if isinstance(entry_data, dict) else entry_data
+        url = (entry or {}).get("url")
+
+        if entry and not url:
+            logging.warning("Selected entry has no URL to deduplicate on; not queued.")
+        elif url and (queue.queued(url) or queue.ledger.get(url)):
+            # waiting for a retry or already out: keep the queued text instead of drafting a new one
+            logging.info(f"Selected entry already queued or posted, not drafted again: {url}")
+        elif url:
+            tweet_text = craft_tweet_text(entry_data)
+            if tweet_text:
+                status, item = queue.enqueue(url, tweet_text, _posting_reason())
+                if status == "too_long":
+                    logging.warning(f"Tweet is {item['length']}/{item['limit']} weighted characters; not queued: {url}")
+                else:
+                    logging.info(f"New entry {status}: {url}")
+
+        if not queue.pending():
             logging.info("No results to be tweeted.")
             return 0
-        try:
-            consumer_key = os.getenv("X_API_KEY")
-            consumer_secret = os.getenv("X_API_KEY_SECRET")
-            access_token = os.getenv("X_ACCESS_TOKEN")
-            access_token_secret = os.getenv("X_ACCESS_TOKEN_SECRET")
-        except RuntimeError as e:
-            logging.error(str(e))
-            return 1
 
-        status = posting_tools.post_to_X(
-            consumer_key=consumer_key,
-            consumer_secret=consumer_secret,
-            access_token=access_token,
-            access_token_secret=access_token_secret,
-            content=tweet_text,
-        )
-
-        if status.startswith("Successfully posted"):
-            entry = entry_data.get("result") if isinstance(entry_data, dict) else entry_data
-            url = (entry or {}).get("url")
-
-            source = globals().get("SOURCE", "N/A")
-            min_score = globals().get("X_MIN_USEFULNESS", "N/A")
-            cutoff_date = globals().get("DATE", "N/A")
-            mode = globals().get("MODE", "N/A")
-
-            posting_reason = (
-                f"The entry was posted with source: {source}, "
-                f"min usefulness score: {min_score}, date: {cutoff_date}. "
-                f"Selection mode: {mode}."
-            )
-            if url:
-                try:
-                    posting_tools.save_tweet(url=url, posting_reason=posting_reason)
-                    logging.info("Entry posted successfully and URL saved.")
-                except Exception as e:
-                    logging.warning(f"Entry posted, but failed to save URL: {e}")
-            else:
-                logging.warning("Entry posted, but no URL found to save.")
+        client = posting_tools.get_x_client(*credentials)
+        report = queue.drain(client, max_posts=X_POSTS_PER_RUN)
 
-            return 0
-        else:
-            logging.error(f"Posting failed: {status}")
+        for p in report["posted"]:
+            logging.info(f"Entry posted successfully and URL saved: {p['url']}")
+        for p in report["retrying"]:
+            logging.warning(f"Posting deferred (attempt {p['attempts']}), will retry: {p['url']}: {p['error']}")
+        for p in report["failed"]:
+            logging.error(f"Posting failed after {p['attempts']} attempt(s): {p['url']}: {p['error']}")
+        for p in report["halted"]:
+            logging.error(f"Posting stopped by a credential / client error (post kept in the queue): {p['url']}: {p['error']}")
+
+        if report["failed"] or report["halted"] or (report["retrying"] and not report["posted"]):
             return 1
+        return 0
 
     except Exception as e:
         logging.exception(f"Unhandled error in main: {e}")
@@ -1,81 +1,161 @@
-import os
-import yaml
-from datetime import datetime
-from functools import partial
-from dotenv import load_dotenv
-load_dotenv()
-
-from langchain_google_genai import ChatGoogleGenerativeAI
+import asyncio
+from datetime import datetime, timezone
+from functools import partial, lru_cache
+
 from langgraph.graph import StateGraph, START, END
-from langgraph.prebuilt import create_react_agent
 from langchain_core.messages import HumanMessage
 from langgraph.types import Command
 from langchain.tools import tool
 
-from ..tools.research_tools import ArxivTool, save_to_json
+from ..config import FIELD, FIELDS
+from ..tools.research_tools import ArxivWatermarks, harvest_arxiv, merge_arxiv_queries, save_to_json, save_many
+from ..tools.scoring_tools import field_topics, arxiv_candidates, score_and_save_fields, ascore_and_save_fields, paper_file_name
 from ..utils.utils import State, DebugHandler
+from ..utils.metrics import metrics_callbacks, timed_tool
+from ..utils.checkpoints import agent_checkpointer, invoke_agent, ainvoke_agent
+from ..utils.factories import get_llm, render_prompt, build_react_agent
 
 
 # Path to system prompt
 ARXIV_PROMPT_DIR = "./multi_agent/prompts/arxiv_node_prompt.yaml"
 
 # Prompt Config
-FIELD = "Spatio Temporal Point Process, Spatio Temporal, Point Process, Contextual dataset, Survey data"
 ARXIV_MAX_RESULTS = 10
 ARXIV_MIN_USEFULNESS = 60
+# Upper bound on papers fetched per query once a watermark exists
+ARXIV_HARVEST_LIMIT = 100
 
-# Time Frame used to get data
+# Time Frame used to get data; later runs only fetch papers newer than the per-query watermark
 START_DATE = "20250101000000"
-END_DATE = datetime.now().strftime("%Y%m%d%H%M%S")  # returns this moment
+# None: the moment each search runs (arXiv dates are UTC), so a long-lived process never searches a stale window
+END_DATE = None
 
 # Model Config
 MODEL_NAME = "gemini-2.5-flash"
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 NEXT_STATE = END
 
+# "batch": fetch candidates deterministically and score them in batches with structured output
+# "agent": let the ReAct agent query, score and save_to_json one entry at a time
+PIPELINE = "batch"
+
+# Instruction handed to the agent when the node is run
+TASK_MESSAGE = f"Search for relevant papers about {FIELD} on arxiv and then save the results as a json object based on the instructions you have."
+
+
+# Newest published stamp seen per query during this run; persisted once the node succeeds
+_pending_watermarks = {}
+
+
+def _end_date() -> str:
+    return END_DATE or datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+
+
+def _harvest(query: str, first_run_results: int = ARXIV_MAX_RESULTS) -> str:
+    output, newest = harvest_arxiv(query, FIELD, START_DATE, _end_date(), first_run_results, ARXIV_HARVEST_LIMIT)
+    if newest:
+        _pending_watermarks[query] = max(newest, _pending_watermarks.get(query, newest))
+    return output
+
 
 @tool("arxiv_tool")
 def arxiv_tool(query:str) -> str:
-    """arxiv results filtered based on year"""
-    return ArxivTool.func(f"{query} AND submittedDate: [{START_DATE} TO {END_DATE}]", max_results= ARXIV_MAX_RESULTS)
+    """arxiv results submitted since the last run for this query"""
+    return _harvest(query)
 
 
-INPUT_VAR = {
-    "field": FIELD,
-    "arxiv_min_usefulness": ARXIV_MIN_USEFULNESS
-}
+def _hold_watermark(query: str, unscored: int) -> None:
+    """
+    Keep the stored watermark of `query` where it was when some of its papers went
+    unscored (failed LLM batches): advancing it would mean they are never fetched
+    again. The next run fetches them once more; the score cache skips the rest.
+    """
+    if unscored and _pending_watermarks.pop(query, None):
+        print(f"arxiv: {unscored} candidates unscored, watermark not advanced for this run")
 
-with open(ARXIV_PROMPT_DIR, "r", encoding="utf-8") as f:
-        prompt_config = yaml.safe_load(f)
 
-ARXIV_SYSTEM_PROMPT = prompt_config["prompt"].format(**INPUT_VAR)
+def _commit_watermarks():
+    watermarks = ArxivWatermarks()
+    for query, stamp in _pending_watermarks.items():
+        watermarks.advance(FIELD, query, stamp)
+    watermarks.save()
+    _pending_watermarks.clear()
 
-llm = ChatGoogleGenerativeAI(
-                model=MODEL_NAME,
-                temperature=0,
-                google_api_key=GOOGLE_API_KEY
-        )
 
-arxiv_agent = create_react_agent(
-    llm,
-    tools=[arxiv_tool, save_to_json],
-    prompt=ARXIV_SYSTEM_PROMPT
-)
+def system_prompt() -> str:
+    return render_prompt(ARXIV_PROMPT_DIR, field=FIELD, arxiv_min_usefulness=ARXIV_MIN_USEFULNESS)
 
-def arxiv_node(state: State, next_state) -> Command:
-    result = arxiv_agent.invoke(
-        state,
-        config={"callbacks": [DebugHandler()], "run_name": "arxiv_agent"})
+
+@lru_cache(maxsize=None)
+def _build_agent(model_name: str, prompt: str, checkpointer=None):
+    return build_react_agent(model_name, [arxiv_tool, save_to_json, save_many], prompt, checkpointer)
+
+
+def get_agent():
+    """The ReAct agent, built on first use and reused while the model and prompt stay the same."""
+    return _build_agent(MODEL_NAME, system_prompt(), agent_checkpointer())
+
+
+def arxiv_batch(config=None) -> str:
+    """Fetch candidates once for all FIELDS, score them per field in batches and bulk-save the ones above a threshold."""
+    # one merged, deduplicated arXiv search covering every topic of every field
+    topics = field_topics(FIELDS)
+    query = merge_arxiv_queries([f'all:"{topic}"' for topic in topics])
+    with timed_tool("arxiv", "arxiv_tool"):
+        candidates = arxiv_candidates(_harvest(query, ARXIV_MAX_RESULTS * len(topics)))
+    report, unscored = score_and_save_fields(get_llm(MODEL_NAME), candidates, FIELDS, ARXIV_MIN_USEFULNESS,
+                                             paper_file_name, config=config, node="arxiv")
+    _hold_watermark(query, unscored)
+    return report
+
+
+async def aarxiv_batch(config=None) -> str:
+    """`arxiv_batch` with concurrent scoring; the arXiv client is sync-only, so the harvest runs in a thread."""
+    topics = field_topics(FIELDS)
+    query = merge_arxiv_queries([f'all:"{topic}"' for topic in topics])
+    with timed_tool("arxiv", "arxiv_tool"):
+        candidates = arxiv_candidates(await asyncio.to_thread(_harvest, query, ARXIV_MAX_RESULTS * len(topics)))
+    report, unscored = await ascore_and_save_fields(get_llm(MODEL_NAME), candidates, FIELDS, ARXIV_MIN_USEFULNESS,
+                                                    paper_file_name, config=config, node="arxiv")
+    _hold_watermark(query, unscored)
+    return report
+
+
+def _config(run_name: str) -> dict:
+    return {"callbacks": [DebugHandler(node="arxiv"), *metrics_callbacks("arxiv")], "run_name": run_name}
+
+
+def _command(content: str, next_state) -> Command:
     return Command(
         update={
             "messages": [
-                HumanMessage(content=result["messages"][-1].content, name="arxiv")
+                HumanMessage(content=content, name="arxiv")
             ]
         },
         goto=next_state
     )
 
 
+def arxiv_node(state: State, next_state) -> Command:
+    if PIPELINE == "batch":
+        content = arxiv_batch(config=_config("arxiv_scoring"))
+    else:
+        result = invoke_agent(get_agent(), state, node="arxiv", config=_config("arxiv_agent"))
+        content = result["messages"][-1].content
+    _commit_watermarks()
+    return _command(content, next_state)
+
+
+async def aarxiv_node(state: State, next_state) -> Command:
+    """`arxiv_node` on the event loop (used by `multi_agent.main --async`)."""
+    if PIPELINE == "batch":
+        content = await aarxiv_batch(config=_config("arxiv_scoring"))
+    else:
+        result = await ainvoke_agent(get_agent(), state, node="arxiv", config=_config("arxiv_agent"))
+        content = result["messages"][-1].content
+    await asyncio.to_thread(_commit_watermarks)
+    return _command(content, next_state)
+
+
 def arxiv_main(next_state):
 
     research_builder = StateGraph(State)
@@ -87,7 +167,7 @@ def arxiv_main(next_state):
     for s in research_graph.stream(
         {
             "messages": [
-                ("user", f"Search for relevant papers about {FIELD} on arxiv and then save the results as a json object based on the instructions you have.")
+                ("user", TASK_MESSAGE)
             ],
         },
         {"recursion_limit": 150},
@@ -1,26 +1,26 @@
-import os
-import yaml
-from functools import partial
+from functools import partial, lru_cache
 from datetime import date
-from dotenv import load_dotenv
-load_dotenv()
 
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph import StateGraph, START, END
-from langgraph.prebuilt import create_react_agent
 from langchain_core.messages import HumanMessage
 from langgraph.types import Command
-from langchain.tools import tool
+from langchain_core.tools import StructuredTool
 
-from ..tools.research_tools import tavily_tool, save_to_json
+from ..config import FIELD, FIELDS
+from ..tools.research_tools import (
+    tavily_tool, atavily_search, tavily_search_many, atavily_search_many, save_to_json, save_many,
+)
+from ..tools.scoring_tools import field_topics, blog_candidates, score_and_save_fields, ascore_and_save_fields, blog_file_name
 from ..utils.utils import State, DebugHandler
+from ..utils.metrics import metrics_callbacks, timed_tool
+from ..utils.checkpoints import agent_checkpointer, invoke_agent, ainvoke_agent
+from ..utils.factories import env, get_llm, render_prompt, build_react_agent
 
 
 
 # Path to system prompt
 BLOG_PROMPT_DIR = "./multi_agent/prompts/blog_node_prompt.yaml"
 
-FIELD = "Spatio Temporal Point Process, Spatio Temporal, Point Process, Contextual dataset, Survey data"
 BLOG_MAX_RESULTS = 10
 BLOG_MIN_USEFULNESS = 60
 
@@ -32,56 +32,109 @@ DOMAINS_INCLUDED = [
 ]
 
 START_DATE = "2025-01-01"
-END_DATE = date.today().strftime("%Y-%m-%d")
-
-TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
+# None: the day each search runs
+END_DATE = None
 
 # Model Config
 MODEL_NAME = "gemini-2.5-flash"
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 NEXT_STATE = END
 
+# "batch": fetch candidates deterministically and score them in batches with structured output
+# "agent": let the ReAct agent query, score and save_to_json one entry at a time
+PIPELINE = "batch"
 
-@tool("blog_search")
-def blog_search(query):
-     """search web using tavily tool"""
-     return tavily_tool.func(query, TAVILY_API_KEY, DOMAINS_INCLUDED, START_DATE, END_DATE, BLOG_MAX_RESULTS)
+# Instruction handed to the agent when the node is run
+TASK_MESSAGE = f"Search for relevant blog posts about {FIELD} on the websites and then save the results as a json object based on the instructions you have."
 
-INPUT_VAR = {
-    "field": FIELD,
-    "blog_min_usefulness": BLOG_MIN_USEFULNESS
-}
 
-with open(BLOG_PROMPT_DIR, "r", encoding="utf-8") as f:
-        prompt_config = yaml.safe_load(f)
+def _end_date() -> str:
+    return END_DATE or date.today().strftime("%Y-%m-%d")
 
-BLOG_SYSTEM_PROMPT = prompt_config["prompt"].format(**INPUT_VAR)
 
-llm = ChatGoogleGenerativeAI(
-                model=MODEL_NAME,
-                temperature=0,
-                google_api_key=GOOGLE_API_KEY
-        )
+def _blog_search(query):
+     return tavily_tool.func(query, env("TAVILY_API_KEY"), DOMAINS_INCLUDED, START_DATE, _end_date(), BLOG_MAX_RESULTS)
 
-blog_agent = create_react_agent(
-    llm,
-    tools=[blog_search, save_to_json],
-    prompt=BLOG_SYSTEM_PROMPT
-)
 
-def blog_node(state: State, next_state) -> Command:
-    result = blog_agent.invoke(
-        state,
-        config={"callbacks": [DebugHandler()], "run_name": "blog_agent"})
+async def _ablog_search(query):
+     return await atavily_search(query, env("TAVILY_API_KEY"), DOMAINS_INCLUDED, START_DATE, _end_date(), BLOG_MAX_RESULTS)
+
+
+# sync for the threaded graph, awaited over aiohttp when the agent runs on the event loop
+blog_search = StructuredTool.from_function(
+    func=_blog_search, coroutine=_ablog_search, name="blog_search", description="search web using tavily tool")
+
+def system_prompt() -> str:
+    return render_prompt(BLOG_PROMPT_DIR, field=FIELD, blog_min_usefulness=BLOG_MIN_USEFULNESS)
+
+
+@lru_cache(maxsize=None)
+def _build_agent(model_name: str, prompt: str, checkpointer=None):
+    return build_react_agent(model_name, [blog_search, save_to_json, save_many], prompt, checkpointer)
+
+
+def get_agent():
+    """The ReAct agent, built on first use and reused while the model and prompt stay the same."""
+    return _build_agent(MODEL_NAME, system_prompt(), agent_checkpointer())
+
+
+def blog_batch(config=None) -> str:
+    """Fetch candidates once for all FIELDS, score them per field in batches and bulk-save the ones above a threshold."""
+    with timed_tool("blog", "blog_search"):
+        found = tavily_search_many(field_topics(FIELDS), env("TAVILY_API_KEY"), DOMAINS_INCLUDED, START_DATE, _end_date(), BLOG_MAX_RESULTS)
+    for err in found["errors"]:
+        print(f"blog_search failed for '{err['query']}': {err['error']}")
+    candidates = blog_candidates(found)
+    report, _ = score_and_save_fields(get_llm(MODEL_NAME), candidates, FIELDS, BLOG_MIN_USEFULNESS,
+                                      blog_file_name, config=config, node="blog")
+    return report
+
+
+async def ablog_batch(config=None) -> str:
+    """`blog_batch` with the Tavily queries and scoring batches awaited concurrently."""
+    with timed_tool("blog", "blog_search"):
+        found = await atavily_search_many(field_topics(FIELDS), env("TAVILY_API_KEY"), DOMAINS_INCLUDED, START_DATE, _end_date(), BLOG_MAX_RESULTS)
+    for err in found["errors"]:
+        print(f"blog_search failed for '{err['query']}': {err['error']}")
+    candidates = blog_candidates(found)
+    report, _ = await ascore_and_save_fields(get_llm(MODEL_NAME), candidates, FIELDS, BLOG_MIN_USEFULNESS,
+                                             blog_file_name, config=config, node="blog")
+    return report
+
+
+def _config(run_name: str) -> dict:
+    return {"callbacks": [DebugHandler(node="blog"), *metrics_callbacks("blog")], "run_name": run_name}
+
+
+def _command(content: str, next_state) -> Command:
     return Command(
         update={
             "messages": [
-                HumanMessage(content=result["messages"][-1].content, name="blog")
+                HumanMessage(content=content, name="blog")
             ]
         },
         goto=next_state
     )
 
+
+def blog_node(state: State, next_state) -> Command:
+    if PIPELINE == "batch":
+        content = blog_batch(config=_config("blog_scoring"))
+    else:
+        result = invoke_agent(get_agent(), state, node="blog", config=_config("blog_agent"))
+        content = result["messages"][-1].content
+    return _command(content, next_state)
+
+
+async def ablog_node(state: State, next_state) -> Command:
+    """`blog_node` on the event loop (used by `multi_agent.main --async`)."""
+    if PIPELINE == "batch":
+        content = await ablog_batch(config=_config("blog_scoring"))
+    else:
+        result = await ainvoke_agent(get_agent(), state, node="blog", config=_config("blog_agent"))
+        content = result["messages"][-1].content
+    return _command(content, next_state)
+
+
 def blog_main(next_state):
 
     research_builder = StateGraph(State)
@@ -93,7 +146,7 @@ def blog_main(next_state):
     for s in research_graph.stream(
         {
             "messages": [
-                ("user", f"Search for relevant blog posts about {FIELD} on the websites and then save the results as a json object based on the instructions you have.")
+                ("user", TASK_MESSAGE)
             ],
         },
         {"recursion_limit": 150},
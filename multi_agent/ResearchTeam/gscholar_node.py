@@ -1,76 +1,116 @@
-import os
-import yaml
-from functools import partial
-from dotenv import load_dotenv
-load_dotenv()
+import asyncio
+from functools import partial, lru_cache
 
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph import StateGraph, START, END
-from langgraph.prebuilt import create_react_agent
 from langchain_core.messages import HumanMessage
 from langgraph.types import Command
 from langchain.tools import tool
 
-from ..tools.research_tools import get_scholar_papers, save_to_json
+from ..config import FIELD, FIELDS
+from ..tools.research_tools import get_scholar_papers, save_to_json, save_many
+from ..tools.scoring_tools import gscholar_candidates, score_and_save_fields, ascore_and_save_fields, paper_file_name
 from ..utils.utils import State, DebugHandler
+from ..utils.metrics import metrics_callbacks, timed_tool
+from ..utils.checkpoints import agent_checkpointer, invoke_agent, ainvoke_agent
+from ..utils.factories import env, get_llm, render_prompt, build_react_agent
 
 
 # Path to system prompt
 GSCHOLAR_PROMPT_DIR = "./multi_agent/prompts/gscholar_node_prompt.yaml"
 
 # Prompt Config
-FIELD = "Spatio Temporal Point Process, Spatio Temporal, Point Process, Contextual dataset, Survey data"
 GSCHOLAR_MAX_RESULTS = 6
 GSCHOLAR_MIN_USEFULNESS = 60
 AUTHOR_IDS = ["Wnxq0mgAAAAJ", "WoqSEpYAAAAJ"]
 
-# Tavily Config
-SERP_API_KEY = os.getenv("SERP_API_KEY")
-
 # Model Config
 MODEL_NAME = "gemini-2.5-flash"
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 NEXT_STATE = END
 
+# "batch": fetch candidates deterministically and score them in batches with structured output
+# "agent": let the ReAct agent query, score and save_to_json one entry at a time
+PIPELINE = "batch"
+
+# Instruction handed to the agent when the node is run
+TASK_MESSAGE = f"Search for relevant papers about {FIELD} on the given google scholar pages and then save the results as a json object based on the instructions you have."
+
+
+def system_prompt() -> str:
+    return render_prompt(
+        GSCHOLAR_PROMPT_DIR,
+        field=FIELD,
+        author_ids_list=AUTHOR_IDS,
+        scholar_max_results=GSCHOLAR_MAX_RESULTS,
+        scholar_min_usefulness=GSCHOLAR_MIN_USEFULNESS,
+        serp_api_key=env("SERP_API_KEY"),
+    )
 
-INPUT_VAR = {
-    "field": FIELD, 
-    "author_ids_list": AUTHOR_IDS,
-    "scholar_max_results": GSCHOLAR_MAX_RESULTS,
-    "scholar_min_usefulness": GSCHOLAR_MIN_USEFULNESS,
-    "serp_api_key": SERP_API_KEY
-}
 
-with open(GSCHOLAR_PROMPT_DIR, "r", encoding="utf-8") as f:
-        prompt_config = yaml.safe_load(f)
+@lru_cache(maxsize=None)
+def _build_agent(model_name: str, prompt: str, checkpointer=None):
+    return build_react_agent(model_name, [get_scholar_papers, save_to_json, save_many], prompt, checkpointer)
 
-GSCHOLAR_SYSTEM_PROMPT = prompt_config["prompt"].format(**INPUT_VAR)
 
-llm = ChatGoogleGenerativeAI(
-                model=MODEL_NAME,
-                temperature=0,
-                google_api_key=GOOGLE_API_KEY
+def get_agent():
+    """The ReAct agent, built on first use and reused while the model and prompt stay the same."""
+    return _build_agent(MODEL_NAME, system_prompt(), agent_checkpointer())
+
+
+def gscholar_batch(config=None) -> str:
+    """Fetch candidates once for all FIELDS, score them per field in batches and bulk-save the ones above a threshold."""
+    with timed_tool("gscholar", "get_scholar_papers"):
+        candidates = gscholar_candidates(
+            get_scholar_papers.func(AUTHOR_IDS, GSCHOLAR_MAX_RESULTS, env("SERP_API_KEY"))
         )
+    report, _ = score_and_save_fields(get_llm(MODEL_NAME), candidates, FIELDS, GSCHOLAR_MIN_USEFULNESS,
+                                      paper_file_name, config=config, node="gscholar")
+    return report
 
-gscholar_agent = create_react_agent(
-    llm,
-    tools=[get_scholar_papers, save_to_json],
-    prompt=GSCHOLAR_SYSTEM_PROMPT
-)
 
-def gscholar_node(state: State, next_state) -> Command:
-    result = gscholar_agent.invoke(
-        state,
-        config={"callbacks": [DebugHandler()], "run_name": "gscholar_agent"})
+async def agscholar_batch(config=None) -> str:
+    """`gscholar_batch` with concurrent scoring; SerpAPI is called through a sync client, so the fetch runs in a thread."""
+    with timed_tool("gscholar", "get_scholar_papers"):
+        papers = await asyncio.to_thread(get_scholar_papers.func, AUTHOR_IDS, GSCHOLAR_MAX_RESULTS, env("SERP_API_KEY"))
+    candidates = gscholar_candidates(papers)
+    report, _ = await ascore_and_save_fields(get_llm(MODEL_NAME), candidates, FIELDS, GSCHOLAR_MIN_USEFULNESS,
+                                             paper_file_name, config=config, node="gscholar")
+    return report
+
+
+def _config(run_name: str) -> dict:
+    return {"callbacks": [DebugHandler(node="gscholar"), *metrics_callbacks("gscholar")], "run_name": run_name}
+
+
+def _command(content: str, next_state) -> Command:
     return Command(
         update={
             "messages": [
-                HumanMessage(content=result["messages"][-1].content, name="gscholar")
+                HumanMessage(content=content, name="gscholar")
             ]
         },
         goto=next_state
     )
 
+
+def gscholar_node(state: State, next_state) -> Command:
+    if PIPELINE == "batch":
+        content = gscholar_batch(config=_config("gscholar_scoring"))
+    else:
+        result = invoke_agent(get_agent(), state, node="gscholar", config=_config("gscholar_agent"))
+        content = result["messages"][-1].content
+    return _command(content, next_state)
+
+
+async def agscholar_node(state: State, next_state) -> Command:
+    """`gscholar_node` on the event loop (used by `multi_agent.main --async`)."""
+    if PIPELINE == "batch":
+        content = await agscholar_batch(config=_config("gscholar_scoring"))
+    else:
+        result = await ainvoke_agent(get_agent(), state, node="gscholar", config=_config("gscholar_agent"))
+        content = result["messages"][-1].content
+    return _command(content, next_state)
+
+
 def gscholar_main(next_state):
 
     research_builder = StateGraph(State)
@@ -82,7 +122,7 @@ def gscholar_main(next_state):
     for s in research_graph.stream(
         {
             "messages": [
-                ("user", f"Search for relevant papers about {FIELD} on the given google scholar pages and then save the results as a json object based on the instructions you have.")
+                ("user", TASK_MESSAGE)
             ],
         },
         {"recursion_limit": 150},
@@ -0,0 +1,81 @@
+"""
+Benchmark: publish_date parsing over the saved/ corpus.
+
+    python -m multi_agent.benchmarks.dates_bench --passes 50
+
+Times the strptime-cascade parser the posting path used to run per item against
+`dates.parse_date` (cold and memoized), and `entry_date` on entries that carry the
+"publish_date_iso" stored at save time. Also checks both parsers agree on every
+date in the corpus.
+"""
+import json
+import time
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+from ..tools.posting_tools import SAVE_DIR
+from ..utils.dates import parse_date, entry_date, to_iso, _parse
+
+
+def _old_parse_publish_date(d):
+    """posting_tools._parse_publish_date before utils/dates.py."""
+    if not d or (isinstance(d, str) and d.strip().lower() == "unknown"):
+        return None
+    s = str(d).strip()
+    for f in ["%Y-%m-%d", "%d-%m-%Y", "%Y/%m/%d", "%d/%m/%Y", "%d.%m.%Y", "%Y.%m.%d"]:
+        try:
+            return datetime.strptime(s, f).date()
+        except Exception:
+            pass
+    try:
+        return datetime.fromisoformat(s).date()
+    except Exception:
+        return None
+
+
+def _time(fn, values, passes):
+    t0 = time.perf_counter()
+    for _ in range(passes):
+        for v in values:
+            fn(v)
+    return time.perf_counter() - t0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save-dir", default=str(SAVE_DIR))
+    parser.add_argument("--passes", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    entries = []
+    for path in Path(args.save_dir).glob("*.json"):
+        try:
+            obj = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            continue
+        if isinstance(obj, dict) and "publish_date" in obj:
+            entries.append(obj)
+    values = [e.get("publish_date") for e in entries]
+    stamped = [{**e, "publish_date_iso": to_iso(e.get("publish_date"))} for e in entries]
+
+    mismatches = [v for v in values if _old_parse_publish_date(v) != parse_date(v)]
+    print(f"{len(values)} publish_date values, {len(set(map(str, values)))} distinct, "
+          f"{len(mismatches)} parsed differently {sorted(set(map(str, mismatches)))[:5]}")
+
+    per = len(values) * args.passes
+    _parse.cache_clear()
+    cold = _time(parse_date, values, 1)
+    rows = [
+        ("strptime cascade (old)", _time(_old_parse_publish_date, values, args.passes)),
+        ("parse_date (memoized)", _time(parse_date, values, args.passes)),
+        ("entry_date (publish_date_iso)", _time(entry_date, stamped, args.passes)),
+    ]
+    print(f"{'parse_date (cold, 1 pass)':<32} {cold / len(values) * 1e6:8.2f} us/value")
+    for name, elapsed in rows:
+        print(f"{name:<32} {elapsed / per * 1e6:8.2f} us/value")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,123 @@
+"""
+Benchmark: URL identity normalization, as run on every item of every filter/dedupe pass.
+
+    python -m multi_agent.benchmarks.identity_bench --passes 20
+
+Takes the URLs of the saved/ corpus (or a built-in sample when it is empty),
+plus abs/pdf/versioned/DOI-page/tracking variants of each, and times
+`canonical_url` without its memo, with a cold memo and with a warm one, against
+the two normalizers it replaced. Also reports how many distinct works each one
+sees.
+"""
+import re
+import json
+import time
+import argparse
+from pathlib import Path
+
+from ..tools.posting_tools import SAVE_DIR
+from ..utils.identity import canonical_url, extract_doi
+
+
+# Used when --save-dir holds no saved entries
+SAMPLE_URLS = [
+    "https://arxiv.org/abs/2508.15665v2",
+    "http://arxiv.org/abs/2401.01234",
+    "https://doi.org/10.1371/journal.pone.0331139",
+    "https://www.frontiersin.org/articles/10.3389/fpsyg.2020.01234/full",
+    "https://journals.plos.org/plosone/article?id=10.1371/journal.pone.0331139",
+    "https://scholar.google.com/citations?view_op=view_citation&citation_for_view=Wnxq0mgAAAAJ:u5HHmVD_uO8C",
+    "https://medium.com/@someone/intro-to-point-processes-1a2b3c",
+    "https://www.example.co/p/post/?id=3",
+]
+
+
+_OLD_ABS_RE = re.compile(r"https?://(?:www\.)?arxiv\.org/abs/([^?#]+)", re.IGNORECASE)
+_OLD_VERSION_RE = re.compile(r"^(?P<id>\d{4}\.\d{4,5})(?:v\d+)?$", re.IGNORECASE)
+
+
+def _old_posting_normalize(url: str) -> str:
+    """posting_tools._normalize_url before the identity module."""
+    if not url:
+        return ""
+    u = url.strip().lower().replace("https://", "http://", 1)
+    m = _OLD_ABS_RE.match(u)
+    if m:
+        m2 = _OLD_VERSION_RE.match(m.group(1))
+        return f"arxiv:{m2.group('id')}" if m2 else f"arxiv:{m.group(1)}"
+    return u
+
+
+def _old_utils_normalize(url: str) -> str:
+    """utils.normalize_url before the identity module."""
+    match = re.search(r"(\d{4}\.\d{4,5})(v\d)?", url)
+    return match.group(1) if match else url
+
+
+def _corpus_urls(save_dir: Path) -> list:
+    urls = []
+    for path in save_dir.glob("*.json"):
+        try:
+            obj = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            continue
+        if isinstance(obj, dict) and obj.get("url"):
+            urls.append(str(obj["url"]))
+    return urls
+
+
+def _variants(url: str) -> list:
+    out = [url, url.replace("http://", "https://"), url + ("&" if "?" in url else "?") + "utm_source=x"]
+    if "arxiv.org/abs/" in url:
+        out.append(url.replace("/abs/", "/pdf/") + ".pdf")
+        out.append(re.sub(r"v\d+$", "", url) + "v9")
+    doi = extract_doi(url)
+    if doi:
+        out.append(f"https://doi.org/{doi}")
+        out.append(f"https://onlinelibrary.wiley.com/doi/{doi}/full")
+    return out
+
+
+def _time(fn, urls, passes):
+    t0 = time.perf_counter()
+    for _ in range(passes):
+        for u in urls:
+            fn(u)
+    return time.perf_counter() - t0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save-dir", default=str(SAVE_DIR))
+    parser.add_argument("--passes", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    base = _corpus_urls(Path(args.save_dir))
+    source = "corpus"
+    if not base:
+        base, source = SAMPLE_URLS, "sample"
+    urls = [v for u in base for v in _variants(u)]
+    print(f"{len(base)} {source} URLs, {len(urls)} with variants, {args.passes} passes")
+
+    uncached = _time(canonical_url.__wrapped__, urls, args.passes)
+    canonical_url.cache_clear()
+    cold = _time(canonical_url, urls, 1)
+    info = canonical_url.cache_info()
+    warm = _time(canonical_url, urls, args.passes)
+    rows = [
+        ("canonical_url (no memo)", uncached, canonical_url.__wrapped__),
+        ("posting_tools._normalize_url (old)", _time(_old_posting_normalize, urls, args.passes), _old_posting_normalize),
+        ("utils.normalize_url (old)", _time(_old_utils_normalize, urls, args.passes), _old_utils_normalize),
+        ("canonical_url (warm memo)", warm, canonical_url),
+    ]
+    per = len(urls) * args.passes
+    print(f"{'canonical_url (cold memo, 1 pass)':<38} {cold / len(urls) * 1e6:8.2f} us/url   "
+          f"{info.misses} misses / {info.hits} hits")
+    for name, elapsed, fn in rows:
+        distinct = len({fn(u) for u in urls})
+        print(f"{name:<38} {elapsed / per * 1e6:8.2f} us/url   {distinct} distinct keys")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
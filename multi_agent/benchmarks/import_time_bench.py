@@ -0,0 +1,108 @@
+"""
+Benchmark: cold-import cost of the node modules.
+
+    python -m multi_agent.benchmarks.import_time_bench --repeat 5
+    python -m multi_agent.benchmarks.import_time_bench --root /tmp/before --dummy-keys
+
+Every measurement is a fresh interpreter (`python -c "import ..."`) started in
+`--root`, so nothing is shared between runs. API keys are removed from the
+environment, which shows whether a module can be imported without them at all;
+pass --dummy-keys to set placeholders instead. To compare before/after, check
+out an older revision (`git worktree add /tmp/before <rev>`) and point --root
+at it.
+
+The exit status is 1 when a module fails to import or its median exceeds its
+budget (IMPORT_BUDGET_SECONDS, or --max-seconds for every module), so the
+bench can gate a change that brings an eager heavy import back.
+"""
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+
+MODULES = [
+    "multi_agent.ResearchTeam.arxiv_node",
+    "multi_agent.ResearchTeam.blog_node",
+    "multi_agent.ResearchTeam.gscholar_node",
+    "multi_agent.PostingTeam.X_node",
+    "multi_agent.main",
+]
+
+# Median cold-import budget per module, in seconds. The research nodes and main
+# pay for langgraph (~0.6s of their ~1.2s here); X_node must not: it imports no langchain,
+# langgraph or tweepy until it drafts or posts (~0.05s here).
+IMPORT_BUDGET_SECONDS = {
+    "multi_agent.ResearchTeam.arxiv_node": 2.0,
+    "multi_agent.ResearchTeam.blog_node": 2.0,
+    "multi_agent.ResearchTeam.gscholar_node": 2.0,
+    "multi_agent.PostingTeam.X_node": 0.25,
+    "multi_agent.main": 2.0,
+}
+
+API_KEYS = [
+    "GOOGLE_API_KEY", "TAVILY_API_KEY", "SERP_API_KEY",
+    "X_API_KEY", "X_API_KEY_SECRET", "X_ACCESS_TOKEN", "X_ACCESS_TOKEN_SECRET",
+]
+
+_SNIPPET = "import time; t0 = time.perf_counter(); import {module}; print(time.perf_counter() - t0)"
+
+
+def _import_once(module: str, root: Path, environ: dict):
+    proc = subprocess.run(
+        [sys.executable, "-c", _SNIPPET.format(module=module)],
+        cwd=root, env=environ, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        last = (proc.stderr.strip().splitlines() or ["failed"])[-1]
+        return None, last
+    return float(proc.stdout.strip().splitlines()[-1]), None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--root", default=".", help="repository checkout to import from")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--dummy-keys", action="store_true", help="set placeholder API keys instead of removing them")
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--max-seconds", type=float, default=None,
+                        help="fail when any median exceeds this (default: IMPORT_BUDGET_SECONDS per module)")
+    args = parser.parse_args(argv)
+
+    root = Path(args.root).resolve()
+    environ = {k: v for k, v in os.environ.items() if k not in API_KEYS}
+    if args.dummy_keys:
+        environ.update({k: "dummy" for k in API_KEYS})
+
+    print(f"{'module':<42} {'median s':>9} {'min s':>7} {'budget s':>9}")
+    failed = []
+    for module in args.modules:
+        timings = []
+        error = None
+        for _ in range(args.repeat):
+            elapsed, error = _import_once(module, root, environ)
+            if elapsed is None:
+                break
+            timings.append(elapsed)
+        if error:
+            print(f"{module:<42} {'FAILED':>9}  {error}")
+            failed.append(module)
+            continue
+        median = statistics.median(timings)
+        budget = args.max_seconds if args.max_seconds is not None else IMPORT_BUDGET_SECONDS.get(module)
+        over = budget is not None and median > budget
+        budget_col = f"{budget:.3f}" if budget is not None else "-"
+        print(f"{module:<42} {median:>9.3f} {min(timings):>7.3f} {budget_col:>9}{'  OVER BUDGET' if over else ''}")
+        if over:
+            failed.append(module)
+
+    if failed:
+        print(f"{len(failed)} module(s) failed to import or exceeded their budget: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
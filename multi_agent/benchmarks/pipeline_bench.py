@@ -0,0 +1,180 @@
+"""
+Benchmark: the whole workflow (multi_agent.main) replayed offline from a fixture.
+
+    python -m multi_agent.main --record fixtures/run1        # once, a real run
+    python -m multi_agent.benchmarks.pipeline_bench fixtures/run1 --runs 3 --latency-scale 0
+
+Every run starts from a scratch copy of the fixture's saved/ snapshot, serves
+all LLM / arXiv / Tavily / SerpAPI / X calls from its cassette (see
+utils/record_replay.py) and reports wall time, LLM calls, tool calls and bytes
+written per node. With the recorded latencies (--latency-scale 1) the wall time
+is comparable to the real run; with --latency-scale 0 it measures only the
+pipeline's own work. --async replays multi_agent.main's event-loop variant
+(arun_workflow) instead of the threaded one.
+
+Bytes written are the sizes of the files a run created or changed under saved/.
+Entry files are counted for the node that found them (arxiv / blog / gscholar
+by their source); everything else (score cache, ledger, queue, ...) is listed
+per file under "other".
+"""
+import io
+import os
+import json
+import time
+import asyncio
+import shutil
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+from contextlib import redirect_stdout
+from typing import Any, Dict
+
+from .. import main as workflow
+from ..tools.posting_tools import _entry_origin
+from ..utils.record_replay import FIXTURE_SAVED, Replayer
+
+
+PACKAGE_DIR = Path(workflow.__file__).resolve().parent
+
+
+def _file_state(save_dir: Path) -> Dict[str, tuple]:
+    return {
+        str(p.relative_to(save_dir)): (p.stat().st_size, p.stat().st_mtime_ns)
+        for p in save_dir.rglob("*") if p.is_file()
+    }
+
+
+def _bytes_written(save_dir: Path, before: Dict[str, tuple]) -> Dict[str, Any]:
+    per_node: Dict[str, int] = {}
+    other: Dict[str, int] = {}
+    for rel, state in _file_state(save_dir).items():
+        if before.get(rel) == state:
+            continue
+        size = state[0]
+        node = None
+        if "/" not in rel and rel.endswith(".json"):
+            try:
+                entry = json.loads((save_dir / rel).read_text(encoding="utf-8"))
+            except ValueError:
+                entry = None
+            if isinstance(entry, dict) and entry.get("url"):
+                node = _entry_origin(entry)
+        if node:
+            per_node[node] = per_node.get(node, 0) + size
+        else:
+            other[rel] = size
+    return {"nodes": per_node, "other": other, "total": sum(per_node.values()) + sum(other.values())}
+
+
+def run_once(fixture: Path, latency, latency_scale: float, strict: bool, keep: bool, verbose: bool,
+             use_async: bool = False) -> Dict[str, Any]:
+    scratch = Path(tempfile.mkdtemp(prefix="pipeline_bench_"))
+    shutil.copytree(fixture / FIXTURE_SAVED, scratch / "saved")
+    # prompts and the rest of the package are read through ./multi_agent
+    os.symlink(PACKAGE_DIR, scratch / "multi_agent", target_is_directory=True)
+    before = _file_state(scratch / "saved")
+
+    def run():
+        if use_async:
+            return asyncio.run(workflow.arun_workflow())
+        return workflow.run_workflow()
+
+    cwd = os.getcwd()
+    os.chdir(scratch)
+    try:
+        with Replayer(fixture, latency=latency, latency_scale=latency_scale, strict=strict) as replayer:
+            t0 = time.perf_counter()
+            if verbose:
+                summary = run()
+            else:
+                with redirect_stdout(io.StringIO()):
+                    summary = run()
+            wall = time.perf_counter() - t0
+        written = _bytes_written(scratch / "saved", before)
+    finally:
+        os.chdir(cwd)
+        if not keep:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    nodes = {
+        name: {
+            "seconds": m["seconds"],
+            "llm_calls": m["llm"]["count"],
+            "tool_calls": m["tool_calls"],
+            "input_tokens": m["tokens"]["input_tokens"],
+            "output_tokens": m["tokens"]["output_tokens"],
+            "errors": m["errors"],
+            "bytes_written": written["nodes"].get(name, 0),
+        }
+        for name, m in summary["nodes"].items()
+    }
+    return {
+        "wall_seconds": wall,
+        "nodes": nodes,
+        "totals": summary["totals"],
+        "bytes_written": written,
+        "replay": {k: dict(v) for k, v in replayer.stats.items()},
+        "scratch_dir": str(scratch) if keep else None,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixture", help="fixture directory written by `multi_agent.main --record`")
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiply recorded call durations")
+    parser.add_argument("--latency", type=float, default=None, help="fixed seconds per call instead of recorded")
+    parser.add_argument("--strict", action="store_true", help="fail calls with no recording for their exact key")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="replay the async workflow")
+    parser.add_argument("--keep", action="store_true", help="keep each run's scratch directory")
+    parser.add_argument("--verbose", action="store_true", help="show the workflow's own output")
+    parser.add_argument("--out", default=None, help="also write the report as JSON here")
+    args = parser.parse_args(argv)
+
+    fixture = Path(args.fixture).resolve()
+    if not (fixture / FIXTURE_SAVED).is_dir():
+        print(f"{args.fixture} is not a recorded fixture (no {FIXTURE_SAVED}/ snapshot).")
+        return 1
+
+    runs = []
+    for i in range(args.runs):
+        r = run_once(fixture, args.latency, args.latency_scale, args.strict, args.keep, args.verbose, args.use_async)
+        runs.append(r)
+        t = r["totals"]
+        print(f"run {i + 1}: {r['wall_seconds']:.2f}s wall, {t['llm_calls']} LLM calls, {t['tool_calls']} tool calls, "
+              f"{r['bytes_written']['total']} bytes written, {t['errors']} errors")
+
+    last = runs[-1]
+    print(f"\n{'node':<10} {'seconds':>8} {'LLM calls':>10} {'tokens in':>10} {'tokens out':>11} {'tool calls':>11} {'bytes':>9}")
+    for name, n in last["nodes"].items():
+        seconds = f"{n['seconds']:.2f}" if n["seconds"] is not None else "-"
+        print(f"{name:<10} {seconds:>8} {n['llm_calls']:>10} {n['input_tokens']:>10} {n['output_tokens']:>11} "
+              f"{n['tool_calls']:>11} {n['bytes_written']:>9}")
+    for rel, size in sorted(last["bytes_written"]["other"].items()):
+        print(f"{'other':<10} {rel:<54} {size:>9}")
+    for endpoint, s in sorted(last["replay"].items()):
+        print(f"replay {endpoint:<8} {s['served']} served ({s['fallbacks']} by fallback), {s['misses']} missing")
+
+    walls = [r["wall_seconds"] for r in runs]
+    report = {
+        "fixture": str(fixture),
+        "latency": args.latency,
+        "latency_scale": args.latency_scale,
+        "async": args.use_async,
+        "wall_seconds": {"median": statistics.median(walls), "min": min(walls), "max": max(walls)},
+        "runs": runs,
+    }
+    if len(runs) > 1:
+        print(f"\nwall time over {len(runs)} runs: median {report['wall_seconds']['median']:.2f}s "
+              f"(min {min(walls):.2f}s, max {max(walls):.2f}s)")
+
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Report written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,96 @@
+"""
+Benchmark: lexical pre-ranker against the LLM scores already in saved/.
+
+    python -m multi_agent.benchmarks.prerank_bench --cuts 0.25 0.5 --out saved/prerank_report.json
+
+Every saved entry carries the usefulness_score the LLM gave it, so the corpus is
+labeled data for the pre-ranker. For each cut this reports the share of entries
+that would still reach the LLM, the recall of entries the LLM scored at or above
+--min-usefulness (and >= 80), how many low-scored entries the cut would have
+caught, and the LLM scoring calls saved per 100 candidates of this mix
+(SCORING_BATCH_SIZE candidates per call). Also
+prints Spearman's rho between lexical and LLM scores and the ranking speed.
+
+The corpus only holds entries that were saved, i.e. mostly scored >= 60 by the
+LLM, so recall is well measured and the pruning of real misses is not.
+"""
+import json
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from ..tools.posting_tools import SAVE_DIR
+from ..tools.result_store import open_store
+from ..tools.scoring_tools import PRERANK_CUT, PRERANK_KEEP_TOP, SCORING_BATCH_SIZE
+from ..utils.prerank import PreRanker, candidate_text, spearman
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save-dir", default=str(SAVE_DIR))
+    parser.add_argument("--field", default=None, help="field string (default: FIELD in multi_agent/config.py)")
+    parser.add_argument("--cuts", type=float, nargs="+", default=[0.25, 0.5, 0.75])
+    parser.add_argument("--min-usefulness", type=int, default=60)
+    parser.add_argument("--out", default=None, help="also write the report as JSON here")
+    args = parser.parse_args(argv)
+
+    if args.field is None:
+        from ..config import FIELD
+        args.field = FIELD
+
+    with open_store(Path(args.save_dir)) as store:
+        entries = [e for e, _ in store.query() if isinstance(e.get("usefulness_score"), int)]
+    if not entries:
+        print(f"No scored entries in {args.save_dir}.")
+        return 1
+
+    ranker = PreRanker(args.field)
+    texts = [candidate_text(e) for e in entries]
+    t0 = time.perf_counter()
+    lexical = ranker.scores(texts)
+    elapsed = time.perf_counter() - t0
+    llm = np.array([e["usefulness_score"] for e in entries])
+    relevant, strong, low = llm >= args.min_usefulness, llm >= 80, llm < args.min_usefulness
+
+    report = {
+        "field": args.field,
+        "entries": len(entries),
+        "below_min_usefulness": int(low.sum()),
+        "spearman_rho": round(spearman(lexical, llm), 3),
+        "us_per_candidate": round(elapsed / len(entries) * 1e6, 2),
+        "cuts": [],
+    }
+    for cut in sorted(set(args.cuts) | {PRERANK_CUT}):
+        kept = lexical >= cut
+        report["cuts"].append({
+            "cut": cut,
+            "default": cut == PRERANK_CUT,
+            "sent_to_llm": round(float(kept.mean()), 3),
+            "recall_min_usefulness": round(float(kept[relevant].mean()), 3) if relevant.any() else None,
+            "recall_80_plus": round(float(kept[strong].mean()), 3) if strong.any() else None,
+            "low_scored_pruned": int((~kept & low).sum()),
+            "llm_calls_saved_per_100": round(100 * (1 - float(kept.mean())) / SCORING_BATCH_SIZE, 1),
+        })
+
+    print(f"{report['entries']} saved entries ({report['below_min_usefulness']} scored < {args.min_usefulness}), "
+          f"field: {args.field!r}")
+    print(f"Spearman rho (lexical vs LLM score): {report['spearman_rho']:.3f}; "
+          f"{report['us_per_candidate']:.1f} us/candidate")
+    print(f"{'cut':>6} {'to LLM':>8} {'recall>=' + str(args.min_usefulness):>11} {'recall>=80':>11} "
+          f"{'low pruned':>11} {'calls saved/100':>16}   (keep_top {PRERANK_KEEP_TOP} not applied)")
+    for r in report["cuts"]:
+        mark = " *" if r["default"] else ""
+        print(f"{r['cut']:>6.2f} {r['sent_to_llm']:>8.1%} {r['recall_min_usefulness']:>11.1%} {r['recall_80_plus']:>11.1%} "
+              f"{r['low_scored_pruned']:>5}/{report['below_min_usefulness']:<5} {r['llm_calls_saved_per_100']:>16.1f}{mark}")
+
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Report written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+"""
+Benchmark: scan-every-JSON-file read path vs. the SQLite result index.
+
+    python -m multi_agent.benchmarks.result_store_bench --sizes 10000 100000
+
+Generates N synthetic entries in a temporary directory (one JSON file each, like
+./saved) and times one `fetch_filtered_items`-style query per strategy.
+"""
+import json
+import time
+import random
+import argparse
+import tempfile
+from pathlib import Path
+from datetime import date, timedelta
+
+from ..tools.posting_tools import _entry_origin, _parse_publish_date, _safe_int, _load_json
+from ..tools.result_store import ResultStore
+
+
+DATE_FORMATS = ["%d-%m-%Y", "%Y-%m-%d", "%d/%m/%Y", "%Y/%m/%d"]
+ORIGINS = ["arxiv", "gscholar", "spatialedge", "plos"]
+
+
+def _write_corpus(save_dir: Path, n: int, seed: int = 0) -> None:
+    rnd = random.Random(seed)
+    start = date(2023, 1, 1)
+    for i in range(n):
+        published = start + timedelta(days=rnd.randrange(1000))
+        entry = {
+            "source": rnd.choice(ORIGINS),
+            "title": f"Synthetic entry {i}",
+            "authors": ["Author One", "Author Two"],
+            "publish_date": published.strftime(rnd.choice(DATE_FORMATS)),
+            "summary": "x" * 300,
+            "url": f"https://arxiv.org/abs/{2300 + i // 100000}.{i % 100000:05d}",
+            "usefulness_score": rnd.randrange(101),
+            "usefulness_reason": "synthetic",
+        }
+        (save_dir / f"entry_{i}.json").write_text(json.dumps(entry, indent=2), encoding="utf-8")
+
+
+def _scan_query(save_dir: Path, origin: str, min_score: int, cutoff: date) -> list:
+    """The pre-index read path: parse every file, filter, then sort with repeated date parsing."""
+    items = []
+    for path in save_dir.glob("*.json"):
+        obj = _load_json(path)
+        if isinstance(obj, dict) and obj.get("url"):
+            items.append(obj)
+    items = [it for it in items if _entry_origin(it) == origin]
+    out = []
+    for it in items:
+        if _safe_int(it.get("usefulness_score")) < min_score:
+            continue
+        pub = _parse_publish_date(it.get("publish_date"))
+        if not pub or pub < cutoff:
+            continue
+        out.append(it)
+    out.sort(key=lambda x: (-_safe_int(x.get("usefulness_score")), _parse_publish_date(x.get("publish_date")) is None))
+    return out
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+
+def run(n: int) -> dict:
+    origin, min_score, cutoff = "arxiv", 80, date(2024, 6, 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        save_dir = Path(tmp)
+        _write_corpus(save_dir, n)
+
+        scan_s, scan_items = _timed(lambda: _scan_query(save_dir, origin, min_score, cutoff))
+
+        with ResultStore(save_dir) as store:
+            import_s, _ = _timed(store.rebuild)
+
+        def indexed():
+            with ResultStore(save_dir) as store:
+                store.sync()
+                return list(store.query(origin, min_score, cutoff.isoformat()))
+
+        query_s, rows = _timed(indexed)
+        assert len(rows) == len(scan_items)
+
+    return {
+        "entries": n,
+        "matches": len(rows),
+        "scan_s": round(scan_s, 4),
+        "index_import_s": round(import_s, 4),
+        "index_query_s": round(query_s, 4),
+        "speedup": round(scan_s / query_s, 1) if query_s else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+    for n in args.sizes:
+        print(json.dumps(run(n)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Research fields the multi-agent workflow runs for.
+
+    FIELD    the default field; the agent prompts and task messages of the research nodes use it
+    FIELDS   every field the batch pipelines score against (just FIELD unless more are added)
+
+With several FIELDS, each research node fetches once for the union of their
+topics (one query per distinct topic) and then scores every candidate against
+each field separately, so fetch cost grows with distinct topics rather than
+fields x topics. Saved entries carry the score of every field in
+"field_scores" (see scoring_tools.score_and_save_fields).
+"""
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class FieldConfig(BaseModel):
+    name: str  # short label, the key in an entry's "field_scores"
+    field: str  # comma-separated topics, same format as FIELD
+    min_usefulness: Optional[int] = None  # None: the node's own *_MIN_USEFULNESS
+
+
+# Default research field (comma-separated topics; each topic is one fetch query)
+FIELD = "Spatio Temporal Point Process, Spatio Temporal, Point Process, Contextual dataset, Survey data"
+
+# Fields scored by the batch pipelines, e.g.
+#   FieldConfig(name="hawkes", field="Hawkes Process, Self-exciting point process", min_usefulness=70)
+FIELDS: List[FieldConfig] = [
+    FieldConfig(name="stpp", field=FIELD),
+]
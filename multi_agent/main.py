@@ -1,42 +1,305 @@
-import glob
-import subprocess
-import os
 import sys
+import time
+import asyncio
+import argparse
+import threading
+import contextvars
+from functools import partial
 
-# Timeout in seconds, or None for no timeout
-timeout_seconds = None
+from langgraph.graph import StateGraph, START, END
+from langchain_core.messages import HumanMessage
 
-def to_module(path: str) -> str:
-    # Convert "multi_agent/ResearchTeam/arxiv_node.py" -> "multi_agent.ResearchTeam.arxiv_node"
-    no_ext = os.path.splitext(path)[0]
-    return no_ext.replace(os.sep, ".")
+from .ResearchTeam import arxiv_node, blog_node, gscholar_node
+from .PostingTeam import X_node
+from .utils import utils
+from .utils.utils import State
+from .utils.factories import load_env
+from .utils.metrics import RunMetrics, set_active, get_active
+from .utils.cancellation import set_cancel_event
+from .utils.checkpoints import CHECKPOINT_MAX_AGE_DAYS, get_checkpointer, set_run_id
 
-# Run ResearchTeam modules
-input_files = sorted(glob.glob('multi_agent/ResearchTeam/*.py'))
-for file in input_files:
-    if os.path.basename(file) == '__init__.py':
-        continue
-    print(f"Running {file}...")
+
+# Timeout in seconds per node, or None for no timeout
+NODE_TIMEOUTS = {
+    "arxiv": None,
+    "blog": None,
+    "gscholar": None,
+    "X": None,
+}
+
+# Research nodes fanned out in parallel: name -> (node function, task message)
+RESEARCH_NODES = {
+    "arxiv": (arxiv_node.arxiv_node, arxiv_node.TASK_MESSAGE),
+    "blog": (blog_node.blog_node, blog_node.TASK_MESSAGE),
+    "gscholar": (gscholar_node.gscholar_node, gscholar_node.TASK_MESSAGE),
+}
+# Their coroutine versions, run on one event loop by `--async` (same task messages)
+ASYNC_RESEARCH_NODES = {
+    "arxiv": arxiv_node.aarxiv_node,
+    "blog": blog_node.ablog_node,
+    "gscholar": gscholar_node.agscholar_node,
+}
+
+RECURSION_LIMIT = 150
+
+# Checkpoint every super-step (saved/cache/checkpoints.sqlite) so `--resume` can continue a run that died
+CHECKPOINTS_ENABLED = True
+
+
+class NodeTimeout(Exception):
+    pass
+
+
+def _run_with_timeout(name: str, fn, timeout):
+    """
+    Run `fn` in a daemon thread and wait at most `timeout` seconds for it.
+
+    The caller's context is copied into the worker so the LangGraph config
+    (callbacks, recursion_limit) still reaches the inner agent. On timeout the
+    worker's cancel event is set (see utils/cancellation.py): it stops at its
+    next scoring batch or entry write instead of saving results after the node
+    was reported as timed out. Being a daemon it does not block interpreter exit.
+    """
+    ctx = contextvars.copy_context()
+    cancel = threading.Event()
+    ctx.run(set_cancel_event, cancel)
+    outcome = {}
+
+    def target():
+        try:
+            outcome["value"] = ctx.run(fn)
+        except BaseException as e:
+            outcome["error"] = e
+
+    worker = threading.Thread(target=target, name=f"{name}-node", daemon=True)
+    worker.start()
+    worker.join(timeout)
+
+    if worker.is_alive():
+        cancel.set()
+        raise NodeTimeout(f"{name} timed out after {timeout}s")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome.get("value")
+
+
+def _record_node(name: str, seconds: float) -> None:
+    metrics = get_active()
+    if metrics is not None:
+        metrics.record_node(name, seconds)
+
+
+def research_node(state: State, name: str) -> dict:
+    """Run one research agent on its own task message and report back to the shared state."""
+    node_fn, task_message = RESEARCH_NODES[name]
+    task_state = {"messages": [("user", task_message)]}
+
+    t0 = time.perf_counter()
+    try:
+        command = _run_with_timeout(
+            name, partial(node_fn, task_state, next_state=END), NODE_TIMEOUTS.get(name)
+        )
+        print(f"Finished {name} in {time.perf_counter() - t0:.1f}s")
+        _record_node(name, time.perf_counter() - t0)
+        return command.update
+    except NodeTimeout as e:
+        print(f"Timeout expired for {name}")
+        content = str(e)
+    except Exception as e:
+        print(f"Error running {name}: {e}")
+        content = f"Error running {name}: {e}"
+
+    _record_node(name, time.perf_counter() - t0)
+    return {"messages": [HumanMessage(content=content, name=name)]}
+
+
+async def aresearch_node(state: State, name: str) -> dict:
+    """`research_node` for the async graph: the node is awaited, and cancelled when it runs out of time."""
+    _, task_message = RESEARCH_NODES[name]
+    task_state = {"messages": [("user", task_message)]}
+    timeout = NODE_TIMEOUTS.get(name)
+
+    t0 = time.perf_counter()
+    try:
+        command = await asyncio.wait_for(ASYNC_RESEARCH_NODES[name](task_state, next_state=END), timeout)
+        print(f"Finished {name} in {time.perf_counter() - t0:.1f}s")
+        _record_node(name, time.perf_counter() - t0)
+        return command.update
+    except asyncio.TimeoutError:
+        print(f"Timeout expired for {name}")
+        content = f"{name} timed out after {timeout}s"
+    except Exception as e:
+        print(f"Error running {name}: {e}")
+        content = f"Error running {name}: {e}"
+
+    _record_node(name, time.perf_counter() - t0)
+    return {"messages": [HumanMessage(content=content, name=name)]}
+
+
+def x_node(state: State) -> dict:
+    """Post the best saved entry to X once every research node has finished."""
+    t0 = time.perf_counter()
+    try:
+        exit_code = _run_with_timeout("X", X_node.main, NODE_TIMEOUTS.get("X"))
+        content = f"X posting finished with exit code {exit_code}"
+    except NodeTimeout as e:
+        print("Timeout expired for X")
+        content = str(e)
+    except Exception as e:
+        print(f"Error running X: {e}")
+        content = f"Error running X: {e}"
+
+    _record_node("X", time.perf_counter() - t0)
+    return {"messages": [HumanMessage(content=content, name="X")]}
+
+
+async def ax_node(state: State) -> dict:
+    """`x_node` for the async graph; X_node.main stays synchronous and runs in a worker thread."""
+    return await asyncio.to_thread(x_node, state)
+
+
+def build_graph(checkpointer=None, use_async=False):
+    """
+    START -> arxiv | blog | gscholar (in parallel) -> X -> END
+
+    The X node only runs after all research nodes have reported, so wall-clock
+    time is bound by the slowest source rather than the sum of all of them.
+    With a checkpointer every finished node is saved as it completes, so a
+    resumed run skips the nodes that already reported. `use_async=True` builds
+    the same graph from the coroutine nodes, for `astream`.
+    """
+    builder = StateGraph(State)
+    for name in RESEARCH_NODES:
+        builder.add_node(name, partial(aresearch_node if use_async else research_node, name=name))
+        builder.add_edge(START, name)
+
+    builder.add_node("X", ax_node if use_async else x_node)
+    builder.add_edge(list(RESEARCH_NODES), "X")
+    builder.add_edge("X", END)
+
+    return builder.compile(checkpointer=checkpointer)
+
+
+def _start_run(resume: bool):
+    """(checkpointer, run id, graph input) for a new run, or for the latest unfinished one when resuming."""
+    if not CHECKPOINTS_ENABLED:
+        if resume:
+            print("Checkpoints are disabled (CHECKPOINTS_ENABLED); starting a new run.")
+        return None, None, {"messages": []}
+
+    checkpointer = get_checkpointer()
+    stale = checkpointer.prune_stale_runs()
+    if stale:
+        print(f"Dropped checkpoints of {len(stale)} unfinished run(s) older than {CHECKPOINT_MAX_AGE_DAYS} days")
+    if resume:
+        unfinished = checkpointer.unfinished_runs()
+        if unfinished:
+            run_id = unfinished[0]["run_id"]
+            checkpointer.mark_resumed(run_id)
+            print(f"Resuming run {run_id} (started {unfinished[0]['started_at']})")
+            # None: continue from the last checkpoint instead of starting over
+            return checkpointer, run_id, None
+        print("No unfinished run to resume; starting a new one.")
+    return checkpointer, checkpointer.start_run(), {"messages": []}
+
+
+def _prepare_run(resume: bool, use_async: bool):
+    load_env()
+    checkpointer, run_id, graph_input = _start_run(resume)
+    graph = build_graph(checkpointer, use_async)
+    config = {"recursion_limit": RECURSION_LIMIT}
+    if run_id is not None:
+        config["configurable"] = {"thread_id": run_id}
+
+    metrics = RunMetrics()
+    set_active(metrics)
+    set_run_id(run_id)
+    return checkpointer, run_id, graph, graph_input, config, metrics
+
+
+def _end_run(metrics: RunMetrics) -> dict:
+    set_active(None)
+    set_run_id(None)
+    return metrics.write_summary()
+
+
+def _finish_run(checkpointer, run_id, summary: dict, t0: float) -> dict:
+    # only reached when the graph ran to the end; an interrupted run stays resumable
+    if checkpointer is not None:
+        checkpointer.finish_run(run_id)
+    totals = summary["totals"]
+    print(f"Workflow finished in {time.perf_counter() - t0:.1f}s: "
+          f"{totals['llm_calls']} LLM calls ({totals['input_tokens']} tokens in, {totals['output_tokens']} out), "
+          f"{totals['tool_calls']} tool calls")
+    return summary
+
+
+def run_workflow(resume: bool = False) -> dict:
+    """
+    Run the graph once under a fresh RunMetrics; returns its summary (also written to saved/run_metrics.json).
+
+    Every run is checkpointed under its run id; `resume=True` continues the latest
+    run that did not finish (from its last completed super-step, without re-running
+    the nodes that had already reported) instead of starting a new one.
+    """
+    checkpointer, run_id, graph, graph_input, config, metrics = _prepare_run(resume, use_async=False)
+    t0 = time.perf_counter()
     try:
-        subprocess.run([sys.executable, '-m', to_module(file)],
-                       timeout=timeout_seconds, check=True, cwd='.')
-        print(f"Finished {file}")
-    except subprocess.TimeoutExpired:
-        print(f"Timeout expired for {file}")
-    except subprocess.CalledProcessError as e:
-        print(f"Error running {file}: {e}")
-
-# Run PostingTeam modules
-output_files = sorted(glob.glob('multi_agent/PostingTeam/*.py'))
-for file in output_files:
-    if os.path.basename(file) == '__init__.py':
-        continue
-    print(f"Running {file}...")
+        for s in graph.stream(graph_input, config, durability="sync"):
+            print(s)
+            print("---")
+    finally:
+        summary = _end_run(metrics)
+    return _finish_run(checkpointer, run_id, summary, t0)
+
+
+async def arun_workflow(resume: bool = False) -> dict:
+    """
+    `run_workflow` on one event loop: the research nodes are coroutines, so their
+    Tavily queries and scoring batches are awaited concurrently instead of each
+    holding a thread. Checkpoints and resume work the same way.
+    """
+    checkpointer, run_id, graph, graph_input, config, metrics = _prepare_run(resume, use_async=True)
+    t0 = time.perf_counter()
     try:
-        subprocess.run([sys.executable, '-m', to_module(file)],
-                       timeout=timeout_seconds, check=True, cwd='.')
-        print(f"Finished {file}")
-    except subprocess.TimeoutExpired:
-        print(f"Timeout expired for {file}")
-    except subprocess.CalledProcessError as e:
-        print(f"Error running {file}: {e}")
+        async for s in graph.astream(graph_input, config, durability="sync"):
+            print(s)
+            print("---")
+    finally:
+        summary = _end_run(metrics)
+    return _finish_run(checkpointer, run_id, summary, t0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the research nodes, then post to X.")
+    parser.add_argument("--record", metavar="DIR", default=None,
+                        help="also capture every external response of this run to fixture DIR "
+                             "(replay it with multi_agent.benchmarks.pipeline_bench)")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue the latest run that did not finish instead of starting a new one")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="run the research nodes as coroutines on one event loop")
+    parser.add_argument("--debug-jsonl", action="store_true",
+                        help="write the debug log as one JSON object per event to saved/debug.jsonl")
+    args = parser.parse_args(argv)
+    if args.debug_jsonl:
+        # every node's _config builds its DebugHandler per call, so they all pick this up
+        utils.DEBUG_LOG_STRUCTURED = True
+
+    def run():
+        if args.use_async:
+            return asyncio.run(arun_workflow(resume=args.resume))
+        return run_workflow(resume=args.resume)
+
+    if args.record:
+        from .utils.record_replay import Recorder
+        with Recorder(args.record):
+            run()
+        print(f"Fixture recorded to {args.record}")
+    else:
+        run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
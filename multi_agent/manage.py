@@ -0,0 +1,129 @@
+"""
+Maintenance commands for the saved/ directory.
+
+    python -m multi_agent.manage reindex           # rebuild the SQLite index over saved/*.json
+    python -m multi_agent.manage dedupe            # report duplicate entries and reclaimable space
+    python -m multi_agent.manage dedupe --apply    # delete the duplicates, keeping one file per work
+    python -m multi_agent.manage migrate-tweets    # copy saved/tweets.json into the tweets.jsonl ledger
+    python -m multi_agent.manage pack              # move saved/*.json entries into monthly shards in saved/packed
+    python -m multi_agent.manage unpack            # write packed entries back to one saved/*.json file each
+"""
+import sys
+import argparse
+from pathlib import Path
+
+from .tools.posting_tools import SAVE_DIR
+from .tools.result_store import ResultStore, open_store
+from .tools.packed_store import PackedStore, pack_files, split_row_key, unpack_files
+from .tools.tweet_ledger import TweetLedger
+
+
+def reindex(args) -> int:
+    with ResultStore(Path(args.save_dir)) as store:
+        stats = store.rebuild()
+        print(f"{stats['added']} entries indexed in {store.index_file}")
+    return 0
+
+
+def dedupe(args) -> int:
+    """
+    Collapse entries saved more than once under different file names.
+
+    Per group of files describing the same work (see ResultStore.find_duplicate)
+    the one with the highest usefulness score is kept (oldest file on ties).
+    """
+    save_dir = Path(args.save_dir)
+    with open_store(save_dir) as store:
+        groups = store.duplicate_groups()
+
+    removed = reclaimed = 0
+    packed_drops = {}
+    for keep, *dupes in groups:
+        print(f"keep   {keep['file']} (score {keep['score']})")
+        for d in dupes:
+            print(f"  drop {d['file']} (score {d['score']}, {d['size']} bytes)")
+            if args.apply:
+                packed = split_row_key(d["file"])
+                if packed:
+                    packed_drops.setdefault(packed[0], []).append(packed[1])
+                else:
+                    (save_dir / d["file"]).unlink(missing_ok=True)
+            removed += 1
+            reclaimed += d["size"]
+    for shard, names in packed_drops.items():
+        PackedStore(save_dir).remove(shard, names)
+
+    verb = "Removed" if args.apply else "Would remove"
+    print(f"{verb} {removed} duplicate files in {len(groups)} groups, reclaiming {reclaimed / 1024:.1f} KiB.")
+    if args.apply and removed:
+        with open_store(save_dir):
+            pass  # re-sync the index with the files that are left
+    elif removed:
+        print("Run again with --apply to delete them.")
+    return 0
+
+
+def migrate_tweets(args) -> int:
+    save_dir = Path(args.save_dir)
+    legacy = save_dir / "tweets.json"
+    if not legacy.exists():
+        print(f"Nothing to migrate: {legacy} does not exist.")
+        return 0
+    ledger = TweetLedger(save_dir / "tweets.jsonl", legacy_path=None)
+    added = ledger.import_legacy(legacy)
+    print(f"Imported {added} items from {legacy}; {len(ledger)} posted items recorded in {ledger.path}.")
+    if args.remove:
+        legacy.unlink()
+        print(f"Removed {legacy}.")
+    else:
+        print(f"{legacy} was left in place and is ignored from now on; pass --remove to delete it.")
+    return 0
+
+
+def pack(args) -> int:
+    result = pack_files(Path(args.save_dir))
+    for shard, count in sorted(result["shards"].items()):
+        print(f"  {shard}: +{count} entries")
+    print(f"Packed {result['packed']} files into {len(result['shards'])} shards.")
+    if result["conflicts"]:
+        print(f"Left {len(result['conflicts'])} files in place, their names are already packed: {', '.join(result['conflicts'])}")
+    with open_store(Path(args.save_dir)):
+        pass  # re-sync the index with the new layout
+    return 0
+
+
+def unpack(args) -> int:
+    result = unpack_files(Path(args.save_dir))
+    print(f"Unpacked {result['unpacked']} entries into one JSON file each.")
+    if result["conflicts"]:
+        print(f"Kept {len(result['conflicts'])} entries packed, a file with their name exists: {', '.join(result['conflicts'])}")
+    with open_store(Path(args.save_dir)):
+        pass
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m multi_agent.manage", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save-dir", default=str(SAVE_DIR), help="directory holding the saved entries")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("reindex", help="rebuild the SQLite index from the JSON files").set_defaults(func=reindex)
+
+    p = sub.add_parser("dedupe", help="collapse entries saved under several file names")
+    p.add_argument("--apply", action="store_true", help="delete duplicates instead of only reporting them")
+    p.set_defaults(func=dedupe)
+
+    p = sub.add_parser("migrate-tweets", help="copy tweets.json into the append-only tweets.jsonl ledger")
+    p.add_argument("--remove", action="store_true", help="delete tweets.json once its items are in the ledger")
+    p.set_defaults(func=migrate_tweets)
+
+    sub.add_parser("pack", help="move the per-file entries into compressed monthly shards").set_defaults(func=pack)
+    sub.add_parser("unpack", help="write packed entries back to one JSON file each").set_defaults(func=unpack)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
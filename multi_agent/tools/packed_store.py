@@ -0,0 +1,247 @@
+"""
+Packed layout for saved entries: month shards of gzip-compressed JSON lines.
+
+    saved/packed/manifest.json       {"version": 1, "shards": {"2025-10.jsonl.gz": {"bytes": ..., "entries": ..., "updated_at": ...}}}
+    saved/packed/2025-10.jsonl.gz    one line per entry: {"name": "<file name>.json", "saved_at": <epoch>, "entry": {...}}
+
+An entry goes into the shard of the month it was saved in, so a run adds to one
+shard instead of creating a file per entry. Every append is a single gzip member
+written after the bytes listed in the manifest; the manifest is replaced
+atomically once the shard is fsynced, and readers only read the bytes it lists,
+so an interrupted append is invisible and cut off by the next one.
+
+Readers (see result_store.ResultStore.sync) always see both layouts; which one
+new entries are written to is set by research_tools.STORAGE_BACKEND.
+"""
+import os
+import gzip
+import json
+import time
+import threading
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .posting_tools import SAVE_DIR
+
+
+PACKED_DIR_NAME = "packed"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+SHARD_SUFFIX = ".jsonl.gz"
+# Index rows of packed entries are keyed "packed/<shard>/<name>" (a saved file name never contains "/")
+PACKED_ROW_PREFIX = "packed/"
+
+_PACK_LOCK = threading.Lock()
+
+
+def shard_name(saved_at: Optional[float] = None) -> str:
+    """"2025-10.jsonl.gz" for an entry saved at `saved_at` (epoch seconds, default now; UTC month)."""
+    ts = datetime.fromtimestamp(time.time() if saved_at is None else saved_at, tz=timezone.utc)
+    return f"{ts:%Y-%m}{SHARD_SUFFIX}"
+
+
+def row_key(shard: str, name: str) -> str:
+    return f"{PACKED_ROW_PREFIX}{shard}/{name}"
+
+
+def split_row_key(key: str) -> Optional[Tuple[str, str]]:
+    """(shard, name) of a packed index row key, None for a plain file name."""
+    if not key.startswith(PACKED_ROW_PREFIX):
+        return None
+    shard, _, name = key[len(PACKED_ROW_PREFIX):].partition("/")
+    return shard, name
+
+
+class PackedStore:
+    def __init__(self, save_dir: Path = SAVE_DIR):
+        self.dir = Path(save_dir) / PACKED_DIR_NAME
+        self.manifest_path = self.dir / MANIFEST_NAME
+
+    def exists(self) -> bool:
+        return self.manifest_path.exists()
+
+    def manifest(self) -> Dict[str, Any]:
+        try:
+            data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"version": MANIFEST_VERSION, "shards": {}}
+        data.setdefault("shards", {})
+        return data
+
+    def manifest_token(self) -> str:
+        """
+        Changes whenever the manifest is rewritten (i.e. after every append or
+        removal): it is replaced by a new file each time, so the inode changes
+        even when two rewrites fall within the filesystem's mtime resolution.
+        """
+        try:
+            st = self.manifest_path.stat()
+        except FileNotFoundError:
+            return ""
+        return f"{st.st_ino}:{st.st_mtime_ns}"
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        tmp = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.manifest_path)
+
+    # ---------- read ----------
+
+    def read_shard(self, shard: str, manifest: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Records of one shard (only the bytes committed in the manifest)."""
+        manifest = manifest or self.manifest()
+        committed = manifest["shards"].get(shard, {}).get("bytes", 0)
+        if not committed:
+            return []
+        with open(self.dir / shard, "rb") as f:
+            data = f.read(committed)
+        records = []
+        for line in gzip.decompress(data).splitlines():
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(rec, dict) and rec.get("name") and isinstance(rec.get("entry"), dict):
+                records.append(rec)
+        return records
+
+    def iter_records(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """(shard, record) for every packed entry, oldest shard first."""
+        manifest = self.manifest()
+        for shard in sorted(manifest["shards"]):
+            for rec in self.read_shard(shard, manifest):
+                yield shard, rec
+
+    # ---------- write ----------
+
+    def append(self, entries: Iterable[Tuple[str, Dict[str, Any], float]]) -> Dict[str, int]:
+        """
+        Append (name, entry, saved_at) rows, grouped into the shard of their save
+        month (`saved_at` in epoch seconds). Each shard gets one gzip member and
+        the manifest is updated once at the end, so the whole call is committed
+        together. Returns entries per shard.
+        """
+        by_shard: Dict[str, List[bytes]] = {}
+        for name, entry, saved_at in entries:
+            line = json.dumps({"name": name, "saved_at": saved_at, "entry": entry}, ensure_ascii=False)
+            by_shard.setdefault(shard_name(saved_at), []).append(line.encode("utf-8") + b"\n")
+        if not by_shard:
+            return {}
+
+        with _PACK_LOCK:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            manifest = self.manifest()
+            for shard, lines in sorted(by_shard.items()):
+                meta = manifest["shards"].setdefault(shard, {"bytes": 0, "entries": 0})
+                path = self.dir / shard
+                with open(path, "r+b" if path.exists() else "wb") as f:
+                    # drop the tail of an append that was never committed
+                    committed = min(meta["bytes"], os.fstat(f.fileno()).st_size)
+                    f.truncate(committed)
+                    f.seek(committed)
+                    f.write(gzip.compress(b"".join(lines), mtime=0))
+                    f.flush()
+                    os.fsync(f.fileno())
+                    meta["bytes"] = f.tell()
+                meta["entries"] += len(lines)
+                meta["updated_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+            manifest["version"] = MANIFEST_VERSION
+            self._write_manifest(manifest)
+        return {shard: len(lines) for shard, lines in by_shard.items()}
+
+    def remove(self, shard: str, names: Iterable[str]) -> int:
+        """Rewrite `shard` without the entries called `names`; returns how many were dropped."""
+        names = set(names)
+        with _PACK_LOCK:
+            manifest = self.manifest()
+            if shard not in manifest["shards"]:
+                return 0
+            records = self.read_shard(shard, manifest)
+            kept = [r for r in records if r["name"] not in names]
+            if len(kept) == len(records):
+                return 0
+            path = self.dir / shard
+            if kept:
+                data = gzip.compress(b"".join(json.dumps(r, ensure_ascii=False).encode("utf-8") + b"\n" for r in kept), mtime=0)
+                tmp = path.with_name(path.name + ".tmp")
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, path)
+                manifest["shards"][shard].update(bytes=len(data), entries=len(kept))
+            else:
+                del manifest["shards"][shard]
+            self._write_manifest(manifest)
+            if not kept:
+                path.unlink(missing_ok=True)
+        return len(records) - len(kept)
+
+
+# ---------- converters ----------
+
+def _saved_files(save_dir: Path) -> Iterator[Tuple[Path, Dict[str, Any]]]:
+    """(path, entry) of every per-file entry in `save_dir` (other JSON files there are not entries)."""
+    for path in sorted(Path(save_dir).glob("*.json")):
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if isinstance(entry, dict) and entry.get("url"):
+            yield path, entry
+
+
+def pack_files(save_dir: Path = SAVE_DIR) -> Dict[str, Any]:
+    """
+    Move every saved/<name>.json entry into the packed shards (by file mtime month)
+    and delete the files once the shards are committed. A file whose name is
+    already packed is left in place and reported as a conflict.
+    """
+    packed = PackedStore(save_dir)
+    packed_names = {rec["name"] for _, rec in packed.iter_records()}
+    batch, conflicts = [], []
+    for path, entry in _saved_files(save_dir):
+        if path.name in packed_names:
+            conflicts.append(path.name)
+            continue
+        batch.append((path, entry))
+
+    shards = packed.append((path.name, entry, path.stat().st_mtime) for path, entry in batch)
+    for path, _ in batch:
+        path.unlink()
+    return {"packed": len(batch), "shards": shards, "conflicts": conflicts}
+
+
+def unpack_files(save_dir: Path = SAVE_DIR) -> Dict[str, Any]:
+    """
+    Write every packed entry back to saved/<name>.json (mtime set to its save time)
+    and remove the shards. An entry whose file already exists stays packed and is
+    reported as a conflict.
+    """
+    packed = PackedStore(save_dir)
+    written: Dict[str, List[str]] = {}
+    conflicts = []
+    for shard, rec in packed.iter_records():
+        target = Path(save_dir) / rec["name"]
+        if target.exists():
+            conflicts.append(rec["name"])
+            continue
+        tmp = target.with_name(f".{target.name}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(rec["entry"], f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, target)
+        if rec.get("saved_at"):
+            os.utime(target, (rec["saved_at"], rec["saved_at"]))
+        written.setdefault(shard, []).append(rec["name"])
+
+    for shard, names in written.items():
+        packed.remove(shard, names)
+    if packed.exists() and not packed.manifest()["shards"]:
+        packed.manifest_path.unlink()
+    return {"unpacked": sum(len(n) for n in written.values()), "conflicts": conflicts}
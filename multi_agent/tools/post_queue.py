@@ -0,0 +1,266 @@
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from .posting_tools import SAVE_DIR, _normalize_url
+from .tweet_text import TWEET_MAX_WEIGHT, fits, tweet_length
+
+
+POST_QUEUE_FILE = SAVE_DIR / "post_queue.json"
+# Sends per post before it is marked failed
+POST_MAX_ATTEMPTS = 6
+# Exponential backoff between retries: base * 2**(attempts - 1), capped
+POST_BACKOFF_BASE_SECONDS = 60
+POST_BACKOFF_MAX_SECONDS = 6 * 3600
+# Queued posts sent per drain() call at most
+POST_DRAIN_MAX = 3
+
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+# Credential / app-permission answers: no post can go out until someone fixes the keys
+AUTH_STATUS = frozenset({401, 403})
+# Raised by the client before any request was made (e.g. a missing key: "Consumer key must be
+# string or bytes, not NoneType"); every other post would hit them too
+CLIENT_ERRORS = (TypeError, ValueError, AttributeError)
+# Errors raised before X answered (connection dropped, timeout); retried like a 5xx
+TRANSPORT_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    ConnectionError,
+    TimeoutError,
+)
+# X API error code for "You are not allowed to create a Tweet with duplicate content."
+X_DUPLICATE_CODE = 187
+
+
+def _utcnow_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) or getattr(response, "status", None)
+
+
+def _retry_at(error: Exception, now: float, attempts: int) -> float:
+    """When to retry: X's rate-limit reset / Retry-After header if given, else exponential backoff."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("x-rate-limit-reset"):
+            return max(now, float(headers["x-rate-limit-reset"]))
+        if headers.get("retry-after"):
+            return now + float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return now + min(POST_BACKOFF_MAX_SECONDS, POST_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+def _classify(error: Exception) -> str:
+    """
+    "duplicate" (X already has this exact text), "retry" (429, 5xx, transport
+    error), "halt" (401, 403 other than duplicate content, or a client /
+    configuration error raised before X answered) or "fatal" (any other answer).
+    """
+    status = _status_code(error)
+    if status == 403 and (
+        X_DUPLICATE_CODE in (getattr(error, "api_codes", None) or [])
+        or "duplicate content" in str(error).lower()
+    ):
+        return "duplicate"
+    if status in AUTH_STATUS:
+        return "halt"
+    if status in RETRYABLE_STATUS or (status is None and isinstance(error, TRANSPORT_ERRORS)):
+        return "retry"
+    if status is None and isinstance(error, CLIENT_ERRORS):
+        return "halt"
+    return "fatal"
+
+
+class PostQueue:
+    """
+    Persistent outbound queue of tweets, kept in ./saved/post_queue.json.
+
+    A post is enqueued once per normalized URL (and never if the URL is already
+    in the tweets ledger), then sent by `drain()`. Every state change is written
+    atomically before and after the send, so a crash never loses a post:
+      - 429 / 5xx / network errors: retried on a later drain, after X's reset
+        time or an exponential backoff, up to POST_MAX_ATTEMPTS sends;
+      - 401 / 403 (bad keys or app permissions) and client errors raised before
+        X answered (a missing key): the drain stops and the post stays pending
+        with its attempt count unchanged, since nothing can be sent until the
+        credentials or configuration are fixed;
+      - other HTTP errors: the post is kept with status "failed" and not retried;
+        it does not block the URL, so a later enqueue of it starts afresh;
+      - a post interrupted mid-send is sent again, and X's "duplicate content"
+        answer is taken as proof it went out, so retries never double-post.
+    Sent posts are recorded in the ledger and removed from the queue.
+
+    `transport` is anything with tweepy.Client's `create_tweet(text=...)`, so a
+    fake can stand in for X.
+    """
+
+    def __init__(self, path: Path = POST_QUEUE_FILE, ledger=None, clock: Callable[[], float] = time.time):
+        self.path = Path(path)
+        self._ledger = ledger
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    @property
+    def ledger(self):
+        if self._ledger is None:
+            from .tweet_ledger import get_ledger
+            self._ledger = get_ledger()
+        return self._ledger
+
+    def _load(self) -> List[Dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8") or "[]")
+        except json.JSONDecodeError:
+            logging.warning(f"Ignoring unreadable post queue {self.path}")
+            return []
+        return data if isinstance(data, list) else []
+
+    def _save(self, items: List[Dict[str, Any]]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(items, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def items(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return self._load()
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Posts still to be sent (due now or later), oldest first."""
+        return [it for it in self.items() if it["status"] != "failed"]
+
+    def norm_urls(self) -> frozenset:
+        """Normalized URLs of posts still to be sent; failed ones were never posted, so they may be picked again."""
+        return frozenset(it["norm_url"] for it in self.items() if it["status"] != "failed")
+
+    def queued(self, url: str) -> Optional[Dict[str, Any]]:
+        """The post of `url` still waiting to be sent (pending, backing off or mid-send), if any."""
+        key = _normalize_url(url)
+        return next((it for it in self.items() if it["norm_url"] == key and it["status"] != "failed"), None)
+
+    def enqueue(self, url: str, text: str, posting_reason: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Queue a post; returns (status, item) with status "queued", "requeued"
+        (a failed post of the same URL replaced by this one), "already_queued",
+        "already_posted" or "too_long" (empty, or over TWEET_MAX_WEIGHT as X
+        counts it; nothing is queued and item holds the weighted "length").
+        """
+        if not fits(text):
+            return "too_long", {"url": url, "text": text, "length": tweet_length(text), "limit": TWEET_MAX_WEIGHT}
+        key = _normalize_url(url)
+        posted = self.ledger.get(url)
+        if posted is not None:
+            return "already_posted", posted
+        with self._lock:
+            items = self._load()
+            failed = [it for it in items if it["norm_url"] == key and it["status"] == "failed"]
+            for it in items:
+                if it["norm_url"] == key and it["status"] != "failed":
+                    return "already_queued", it
+            items = [it for it in items if it["norm_url"] != key]
+            item = {
+                "url": url,
+                "norm_url": key,
+                "text": text,
+                "posting_reason": posting_reason,
+                "status": "pending",
+                "attempts": 0,
+                "next_attempt_at": 0,
+                "last_error": None,
+                "enqueued_at": _utcnow_iso(),
+            }
+            items.append(item)
+            self._save(items)
+            return ("requeued" if failed else "queued"), item
+
+    def _update(self, key: str, **changes) -> None:
+        items = self._load()
+        for it in items:
+            if it["norm_url"] == key:
+                it.update(changes)
+        self._save(items)
+
+    def _remove(self, key: str) -> None:
+        self._save([it for it in self._load() if it["norm_url"] != key])
+
+    def drain(self, transport, max_posts: int = POST_DRAIN_MAX) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Send up to `max_posts` due posts, oldest first. Stops at the first 429,
+        since the rate limit applies to every post, and at the first 401 / 403 or
+        client error, which no other post would get past either. Returns the urls
+        that were "posted", are "retrying" later, "failed" for good, or were
+        "halted" by an auth / client error (still pending).
+        """
+        report: Dict[str, List[Dict[str, Any]]] = {"posted": [], "retrying": [], "failed": [], "halted": []}
+        with self._lock:
+            sends = 0
+            for item in self._load():
+                if sends >= max_posts:
+                    break
+                key = item["norm_url"]
+                if item["status"] == "failed" or item["next_attempt_at"] > self._clock():
+                    continue
+                if self.ledger.get(item["url"]) is not None:
+                    # recorded by a run that stopped before removing it from the queue
+                    self._remove(key)
+                    continue
+
+                attempts = item["attempts"] + 1
+                self._update(key, status="sending", attempts=attempts)
+                sends += 1
+                try:
+                    transport.create_tweet(text=item["text"])
+                    outcome = "posted"
+                except Exception as e:
+                    outcome, error = _classify(e), e
+
+                if outcome in ("posted", "duplicate"):
+                    self.ledger.record(item["url"], item["posting_reason"])
+                    self._remove(key)
+                    report["posted"].append({"url": item["url"], "attempts": attempts, "duplicate": outcome == "duplicate"})
+                    continue
+
+                message = f"{type(error).__name__}: {error}"
+                if outcome == "halt":
+                    self._update(key, status="pending", attempts=item["attempts"], last_error=message)
+                    report["halted"].append({"url": item["url"], "attempts": item["attempts"], "error": message})
+                    break
+                if outcome == "retry" and attempts < POST_MAX_ATTEMPTS:
+                    retry_at = _retry_at(error, self._clock(), attempts)
+                    self._update(key, status="pending", next_attempt_at=retry_at, last_error=message)
+                    report["retrying"].append({"url": item["url"], "attempts": attempts, "next_attempt_at": retry_at, "error": message})
+                    if _status_code(error) == 429:
+                        break
+                else:
+                    self._update(key, status="failed", last_error=message)
+                    report["failed"].append({"url": item["url"], "attempts": attempts, "error": message})
+        return report
+
+
+_queues: Dict[Path, PostQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_post_queue(path: Path = POST_QUEUE_FILE) -> PostQueue:
+    key = Path(path).resolve()
+    with _queues_lock:
+        if key not in _queues:
+            _queues[key] = PostQueue(path)
+        return _queues[key]
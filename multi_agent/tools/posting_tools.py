@@ -1,11 +1,13 @@
 from __future__ import annotations
-import tweepy
 import json
-import re
+import heapq
+import threading
 from pathlib import Path
-from typing import Literal, Optional, List, Dict, Any, Tuple
+from typing import Literal, Optional, List, Dict, Any, Tuple, Iterator
 from datetime import datetime, date as dt_date
-from pydantic import Field  # kept for compatibility with your existing schema stubs
+
+from ..utils.identity import canonical_url
+from ..utils.dates import parse_date, entry_date
 
 SAVE_DIR = Path("./saved")
 TWEETS_FILE = SAVE_DIR / "tweets.json"
@@ -18,19 +20,8 @@ def _parse_input_date(d: Optional[str]) -> Optional[dt_date]:
     return datetime.strptime(d.strip(), "%d-%m-%Y").date()
 
 def _parse_publish_date(d: Any) -> Optional[dt_date]:
-    if not d or (isinstance(d, str) and d.strip().lower() == "unknown"):
-        return None
-    s = str(d).strip()
-    fmts = ["%Y-%m-%d", "%d-%m-%Y", "%Y/%m/%d", "%d/%m/%Y", "%d.%m.%Y", "%Y.%m.%d"]
-    for f in fmts:
-        try:
-            return datetime.strptime(s, f).date()
-        except Exception:
-            pass
-    try:
-        return datetime.fromisoformat(s).date()
-    except Exception:
-        return None
+    """See utils/dates.py (one regex sniff per string, memoized)."""
+    return parse_date(d)
 
 
 def _load_json(path: Path) -> Any:
@@ -42,34 +33,14 @@ def _load_json(path: Path) -> Any:
         return {}
 
 
-def _save_json(path: Path, data: Any) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
-
-
-_ARXIV_ABS_RE = re.compile(r"https?://(?:www\.)?arxiv\.org/abs/([^?#]+)", re.IGNORECASE)
-_ARXIV_VERSION_RE = re.compile(r"^(?P<id>\d{4}\.\d{4,5})(?:v\d+)?$", re.IGNORECASE)
+def _normalize_url(url: str) -> str:
+    """Identity key of a URL; see utils/identity.py (e.g. any arXiv abs/pdf URL -> "arxiv:<id>")."""
+    return canonical_url(url)
 
 
-def _normalize_url(url: str) -> str:
-    if not url:
-        return ""
-    u = url.strip().lower()
-    u = u.replace("https://", "http://", 1)
-
-    m = _ARXIV_ABS_RE.match(u)
-    if m:
-        tail = m.group(1)
-        m2 = _ARXIV_VERSION_RE.match(tail)
-        if m2:
-            base_id = m2.group("id")
-            return f"arxiv:{base_id}"
-        return f"arxiv:{tail}"
-    return u
-
-
-def _load_tweets() -> List[Dict[str, str]]:
+def _load_tweets(path: Path = TWEETS_FILE) -> List[Dict[str, str]]:
     """
+    Read the legacy tweets.json (superseded by the tweets.jsonl ledger, see tweet_ledger.py).
     Always return a normalized list of dicts: [{"url": ..., "posting_reason": ...}, ...]
     Accept legacy formats:
       - {"tweets": ["url1", "url2", ...]}
@@ -77,7 +48,7 @@ def _load_tweets() -> List[Dict[str, str]]:
       - {"tweets": [{"url": "...", "posting_reason": "..."} , ...]}
     Missing posting_reason becomes "" (empty string).
     """
-    raw = _load_json(TWEETS_FILE)
+    raw = _load_json(path)
     normalized: List[Dict[str, str]] = []
 
     def _as_entry(u: Any) -> Optional[Dict[str, str]]:
@@ -102,14 +73,6 @@ def _load_tweets() -> List[Dict[str, str]]:
     return normalized
 
 
-def _save_tweets(entries: List[Dict[str, str]]) -> None:
-    _save_json(TWEETS_FILE, {"tweets": entries})
-
-
-def _tweet_norm_set(entries: List[Dict[str, str]]) -> set[str]:
-    return {_normalize_url(e.get("url", "")) for e in entries if isinstance(e, dict)}
-
-
 def _entry_origin(entry: Dict[str, Any]) -> Literal["arxiv", "gscholar", "blog"]:
     """
     Map the saved entry to one of our three high-level origins.
@@ -125,25 +88,6 @@ def _entry_origin(entry: Dict[str, Any]) -> Literal["arxiv", "gscholar", "blog"]
     return "blog"
 
 
-def _iter_saved_entries() -> List[Dict[str, Any]]:
-    """
-    Load every JSON object in ./saved except tweets.json.
-    Each file is expected to contain a single JSON object with fields:
-    source, title, authors, publish_date, summary, url, usefulness_score, usefulness_reason
-    """
-    items: List[Dict[str, Any]] = []
-    if not SAVE_DIR.exists():
-        return items
-
-    for path in SAVE_DIR.glob("*.json"):
-        if path.name == "tweets.json":
-            continue
-        obj = _load_json(path)
-        if isinstance(obj, dict) and obj.get("url"):
-            items.append(obj)
-    return items
-
-
 def _safe_int(x, default: int = -1) -> int:
     try:
         return int(x)
@@ -151,33 +95,24 @@ def _safe_int(x, default: int = -1) -> int:
         return default
 
 
-def _pick_best_by_date(items):
-    """Most recent publish_date (tie-break: higher usefulness_score)."""
-    def key(it: Dict[str, Any]):
-        pd = _parse_publish_date(it.get("publish_date"))
-        sc = _safe_int(it.get("usefulness_score"))
-        return (pd is None, pd or dt_date.min, sc)
-    return max(items, key=key, default=None)
+def _date_key(it: Dict[str, Any]):
+    """Most recent publish_date first (undated last), tie-break: higher usefulness_score."""
+    pd = entry_date(it)
+    return (pd is not None, pd or dt_date.min, _safe_int(it.get("usefulness_score")))
+
 
-def _pick_best_by_score(items):
-    """Highest usefulness_score (tie-break: newer publish_date)."""
-    def key(it: Dict[str, Any]):
-        sc = _safe_int(it.get("usefulness_score"))
-        pd = _parse_publish_date(it.get("publish_date"))
-        return (sc, pd is None, pd or dt_date.min)
-    return max(items, key=key, default=None)
+def _score_key(it: Dict[str, Any]):
+    """Highest usefulness_score first, tie-break: newer publish_date (undated last)."""
+    pd = entry_date(it)
+    return (_safe_int(it.get("usefulness_score")), pd is not None, pd or dt_date.min)
 
 
-class FetchFilteredItemsArgs():
-    source: Literal["arxiv", "blog", "gscholar", "all"] = Field(
-        ..., description='Which source(s) to read: "arxiv", "blog", "gscholar", or "all".'
-    )
-    min_usefulness_score: Optional[int] = Field(
-        None, ge=0, le=100, description="Keep items with usefulness_score >= this value."
-    )
-    date: Optional[str] = Field(
-        None, description='Keep items with publish_date >= this date. Format: "dd-mm-yyyy".'
-    )
+def _excluded_norm_urls() -> frozenset:
+    """Normalized URLs already tweeted (ledger) or waiting in the outbound post queue."""
+    from .tweet_ledger import get_ledger
+    from .post_queue import get_post_queue
+
+    return get_ledger().norm_urls() | get_post_queue().norm_urls()
 
 
 def fetch_filtered_items(
@@ -187,70 +122,45 @@ def fetch_filtered_items(
 ) -> Dict[str, Any]:
     """
     NEW STRUCTURE:
-      - Read every JSON object in ./saved except tweets.json (one file per entry).
+      - Query the SQLite index over ./saved (see result_store.py); only files added
+        since the last call are parsed, everything else is an indexed lookup.
       - Filter by requested origin (arxiv/blog/gscholar/all).
       - Apply usefulness_score and date filters.
-      - Exclude URLs already present in tweets.json (normalized).
+      - Exclude URLs already recorded in the tweets.jsonl ledger or queued for posting (normalized).
       - Sort by usefulness_score desc, then by publish_date desc (unknown last).
     """
-    all_items = _iter_saved_entries()
-
-    if source != "all":
-        wanted = source
-        all_items = [it for it in all_items if _entry_origin(it) == wanted]
-
-    sources_used = sorted({ _entry_origin(it) for it in all_items })
-
-    if source != "all" and not all_items:
-        return {
-            "results": [],
-            "meta": {
-                "error": f"No data found for source '{source}'. Expected individual JSON files in './saved/'.",
-                "sources_used": [],
-                "min_usefulness_score": min_usefulness_score,
-                "date_filter": date,
-                "returned": 0,
-            },
-        }
+    from .result_store import open_store
 
+    origin = None if source == "all" else source
     min_score = min_usefulness_score if min_usefulness_score is not None else None
     cutoff = _parse_input_date(date) if date else None
 
-    tweeted_entries = _load_tweets()
-    tweeted_norm = _tweet_norm_set(tweeted_entries)
-
-    filtered: List[Dict[str, Any]] = []
-    excluded_already_tweeted = 0
-
-    for it in all_items:
-        # usefulness filter
-        if min_score is not None:
-            try:
-                if int(it.get("usefulness_score", -1)) < min_score:
-                    continue
-            except Exception:
+    with open_store(SAVE_DIR) as store:
+        sources_used = store.origins(origin)
+
+        if source != "all" and not sources_used:
+            return {
+                "results": [],
+                "meta": {
+                    "error": f"No data found for source '{source}'. Expected individual JSON files in './saved/'.",
+                    "sources_used": [],
+                    "min_usefulness_score": min_usefulness_score,
+                    "date_filter": date,
+                    "returned": 0,
+                },
+            }
+
+        tweeted_norm = _excluded_norm_urls()
+
+        filtered: List[Dict[str, Any]] = []
+        excluded_already_tweeted = 0
+
+        for it, norm_url in store.query(origin, min_score, cutoff.isoformat() if cutoff else None):
+            # duplicate filter
+            if norm_url and norm_url in tweeted_norm:
+                excluded_already_tweeted += 1
                 continue
-
-        # date filter
-        if cutoff:
-            pub = _parse_publish_date(it.get("publish_date"))
-            if not pub or pub < cutoff:
-                continue
-
-        # duplicate filter
-        norm_url = _normalize_url(str(it.get("url", "")))
-        if norm_url and norm_url in tweeted_norm:
-            excluded_already_tweeted += 1
-            continue
-
-        filtered.append(it)
-
-    def _sort_key(x: Dict[str, Any]):
-        sc = _safe_int(x.get("usefulness_score"), -1)
-        pd = _parse_publish_date(x.get("publish_date"))
-        return (-sc, pd is None, pd or dt_date.min)
-
-    filtered.sort(key=_sort_key)
+            filtered.append(it)
 
     return {
         "results": filtered,
@@ -264,69 +174,117 @@ def fetch_filtered_items(
     }
 
 
-class SaveTweetArgs():
-    url: str = Field(..., description="The URL of the posted item.")
-    posting_reason: str = Field(
-        ..., description="Short reason for posting (e.g., why it was selected)."
-    )
+def iter_eligible_items(
+    source: Literal["arxiv", "blog", "gscholar", "all"],
+    min_usefulness_score: Optional[int] = None,
+    date: Optional[str] = None,
+    stats: Optional[Dict[str, int]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield the entries `fetch_filtered_items` would return, one at a time,
+    without building or sorting a list. Already-tweeted entries are skipped and
+    counted in `stats["already_tweeted_excluded"]` when a dict is passed.
+    """
+    from .result_store import open_store
 
+    origin = None if source == "all" else source
+    cutoff = _parse_input_date(date) if date else None
+    tweeted_norm = _excluded_norm_urls()
 
-def save_tweet(url: str, posting_reason: str) -> Dict[str, Any]:
+    with open_store(SAVE_DIR) as store:
+        for it, norm_url in store.query(origin, min_usefulness_score, cutoff.isoformat() if cutoff else None):
+            if norm_url and norm_url in tweeted_norm:
+                if stats is not None:
+                    stats["already_tweeted_excluded"] = stats.get("already_tweeted_excluded", 0) + 1
+                continue
+            yield it
+
+
+def select_top_k(
+    source: Literal["arxiv", "blog", "gscholar", "all"] = "all",
+    min_usefulness_score: Optional[int] = None,
+    date: Optional[str] = None,
+    mode: Literal["score", "date"] = "score",
+    k: int = 1,
+) -> Dict[str, Any]:
     """
-    Record a tweeted item in ./saved/tweets.json with fields:
-      { "tweets": [ { "url": <url>, "posting_reason": <str> }, ... ] }
-    Prevents duplicates using normalized URLs (handles arXiv URL variants).
+    Best `k` eligible (filtered, not yet tweeted) entries in one streaming pass.
+
+    Two bounded heaps of size k are filled at once, one per ordering, so the
+    fallback is available without a second scan (in score mode the scan stops
+    after k entries, as the index yields them in score order):
+      - mode "score": highest usefulness_score; if even the best has no valid
+        score, falls back to the most recent entries ("date_fallback").
+      - mode "date": most recent publish_date; if even the best has no date,
+        falls back to the highest scores ("score_fallback").
+
+    Returns {"results": [...best first...], "meta": {..., "selection_mode": ...}}.
     """
-    entries = _load_tweets()
-    norm_existing = _tweet_norm_set(entries)
-    norm_new = _normalize_url(url)
-
-    if norm_new in norm_existing:
-        existing = next((e for e in entries if _normalize_url(e.get("url", "")) == norm_new), None)
-        return {"status": "duplicate", "entry": existing or {"url": url, "posting_reason": ""}}
-
-    new_entry = {"url": url, "posting_reason": posting_reason}
-    entries.append(new_entry)
-    _save_tweets(entries)
-    return {"status": "saved", "entry": new_entry}
-
-
-def post_to_X(
-    consumer_key: str,
-    consumer_secret: str,
-    access_token: str,
-    access_token_secret: str,
-    content: str
-) -> str:
+    primary, fallback = (_date_key, _score_key) if mode == "date" else (_score_key, _date_key)
+    heaps: Tuple[list, list] = ([], [])
+    stats: Dict[str, int] = {"already_tweeted_excluded": 0}
+    considered = 0
+
+    for i, it in enumerate(iter_eligible_items(source, min_usefulness_score, date, stats)):
+        considered += 1
+        for heap, key_fn in zip(heaps, (primary, fallback)):
+            # -i: earlier entries win ties, like max(); it also keeps the dicts from being compared
+            item = (key_fn(it), -i, it)
+            if len(heap) < k:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+        # the index already yields entries in _score_key order, so in score mode the
+        # first k are the answer unless the fallback is needed
+        if mode != "date" and considered >= k and max(heaps[0])[0][0] >= 0:
+            break
+
+    best, best_fallback = ([it for *_, it in sorted(h, reverse=True)] for h in heaps)
+    selection = mode
+    if best and mode == "date" and entry_date(best[0]) is None:
+        best, selection = best_fallback, "score_fallback"
+    elif best and mode != "date" and _safe_int(best[0].get("usefulness_score")) < 0:
+        best, selection = best_fallback, "date_fallback"
+
+    meta = {
+        "source": source,
+        "min_usefulness_score": min_usefulness_score,
+        "date_filter": date,
+        "considered": considered,
+        "already_tweeted_excluded": stats["already_tweeted_excluded"],
+        "returned": len(best),
+        "selection_mode": selection if best else "none",
+    }
+    return {"results": best, "meta": meta}
+
+
+def save_tweet(url: str, posting_reason: str) -> Dict[str, Any]:
     """
-    Posts a message to X using the Tweepy library.
+    Record a tweeted item in the append-only ./saved/tweets.jsonl ledger, one line per item:
+      { "url": <url>, "norm_url": <normalized url>, "posting_reason": <str>, "posted_at": <iso utc> }
+    Prevents duplicates using normalized URLs (handles arXiv URL variants).
     """
-    if not all(isinstance(arg, str) for arg in [consumer_key, consumer_secret, access_token, access_token_secret, content]):
-        return "Error posting to X: All arguments must be strings"
-    
-    if not all([consumer_key, consumer_secret, access_token, access_token_secret]):
-        return "Error posting to X: Credentials cannot be empty"
-    
-    if not content:
-        return "Error posting to X: Content cannot be empty"
-    
-    if len(content) > 280:
-        return "Error posting to X: Content cannot be more than 280 characters. Try with shorter Content."
-    
-    try:
-        x_client = tweepy.Client(
-            consumer_key=consumer_key,
-            consumer_secret=consumer_secret,
-            access_token=access_token,
-            access_token_secret=access_token_secret
-        )
-    except Exception as e:
-        return f"Error initializing X client: {str(e)}"
-    
-    try:
-        x_client.create_tweet(text=content)
-        return "Successfully posted to X"
-    except tweepy.TweepyException as e:
-        return f"Error posting to X: {str(e)}"
-    except Exception as e:
-        return f"Unexpected error posting to X: {str(e)}"
+    from .tweet_ledger import get_ledger
+
+    status, entry = get_ledger().record(url, posting_reason)
+    return {"status": status, "entry": entry}
+
+
+_x_clients: Dict[tuple, Any] = {}
+_x_clients_lock = threading.Lock()
+
+
+def get_x_client(consumer_key: str, consumer_secret: str, access_token: str, access_token_secret: str):
+    """One authenticated tweepy.Client (and HTTP session) per credential set, reused for every post."""
+    import tweepy  # only the X node posts; keeps tweepy (and requests) out of every import of this module
+
+    key = (consumer_key, consumer_secret, access_token, access_token_secret)
+    with _x_clients_lock:
+        if key not in _x_clients:
+            _x_clients[key] = tweepy.Client(
+                consumer_key=consumer_key,
+                consumer_secret=consumer_secret,
+                access_token=access_token,
+                access_token_secret=access_token_secret
+            )
+        return _x_clients[key]
@@ -1,18 +1,62 @@
-import os, re, json, arxiv
+import os, re, json, time, arxiv, asyncio, logging, threading
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import Union, List, Dict, Optional
+from datetime import timezone
+from concurrent.futures import ThreadPoolExecutor
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+from typing import Any, Union, List, Dict, Iterable, Optional, Callable, Tuple
 
 # from langchain.tools import tool
 from langchain_core.tools import tool 
 from serpapi import GoogleSearch
+import requests
+from pydantic import PrivateAttr
+import langchain_tavily
 from langchain_tavily import TavilySearch
+from langchain_tavily._utilities import TavilySearchAPIWrapper, TAVILY_API_URL
 
-from ..utils.utils import normalize_url
+from ..utils.utils import normalize_url, RateLimiter
+from ..utils.kv_cache import KVCache
+from ..utils.dates import to_iso
+from ..utils.cancellation import check_cancelled
+from .result_store import open_store, entry_identity
+from .packed_store import PackedStore, row_key, shard_name
 
 
 
 SAVE_DIR = "saved"
+# Where new entries are written: "files" (one JSON file per entry) or "packed"
+# (monthly compressed shards under saved/packed, see packed_store.py). Both are always read.
+STORAGE_BACKEND = "files"
+
+# Google Scholar (SerpAPI) fetching
+SCHOLAR_MAX_WORKERS = 4
+SCHOLAR_REQUESTS_PER_SECOND = 4
+# A citation's abstract, date and link never change, so cached citations never expire
+CITATION_CACHE_FILE = Path(SAVE_DIR) / "cache" / "scholar_citations.sqlite"
+
+# arXiv API client settings (one shared client per page size, see get_arxiv_client)
+ARXIV_PAGE_SIZE = 100
+ARXIV_DELAY_SECONDS = 3.0
+ARXIV_NUM_RETRIES = 5
+# On-disk cache of arXiv search responses, keyed by query (including its date window)
+ARXIV_CACHE_ENABLED = True
+ARXIV_CACHE_FILE = Path(SAVE_DIR) / "cache" / "arxiv_responses.sqlite"
+ARXIV_CACHE_TTL_SECONDS = 6 * 3600
+
+# Newest `published` timestamp seen per (field, query) by incremental arXiv harvesting
+ARXIV_WATERMARKS_FILE = Path(SAVE_DIR) / "cache" / "arxiv_watermarks.json"
+ARXIV_DATE_FMT = "%Y%m%d%H%M%S"
+
+# Tavily blog search: concurrent queries per batch and per-request timeout (seconds)
+TAVILY_MAX_WORKERS = 4
+TAVILY_TIMEOUT_SECONDS = 60
+# langchain-tavily release _SessionTavilyWrapper was checked against (pinned in requirements.txt).
+# It overrides the wrapper's raw_results / raw_results_async, which are not a public API, so any
+# other installed release gets the stock wrapper instead (no shared session, no date window).
+TAVILY_WRAPPER_VERSION = "0.2.7"
+
+# Serializes the duplicate check and the write so parallel nodes cannot both save the same work
+_SAVE_LOCK = threading.Lock()
 
 class SaveToJSONArgs(BaseModel):
     """Arguments for the save_to_json tool."""
@@ -64,19 +108,59 @@ def save_to_json(json_string: str, file_name: str) -> str:
     - Sanitizes `file_name` to avoid path traversal and illegal names.
     - Enforces a '.json' extension.
     - If a file with the same name already exists, returns an error and does NOT overwrite.
+    - If the same work is already saved under another name (same normalized URL / arXiv id,
+      DOI, or title + year), returns an error and does NOT write a second copy.
 
     Returns:
       A human-readable status message describing success or the specific error.
     """
-    base = _sanitize_filename(file_name)
-    if not base:
-        return "ERROR: Invalid `file_name`. Provide a simple base name without paths or reserved characters."
-
     try:
         data = json.loads(json_string)
     except json.JSONDecodeError as e:
         return f"ERROR: `json_string` is not valid JSON: {e}"
 
+    return write_json_entry(data, file_name)
+
+
+def _write_temp_json(path: str, data) -> str:
+    """Write `data` to a hidden, fsynced temp file next to `path` (removed on failure); returns its path."""
+    tmp = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return tmp
+
+
+def _write_json_atomic(path: str, data) -> None:
+    """Write `data` to `path` so that the file is either complete or absent."""
+    os.replace(_write_temp_json(path, data), path)
+
+
+def _with_iso_date(data):
+    if isinstance(data, dict) and "publish_date" in data:
+        # normalized once here so readers never parse free-form dates again
+        return {**data, "publish_date_iso": to_iso(data.get("publish_date"))}
+    return data
+
+
+def write_json_entry(data, file_name: str) -> str:
+    """
+    Library counterpart of `save_to_json` for already-parsed data.
+
+    Sanitizes `file_name`, refuses to overwrite an existing file and returns the
+    same "OK: ..." / "ERROR: ..." status strings as the tool. The file is written
+    to a temp file and renamed, so it is either complete or absent.
+    """
+    base = _sanitize_filename(file_name)
+    if not base:
+        return "ERROR: Invalid `file_name`. Provide a simple base name without paths or reserved characters."
+
     try:
         os.makedirs(SAVE_DIR, exist_ok=True)
     except OSError as e:
@@ -84,16 +168,168 @@ def save_to_json(json_string: str, file_name: str) -> str:
 
     target_path = os.path.join(SAVE_DIR, f"{base}.json")
 
-    if os.path.exists(target_path):
-        return f"ERROR: File '{base}.json' already exists in '{SAVE_DIR}'. No file was written."
+    with _SAVE_LOCK:
+        check_cancelled("save_to_json")
+        with open_store(Path(SAVE_DIR)) as store:
+            if os.path.exists(target_path) or store.has_name(f"{base}.json"):
+                return f"ERROR: File '{base}.json' already exists in '{SAVE_DIR}'. No file was written."
+            # url-less entries need the DOI / title + year checks the most
+            duplicate = store.find_duplicate(data) if isinstance(data, dict) else None
+        if duplicate:
+            existing, matched_on = duplicate
+            return (f"ERROR: This entry is already saved as '{existing}' (same {matched_on}). "
+                    f"No file was written.")
+
+        try:
+            if STORAGE_BACKEND == "packed":
+                saved_at = time.time()
+                PackedStore(Path(SAVE_DIR)).append([(f"{base}.json", _with_iso_date(data), saved_at)])
+                target_path = os.path.join(SAVE_DIR, row_key(shard_name(saved_at), f"{base}.json"))
+            else:
+                _write_json_atomic(target_path, _with_iso_date(data))
+        except OSError as e:
+            return f"ERROR: Failed to write file '{target_path}': {e}"
+
+    return f"OK: Saved JSON to '{target_path}'."
+
+
+class ResearchEntry(BaseModel):
+    """Schema of a saved research entry (extra keys are kept as they are)."""
+    model_config = ConfigDict(extra="allow")
+
+    source: str = Field(..., min_length=1)
+    title: str = Field(..., min_length=1)
+    authors: List[str] = Field(default_factory=list)
+    publish_date: str = "unknown"
+    summary: str = ""
+    url: str = Field(..., min_length=1)
+    usefulness_score: int = Field(..., ge=0, le=100)
+    usefulness_reason: str = ""
+
+    @field_validator("authors", mode="before")
+    @classmethod
+    def _split_authors(cls, v):
+        return [a.strip() for a in v.split(",") if a.strip()] if isinstance(v, str) else v
+
+
+def write_json_entries(entries: List[Any], file_names: List[str]) -> Dict[str, List]:
+    """
+    Save many entries in one batch: every entry is validated against ResearchEntry
+    and checked for duplicates (against saved entries and within the batch) first,
+    then all files are written to temp files and renamed into place only once every
+    write succeeded (or, with STORAGE_BACKEND "packed", appended to the month's shard
+    in one commit). Nothing is written if any write fails, or once the calling node
+    has timed out (NodeCancelled, see utils/cancellation.py).
+
+    Returns {"saved": [path, ...], "duplicates": [(file_name, reason), ...],
+             "invalid": [(file_name, error), ...]}.
+    """
+    report: Dict[str, List] = {"saved": [], "duplicates": [], "invalid": []}
+    if len(entries) != len(file_names):
+        raise ValueError(f"{len(entries)} entries but {len(file_names)} file names")
+
+    os.makedirs(SAVE_DIR, exist_ok=True)
+    with _SAVE_LOCK:
+        check_cancelled("save_many")
+        accepted: List[Tuple[str, Dict]] = []
+        batch_keys: Dict[Tuple[str, str], str] = {}
+        with open_store(Path(SAVE_DIR)) as store:
+            for raw, file_name in zip(entries, file_names):
+                base = _sanitize_filename(file_name)
+                if not base:
+                    report["invalid"].append((file_name, "invalid file name"))
+                    continue
+                try:
+                    entry = ResearchEntry.model_validate(raw).model_dump()
+                except ValidationError as e:
+                    errors = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+                    report["invalid"].append((file_name, errors))
+                    continue
+
+                target_path = os.path.join(SAVE_DIR, f"{base}.json")
+                if os.path.exists(target_path) or store.has_name(f"{base}.json") or ("file", base) in batch_keys:
+                    report["duplicates"].append((file_name, f"file '{base}.json' already exists"))
+                    continue
+                duplicate = store.find_duplicate(entry)
+                if duplicate:
+                    report["duplicates"].append((file_name, f"already saved as '{duplicate[0]}' (same {duplicate[1]})"))
+                    continue
+                ident = entry_identity(entry)
+                keys = [("file", base)] + [(k, ident[k]) for k in ("norm_url", "doi") if ident[k]]
+                if ident["year"] and ident["title_key"]:
+                    keys.append(("title", f"{ident['year']}:{ident['title_key']}"))
+                seen = next((k for k in keys if k in batch_keys), None)
+                if seen:
+                    report["duplicates"].append((file_name, f"same {seen[0]} as '{batch_keys[seen]}' in this batch"))
+                    continue
+                batch_keys.update((k, file_name) for k in keys)
+                accepted.append((target_path, _with_iso_date(entry)))
+
+        if STORAGE_BACKEND == "packed":
+            saved_at = time.time()
+            PackedStore(Path(SAVE_DIR)).append(
+                [(os.path.basename(path), entry, saved_at) for path, entry in accepted]
+            )
+            shard = shard_name(saved_at)
+            report["saved"] = [os.path.join(SAVE_DIR, row_key(shard, os.path.basename(path))) for path, _ in accepted]
+            return report
+
+        tmp_paths = []
+        try:
+            for target_path, entry in accepted:
+                tmp_paths.append(_write_temp_json(target_path, entry))
+        except BaseException:
+            for tmp in tmp_paths:
+                os.remove(tmp)
+            raise
+        for tmp, (target_path, _) in zip(tmp_paths, accepted):
+            os.replace(tmp, target_path)
+            report["saved"].append(target_path)
+
+    return report
+
+
+class SaveManyArgs(BaseModel):
+    """Arguments for the save_many tool."""
+    json_string: str = Field(..., description="A JSON array of entry objects to save.")
+    file_names: List[str] = Field(
+        ...,
+        description="One base file name (without path) per entry, in the same order as the array.",
+    )
+
+
+@tool("save_many", args_schema=SaveManyArgs)
+def save_many(json_string: str, file_names: List[str]) -> str:
+    """
+    Save several entries at once, each as 'saved/<file_name>.json'.
+
+    Behavior:
+    - Validates every entry (source, title, url and an integer usefulness_score 0-100 are required).
+    - Skips entries whose file already exists or that are already saved (same normalized URL /
+      arXiv id, DOI, or title + year), including duplicates within the same call.
+    - Writes all remaining entries together; either every one of them is written or none is.
 
+    Returns:
+      A status message with the number saved and the reason for every entry that was not.
+    """
     try:
-        with open(target_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        entries = json.loads(json_string)
+    except json.JSONDecodeError as e:
+        return f"ERROR: `json_string` is not valid JSON: {e}"
+    if not isinstance(entries, list):
+        return "ERROR: `json_string` must be a JSON array of entry objects."
+    if len(entries) != len(file_names):
+        return f"ERROR: Got {len(entries)} entries but {len(file_names)} file names; provide one file name per entry."
+
+    try:
+        report = write_json_entries(entries, file_names)
     except OSError as e:
-        return f"ERROR: Failed to write file '{target_path}': {e}"
+        return f"ERROR: Failed to write entries, nothing was saved: {e}"
 
-    return f"OK: Saved JSON to '{target_path}'."
+    lines = [f"OK: Saved {len(report['saved'])} of {len(entries)} entries to '{SAVE_DIR}'."]
+    lines += [f"- skipped '{name}': {reason}" for name, reason in report["duplicates"]]
+    lines += [f"- invalid '{name}': {error}" for name, error in report["invalid"]]
+    return "\n".join(lines)
 
 
 @tool
@@ -200,31 +436,7 @@ def ArxivTool(query: str, max_results: int = 5) -> str:
         })
 
     try:
-        client = arxiv.Client()
-        search = arxiv.Search(
-            query=query,
-            max_results=max_results,
-            sort_by=arxiv.SortCriterion.SubmittedDate,
-            sort_order=arxiv.SortOrder.Descending
-        )
-
-        results = []
-        for result in client.results(search):
-            publish_date = result.published
-            formatted_date = publish_date.strftime("%d-%m-%Y")
-
-            authors = [author.name for author in result.authors]
-            summary = result.summary[:500] 
-
-            entry = {
-                "source": "arxiv",
-                "title": result.title,
-                "authors": authors if authors else ["Unknown"],
-                "publish_date": formatted_date,
-                "summary": summary,
-                "url": result.entry_id
-            }
-            results.append(entry)
+        results = [_arxiv_entry(r) for r in search_arxiv(query, max_results)]
 
         if not results:
             return json.dumps({
@@ -241,10 +453,267 @@ def ArxivTool(query: str, max_results: int = 5) -> str:
         })
 
 
+_arxiv_clients: Dict[Tuple, Tuple[arxiv.Client, threading.Lock]] = {}
+_arxiv_clients_lock = threading.Lock()
+
+
+def get_arxiv_client(
+    page_size: int = ARXIV_PAGE_SIZE,
+    delay_seconds: float = ARXIV_DELAY_SECONDS,
+    num_retries: int = ARXIV_NUM_RETRIES,
+) -> Tuple[arxiv.Client, threading.Lock]:
+    """
+    Shared arxiv.Client per configuration, with the lock that serializes its use.
+
+    Reusing one client keeps its HTTP session warm and makes the API politeness
+    delay apply across all queries of a run instead of per fresh client.
+    """
+    key = (page_size, delay_seconds, num_retries)
+    with _arxiv_clients_lock:
+        if key not in _arxiv_clients:
+            client = arxiv.Client(page_size=page_size, delay_seconds=delay_seconds, num_retries=num_retries)
+            _arxiv_clients[key] = (client, threading.Lock())
+        return _arxiv_clients[key]
+
+
+# Upper end of a submittedDate window, "TO YYYYMMDDHHMMSS]"
+_ARXIV_WINDOW_END = re.compile(r"(\bTO\s+\d{8})\d{6}(\s*\])")
+
+
+def _arxiv_cache_key(query: str, max_results: Optional[int], ascending: bool) -> str:
+    """Cache key of a search: the window's end is cut to its day, as callers pass "now" to the second."""
+    return json.dumps([_ARXIV_WINDOW_END.sub(r"\1\2", query), max_results, ascending])
+
+
+def search_arxiv(
+    query: str,
+    max_results: Optional[int],
+    ascending: bool = False,
+    use_cache: bool = ARXIV_CACHE_ENABLED,
+) -> List[Dict]:
+    """
+    Papers matching `query` sorted by submission date (newest first unless `ascending`).
+
+    Returns records as produced by `_arxiv_record` (entry fields plus the UTC
+    "published" stamp). Responses are cached on disk for ARXIV_CACHE_TTL_SECONDS;
+    the date window is part of `query`, so it is part of the cache key (its end
+    only to the day, see _arxiv_cache_key, so runs within the TTL share entries).
+    """
+    key = _arxiv_cache_key(query, max_results, ascending)
+    if use_cache:
+        with KVCache(ARXIV_CACHE_FILE, ttl_seconds=ARXIV_CACHE_TTL_SECONDS) as cache:
+            cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    # never download a bigger page than the caller asked for
+    page_size = min(ARXIV_PAGE_SIZE, max_results) if max_results else ARXIV_PAGE_SIZE
+    client, lock = get_arxiv_client(page_size)
+    search = arxiv.Search(
+        query=query,
+        max_results=max_results,
+        sort_by=arxiv.SortCriterion.SubmittedDate,
+        sort_order=arxiv.SortOrder.Ascending if ascending else arxiv.SortOrder.Descending
+    )
+    with lock:
+        records = [_arxiv_record(r) for r in client.results(search)]
+
+    if use_cache:
+        with KVCache(ARXIV_CACHE_FILE, ttl_seconds=ARXIV_CACHE_TTL_SECONDS) as cache:
+            cache.put(key, records)
+            cache.evict()
+    return records
+
+
+def merge_arxiv_queries(queries: List[str]) -> str:
+    """['all:"A"', 'all:"B"'] -> '((all:"A") OR (all:"B"))': one API search instead of one per topic."""
+    queries = list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))
+    if len(queries) == 1:
+        return queries[0]
+    return "(" + " OR ".join(f"({q})" for q in queries) + ")"
+
+
+def _arxiv_record(result: arxiv.Result) -> Dict:
+    authors = [author.name for author in result.authors]
+    return {
+        "source": "arxiv",
+        "title": result.title,
+        "authors": authors if authors else ["Unknown"],
+        "publish_date": result.published.strftime("%d-%m-%Y"),
+        "summary": result.summary[:500],
+        "url": result.entry_id,
+        "published": result.published.astimezone(timezone.utc).strftime(ARXIV_DATE_FMT),
+    }
+
+
+def _arxiv_entry(record: Dict) -> Dict:
+    """The record without its internal "published" stamp, i.e. the ArxivTool output entry."""
+    return {k: v for k, v in record.items() if k != "published"}
+
+
+class ArxivWatermarks:
+    """
+    Persisted high-water marks for incremental arXiv harvesting:
+      {"<field>": {"<query>": "YYYYMMDDHHMMSS", ...}, ...}
+    Each value is the newest `published` timestamp already harvested for that query.
+    """
+
+    def __init__(self, path: Path = ARXIV_WATERMARKS_FILE):
+        self.path = Path(path)
+        try:
+            self.data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            self.data = {}
+
+    def get(self, field: str, query: str) -> Optional[str]:
+        return self.data.get(field, {}).get(query)
+
+    def advance(self, field: str, query: str, stamp: str) -> None:
+        """Move the mark forward to `stamp` (never backwards)."""
+        current = self.get(field, query)
+        if current is None or stamp > current:
+            self.data.setdefault(field, {})[query] = stamp
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.data, indent=2, ensure_ascii=False, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def harvest_arxiv(
+    query: str,
+    field: str,
+    start_date: str,
+    end_date: str,
+    first_run_results: int,
+    limit: int,
+    watermarks: Optional[ArxivWatermarks] = None,
+) -> Tuple[str, Optional[str]]:
+    """
+    Incremental arXiv search for one (field, query).
+
+    - No watermark yet: the newest `first_run_results` papers in [start_date TO end_date].
+    - Otherwise: every paper in [watermark TO end_date], oldest first and paged up to
+      `limit`, so a burst larger than `limit` is picked up by the next run instead of lost.
+
+    Returns (ArxivTool-style JSON string, newest published stamp or None). The caller
+    advances the watermark with that stamp once the results have been processed.
+    """
+    watermarks = watermarks or ArxivWatermarks()
+    mark = watermarks.get(field, query)
+
+    try:
+        if mark:
+            found = search_arxiv(f"{query} AND submittedDate: [{mark} TO {end_date}]", limit, ascending=True)
+        else:
+            found = search_arxiv(f"{query} AND submittedDate: [{start_date} TO {end_date}]", first_run_results)
+    except Exception as e:
+        return json.dumps({"results": [], "error": f"Error querying ArXiv: {str(e)}"}), None
+
+    if not found:
+        return json.dumps({"results": [], "error": f"No new papers found for query '{query}'"}), None
+
+    newest = max(r["published"] for r in found)
+    return json.dumps({"results": [_arxiv_entry(r) for r in found]}, ensure_ascii=False), newest
+
+
+class _SessionTavilyWrapper(TavilySearchAPIWrapper):
+    """
+    TavilySearchAPIWrapper that posts through one shared requests.Session
+    (keep-alive across queries) and forwards the start/end date window,
+    which TavilySearch itself has no fields for.
+    """
+
+    _session: requests.Session = PrivateAttr(default_factory=requests.Session)
+    _start_date: Optional[str] = PrivateAttr(default=None)
+    _end_date: Optional[str] = PrivateAttr(default=None)
+
+    def _request(self, query: str, kwargs: Dict) -> Tuple[str, Dict, Dict]:
+        params = {"query": query, **kwargs, "start_date": self._start_date, "end_date": self._end_date}
+        params = {k: v for k, v in params.items() if v is not None}
+        headers = {
+            "Authorization": f"Bearer {self.tavily_api_key.get_secret_value()}",
+            "Content-Type": "application/json",
+            "X-Client-Source": "langchain-tavily",
+        }
+        return f"{self.api_base_url or TAVILY_API_URL}/search", params, headers
+
+    @staticmethod
+    def _error(status: int, body: Any) -> ValueError:
+        detail = body.get("detail", {}) if isinstance(body, dict) else {}
+        error_message = detail.get("error") if isinstance(detail, dict) else "Unknown error"
+        return ValueError(f"Error {status}: {error_message}")
+
+    def raw_results(self, query: str, **kwargs) -> Dict:
+        url, params, headers = self._request(query, kwargs)
+        response = self._session.post(url, json=params, headers=headers, timeout=TAVILY_TIMEOUT_SECONDS)
+        if response.status_code != 200:
+            raise self._error(response.status_code, response.json())
+        return response.json()
+
+    async def raw_results_async(self, query: str, **kwargs) -> Dict:
+        """Same request over aiohttp (what TavilySearch.ainvoke calls); one session per call, like the parent class."""
+        import aiohttp
+        url, params, headers = self._request(query, kwargs)
+        timeout = aiohttp.ClientTimeout(total=TAVILY_TIMEOUT_SECONDS)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.post(url, json=params, headers=headers) as response:
+                body = await response.json(content_type=None)
+                if response.status != 200:
+                    raise self._error(response.status, body)
+                return body
+
+
+def _tavily_wrapper(api_key: str, start_date: Optional[str], end_date: Optional[str]) -> TavilySearchAPIWrapper:
+    if langchain_tavily.__version__ != TAVILY_WRAPPER_VERSION:
+        logging.warning(
+            f"langchain-tavily {langchain_tavily.__version__} installed, session wrapper checked against "
+            f"{TAVILY_WRAPPER_VERSION}; using the stock Tavily wrapper (start/end dates are not applied)."
+        )
+        return TavilySearchAPIWrapper(tavily_api_key=api_key)
+    wrapper = _SessionTavilyWrapper(tavily_api_key=api_key)
+    wrapper._start_date, wrapper._end_date = start_date, end_date
+    return wrapper
+
+
+_tavily_clients: Dict[Tuple, TavilySearch] = {}
+_tavily_clients_lock = threading.Lock()
+
+
+def get_tavily_client(
+    api_key: str,
+    domains_included: Optional[List[str]],
+    start_date: Optional[str],
+    end_date: Optional[str],
+    max_results: int = 5,
+) -> TavilySearch:
+    """
+    Shared TavilySearch per (api_key, domains, date window, max_results).
+
+    The key is handed to the client directly, so nothing is written to
+    os.environ, and repeated queries reuse the same HTTP session.
+    """
+    domains = tuple(domains_included or ())
+    key = (api_key, domains, start_date, end_date, max_results)
+    with _tavily_clients_lock:
+        client = _tavily_clients.get(key)
+        if client is None:
+            client = TavilySearch(
+                api_wrapper=_tavily_wrapper(api_key, start_date, end_date),
+                max_results=max_results,
+                search_depth='advanced',
+                include_domains=list(domains) or None,
+                topic="general",
+            )
+            _tavily_clients[key] = client
+    return client
+
+
 @tool
 def tavily_tool(query, tavily_api_key, domains_included, start_date, end_date, max_results = 5) -> str:
     """
-    Creates and returns a configured instance of TavilySearch tool.
+    Searches the web with a (cached) configured TavilySearch client.
 
     Args:
         query (str) : Search string to search in web.
@@ -256,43 +725,125 @@ def tavily_tool(query, tavily_api_key, domains_included, start_date, end_date, m
     Returns:
         str : search results as string.
     """
-    os.environ["TAVILY_API_KEY"] = tavily_api_key 
-    
-    tavily_tool = TavilySearch(
-        max_results=max_results,
-        api_key=tavily_api_key,
-        search_depth = 'advanced',
-        include_domains=domains_included,
-        topic = "general",
-        start_date = start_date,
-        end_date= end_date,
-    )
-    return tavily_tool.invoke(query)
+    client = get_tavily_client(tavily_api_key, domains_included, start_date, end_date, max_results)
+    return client.invoke(query)
 
 
-@tool
-def get_scholar_papers(author_ids: List[str], scholar_max_results: int, api_key: str) -> Union[List[Dict], Dict]:
+async def atavily_search(query, tavily_api_key, domains_included, start_date, end_date, max_results=5):
+    """`tavily_tool` awaited over aiohttp, on the same cached client."""
+    client = get_tavily_client(tavily_api_key, domains_included, start_date, end_date, max_results)
+    return await client.ainvoke(query)
+
+
+def _merge_tavily(outputs: Iterable[Tuple[str, Any]]) -> Dict[str, Any]:
+    """Merge (query, TavilySearch output or {"error": ...}) pairs by normalized URL, best score first."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    errors = []
+    for query, out in outputs:
+        if out.get("error"):
+            errors.append({"query": query, "error": str(out["error"])})
+        for r in out.get("results", []):
+            if not isinstance(r, dict) or not r.get("url"):
+                continue
+            key = normalize_url(r["url"])
+            if key not in merged or (r.get("score") or 0) > (merged[key].get("score") or 0):
+                merged[key] = r
+
+    results = sorted(merged.values(), key=lambda r: r.get("score") or 0, reverse=True)
+    return {"results": results, "errors": errors}
+
+
+def tavily_search_many(
+    queries: List[str],
+    api_key: str,
+    domains_included: Optional[List[str]],
+    start_date: Optional[str],
+    end_date: Optional[str],
+    max_results: int = 5,
+    max_workers: int = TAVILY_MAX_WORKERS,
+) -> Dict[str, Any]:
     """
-    Fetches recent papers for a list of Google Scholar author IDs using SerpAPI.
-    Returns a combined list of dicts with title, link, authors, publish_date, url, and abstract.
-    If an error occurs for a specific author, includes it in the results.
+    Run several blog queries concurrently on one shared client and merge the hits.
 
-    Args:
-        author_ids (List[str]): List of Google Scholar author IDs
-        api_key (str): SerpAPI key
-        max_scholar_results (int): Max results per author
+    Results are merged by normalized URL, keeping the copy with the higher Tavily
+    score, and returned best-first in the same shape as a single `tavily_tool`
+    call ({"results": [...]}), plus an "errors" list of per-query failures.
+    """
+    client = get_tavily_client(api_key, domains_included, start_date, end_date, max_results)
 
-    Returns:
-        Union[List[Dict], Dict]: List of papers or error message
+    def run(query: str):
+        try:
+            out = client.invoke(query)
+        except Exception as e:
+            return query, {"error": str(e)}
+        return query, out if isinstance(out, dict) else {"error": str(out)}
+
+    queries = list(dict.fromkeys(q for q in queries if q))
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(queries) or 1))) as pool:
+        return _merge_tavily(pool.map(run, queries))
+
+
+async def atavily_search_many(
+    queries: List[str],
+    api_key: str,
+    domains_included: Optional[List[str]],
+    start_date: Optional[str],
+    end_date: Optional[str],
+    max_results: int = 5,
+    max_concurrency: int = TAVILY_MAX_WORKERS,
+) -> Dict[str, Any]:
+    """`tavily_search_many` on the event loop: the queries are awaited together over aiohttp."""
+    client = get_tavily_client(api_key, domains_included, start_date, end_date, max_results)
+    limit = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(query: str):
+        async with limit:
+            try:
+                out = await client.ainvoke(query)
+            except Exception as e:
+                return query, {"error": str(e)}
+        return query, out if isinstance(out, dict) else {"error": str(out)}
+
+    queries = list(dict.fromkeys(q for q in queries if q))
+    return _merge_tavily(await asyncio.gather(*(run(q) for q in queries)))
+
+
+def _serpapi_search(params: Dict) -> Dict:
+    return GoogleSearch(params).get_dict()
+
+
+def fetch_scholar_papers(
+    author_ids: List[str],
+    scholar_max_results: int,
+    api_key: str,
+    search: Optional[Callable[[Dict], Dict]] = None,
+    max_workers: int = SCHOLAR_MAX_WORKERS,
+    requests_per_second: float = SCHOLAR_REQUESTS_PER_SECOND,
+    cache_file: Optional[Path] = CITATION_CACHE_FILE,
+) -> Union[List[Dict], Dict]:
     """
-    ABSTRACT_ENABLED = True
+    Library implementation behind `get_scholar_papers`.
+
+    Author lists are requested concurrently, then every citation that is not in
+    the persistent per-`citation_id` cache is requested concurrently as well, all
+    through one bounded thread pool and a shared rate limiter. A repeat run over
+    the same authors therefore costs one call per author plus one per new citation.
 
+    `search` maps SerpAPI params to the response dict (defaults to GoogleSearch),
+    so a stub can stand in for SerpAPI. `cache_file=None` disables the cache.
+    """
     if not api_key:
         return {"error": "Missing SERP_API key."}
 
-    all_papers = []
+    search = search or _serpapi_search
+    limiter = RateLimiter(requests_per_second)
+    cache = KVCache(cache_file) if cache_file else None
+
+    def limited(params: Dict) -> Dict:
+        limiter.wait()
+        return search(params)
 
-    for author_id in author_ids:
+    def fetch_author(author_id: str) -> Dict:
         params = {
             "engine": "google_scholar_author",
             "author_id": author_id,
@@ -300,43 +851,92 @@ def get_scholar_papers(author_ids: List[str], scholar_max_results: int, api_key:
             "num": scholar_max_results,
             "sort": "pubdate"
         }
-
         try:
-            search = GoogleSearch(params)
-            results = search.get_dict()
+            return {"articles": limited(params).get("articles", [])}
+        except Exception as e:
+            return {"error": f"Failed to fetch data: {str(e)}"}
 
-            for article in results.get("articles", []):
+    def fetch_citation(citation_id: str) -> Dict:
+        params_citation = {
+            "engine": "google_scholar_author",
+            "view_op": "view_citation",
+            "citation_id": citation_id,
+            "api_key": api_key }
+        citation = limited(params_citation).get("citation") or {}
+        return {
+            "abstract": citation["description"],
+            "publish_date": citation["publication_date"],
+            "link": citation["link"],
+        }
 
-                citation_id = article.get("citation_id")
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scholar") as pool:
+            authors = list(pool.map(fetch_author, author_ids))
+
+            citation_ids = list(dict.fromkeys(
+                a.get("citation_id")
+                for res in authors for a in res.get("articles", []) if a.get("citation_id")
+            ))
+            citations = cache.get_many(citation_ids) if cache else {}
+            missing = [c for c in citation_ids if c not in citations]
+            futures = {c: pool.submit(fetch_citation, c) for c in missing}
+
+            failures = {}
+            for citation_id, future in futures.items():
+                try:
+                    citations[citation_id] = future.result()
+                    if cache:
+                        cache.put(citation_id, citations[citation_id])
+                except Exception as e:
+                    failures[citation_id] = f"Failed to fetch citation {citation_id}: {str(e)}"
+    finally:
+        if cache:
+            cache.close()
+
+    print(f"Google Scholar: {len(author_ids)} author calls, {len(citation_ids) - len(missing)} citations "
+          f"from cache, {len(missing)} fetched ({len(failures)} failed)")
+
+    all_papers = []
+    for author_id, res in zip(author_ids, authors):
+        if "error" in res:
+            all_papers.append({"source": "Gscholar", "author_id": author_id, "error": res["error"]})
+            continue
+
+        for article in res["articles"]:
+            citation_id = article.get("citation_id")
+            if citation_id in failures:
+                all_papers.append({"source": "Gscholar", "author_id": author_id, "error": failures[citation_id]})
+                continue
+            citation = citations.get(citation_id)
+            if citation is None:
+                continue
 
-                params_citation = {
-                    "engine": "google_scholar_author",
-                    "view_op": "view_citation",
-                    "citation_id": citation_id,
-                    "api_key": api_key }     
+            paper = {
+                "source": "Gscholar",
+                "title": article.get("title"),
+                "authors": article.get("authors"),
+                "Publish_date": citation["publish_date"],
+                "url": citation["link"],
+                "abstract": citation["abstract"],
+            }
+            all_papers.append(paper)
 
-                search_paper = GoogleSearch(params_citation)
-                citation_data = search_paper.get_dict()
-                abstract = citation_data.get("citation")["description"]
-                publish_date = citation_data.get("citation")["publication_date"]
-                url = citation_data.get("citation")["link"]
+    return all_papers
 
 
-                paper = {
-                    "source": "Gscholar",
-                    "title": article.get("title"),
-                    "authors": article.get("authors"),
-                    "Publish_date": publish_date,
-                    "url": url,                    
-                    "abstract": abstract,
-                }
-                all_papers.append(paper)
+@tool
+def get_scholar_papers(author_ids: List[str], scholar_max_results: int, api_key: str) -> Union[List[Dict], Dict]:
+    """
+    Fetches recent papers for a list of Google Scholar author IDs using SerpAPI.
+    Returns a combined list of dicts with title, link, authors, publish_date, url, and abstract.
+    If an error occurs for a specific author, includes it in the results.
 
-        except Exception as e:
-            all_papers.append({
-                "source": "Gscholar",
-                "author_id": author_id,
-                "error": f"Failed to fetch data: {str(e)}"
-            })
+    Args:
+        author_ids (List[str]): List of Google Scholar author IDs
+        api_key (str): SerpAPI key
+        max_scholar_results (int): Max results per author
 
-    return all_papers
\ No newline at end of file
+    Returns:
+        Union[List[Dict], Dict]: List of papers or error message
+    """
+    return fetch_scholar_papers(author_ids, scholar_max_results, api_key)
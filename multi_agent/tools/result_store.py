@@ -0,0 +1,402 @@
+from __future__ import annotations
+import os
+import re
+import json
+import sqlite3
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .posting_tools import (
+    SAVE_DIR,
+    TWEETS_FILE,
+    _entry_origin,
+    _normalize_url,
+    _safe_int,
+)
+from .packed_store import PACKED_ROW_PREFIX, PackedStore, row_key
+from ..utils.identity import IDENTITY_VERSION, extract_doi
+from ..utils.dates import entry_date, parse_date
+
+
+# Derived index over the per-file JSON layout, kept in <save_dir>/cache/.
+# Safe to delete: it is rebuilt on demand.
+INDEX_FILE_NAME = "results_index.sqlite"
+
+# Bump when the table layout changes; an index with another version is dropped and rebuilt.
+SCHEMA_VERSION = 3
+# Stored as PRAGMA user_version; norm_url / doi also change with identity.py, so a new IDENTITY_VERSION rebuilds too
+_INDEX_VERSION = SCHEMA_VERSION * 100 + IDENTITY_VERSION
+
+# Two titles of the same year are the same work when their normalized forms are at least this similar
+FUZZY_TITLE_RATIO = 0.92
+# Fuzzy title candidates must share this many leading characters of the normalized title
+TITLE_HEAD_CHARS = 24
+# Normalized titles shorter than this ("unknown", "Survey data", ...) are never used for matching
+MIN_TITLE_KEY_CHARS = 16
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_ROMAN_CHARS = frozenset("ivx")
+
+
+def title_key(title: Any) -> str:
+    """'Fast approximate Bayesian inference ...' -> 'fastapproximatebayesianinference...'"""
+    return _NON_ALNUM_RE.sub("", str(title or "").lower())
+
+
+def entry_identity(entry: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Canonical identity of a saved entry, independent of the file name it was saved under:
+      - norm_url:  canonical URL (see utils/identity.py), e.g. "arxiv:<id>", "doi:<doi>"
+      - doi:       lowercased DOI from the "doi" field or the URL, "" if none
+      - year:      publish year, "" if unknown
+      - title_key: lowercased title with everything but letters and digits removed
+    """
+    url = str(entry.get("url", ""))
+    norm_url = _normalize_url(url)
+    doi = extract_doi(str(entry.get("doi") or "")) or extract_doi(url) or ""
+
+    pub = entry_date(entry) or parse_date(entry.get("publish_date"), partial=True)
+    return {
+        "norm_url": norm_url,
+        "doi": doi,
+        "year": str(pub.year) if pub else "",
+        "title_key": title_key(entry.get("title")),
+    }
+
+
+def _numbering_differs(matcher: SequenceMatcher) -> bool:
+    """
+    True when two title keys differ in a number ("...part1" / "...part2") or in a
+    trailing roman numeral ("...parti" / "...partii"): parts of a series, not one work.
+    """
+    a, b = matcher.a, matcher.b
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        chunk = a[i1:i2] + b[j1:j2]
+        if chunk.isdigit() or ((i2 == len(a) or j2 == len(b)) and set(chunk) <= _ROMAN_CHARS):
+            return True
+    return False
+
+
+def _titles_match(a: str, b: str) -> bool:
+    if len(a) < MIN_TITLE_KEY_CHARS or len(b) < MIN_TITLE_KEY_CHARS:
+        return False
+    if a == b:
+        return True
+    matcher = SequenceMatcher(None, a, b)
+    return matcher.ratio() >= FUZZY_TITLE_RATIO and not _numbering_differs(matcher)
+
+
+class ResultStore:
+    """
+    SQLite index of the saved research entries.
+
+    The JSON files in ./saved (and the shards in ./saved/packed, see packed_store.py)
+    stay the source of truth. Every row mirrors one entry with the fields the posting
+    path filters and sorts on pre-computed as columns: origin (arxiv/blog/gscholar),
+    usefulness score, ISO publish date and the normalized URL. `sync()` imports files
+    that were added or removed and shards that grew since the last call, so only new
+    entries are ever parsed. Packed rows are keyed "packed/<shard>/<file name>".
+    """
+
+    def __init__(self, save_dir: Path = SAVE_DIR, index_file: Optional[Path] = None):
+        self.save_dir = Path(save_dir)
+        self.index_file = Path(index_file) if index_file else self.save_dir / "cache" / INDEX_FILE_NAME
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.index_file), timeout=30)
+        self._create_schema()
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def _create_schema(self) -> None:
+        (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+        if version != _INDEX_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS entries")
+            self._conn.execute("DROP TABLE IF EXISTS meta")
+        self._conn.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS entries (
+                file TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                origin TEXT NOT NULL,
+                score INTEGER NOT NULL,
+                publish_date TEXT,
+                norm_url TEXT NOT NULL,
+                doi TEXT NOT NULL,
+                year TEXT NOT NULL,
+                title_key TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                payload TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_origin_score_date
+                ON entries (origin, score DESC, publish_date DESC);
+            CREATE INDEX IF NOT EXISTS entries_norm_url ON entries (norm_url);
+            CREATE INDEX IF NOT EXISTS entries_doi ON entries (doi);
+            CREATE INDEX IF NOT EXISTS entries_year_title ON entries (year, title_key);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            PRAGMA user_version = {_INDEX_VERSION};
+            """
+        )
+        self._conn.commit()
+
+    # ---------- import ----------
+
+    @staticmethod
+    def row_for(file_name: str, mtime: float, entry: Dict[str, Any], size: int = 0) -> tuple:
+        pub = entry_date(entry)
+        ident = entry_identity(entry)
+        return (
+            file_name,
+            mtime,
+            _entry_origin(entry),
+            _safe_int(entry.get("usefulness_score")),
+            pub.isoformat() if pub else None,
+            ident["norm_url"],
+            ident["doi"],
+            ident["year"],
+            ident["title_key"],
+            size,
+            json.dumps(entry, ensure_ascii=False),
+        )
+
+    def _scan(self) -> Dict[str, float]:
+        files: Dict[str, float] = {}
+        if not self.save_dir.exists():
+            return files
+        with os.scandir(self.save_dir) as it:
+            for de in it:
+                if de.name.endswith(".json") and de.name != TWEETS_FILE.name and de.is_file():
+                    files[de.name] = de.stat().st_mtime
+        return files
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def sync(self, force: bool = False) -> Dict[str, int]:
+        """
+        Bring the index in line with ./saved.
+
+        Every file's mtime is compared with the one indexed (one stat per file, no
+        reads), so files added, removed or rewritten in place are all picked up;
+        only new or modified files are parsed. Packed shards are re-read only when
+        the manifest changed. `force=True` re-reads every shard as well.
+        """
+        stats = {"added": 0, "updated": 0, "removed": 0}
+        if not self.save_dir.exists():
+            return stats
+
+        packed = PackedStore(self.save_dir)
+        token = packed.manifest_token()
+        if force or self._get_meta("manifest") != token:
+            self._sync_packed(packed, stats, force)
+
+        on_disk = self._scan()
+        indexed = dict(self._conn.execute("SELECT file, mtime FROM entries WHERE file NOT LIKE ?", (PACKED_ROW_PREFIX + "%",)))
+
+        rows = []
+        for name, mtime in on_disk.items():
+            if indexed.get(name) == mtime:
+                continue
+            try:
+                raw = (self.save_dir / name).read_bytes()
+                entry = json.loads(raw.decode("utf-8"))
+            except Exception:
+                continue
+            if not isinstance(entry, dict) or not entry.get("url"):
+                continue
+            rows.append(self.row_for(name, mtime, entry, len(raw)))
+            stats["updated" if name in indexed else "added"] += 1
+
+        gone = [(name,) for name in indexed if name not in on_disk]
+        stats["removed"] += len(gone)
+
+        if rows or gone or self._get_meta("manifest") != token:
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                self._conn.executemany("DELETE FROM entries WHERE file = ?", gone)
+                self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('manifest', ?)", (token,))
+        return stats
+
+    def _sync_packed(self, packed: PackedStore, stats: Dict[str, int], force: bool) -> None:
+        """Re-import every packed shard whose committed size changed and drop rows of removed shards."""
+        manifest = packed.manifest()
+        shards = {name: str(meta.get("bytes", 0)) for name, meta in manifest["shards"].items()}
+        known = dict(self._conn.execute("SELECT substr(key, 7), value FROM meta WHERE key LIKE 'shard:%'"))
+
+        for shard in set(known) | set(shards):
+            if shard in shards and known.get(shard) == shards[shard] and not force:
+                continue
+            prefix = row_key(shard, "")
+            old = {r[0] for r in self._conn.execute("SELECT file FROM entries WHERE file LIKE ?", (prefix + "%",))}
+            rows = []
+            if shard in shards:
+                for rec in packed.read_shard(shard, manifest):
+                    entry = rec["entry"]
+                    if entry.get("url"):
+                        size = len(json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+                        rows.append(self.row_for(prefix + rec["name"], rec.get("saved_at") or 0, entry, size))
+            new = {r[0] for r in rows}
+            stats["added"] += len(new - old)
+            stats["updated"] += len(new & old)
+            stats["removed"] += len(old - new)
+            with self._conn:
+                self._conn.execute("DELETE FROM entries WHERE file LIKE ?", (prefix + "%",))
+                self._conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                if shard in shards:
+                    self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (f"shard:{shard}", shards[shard]))
+                else:
+                    self._conn.execute("DELETE FROM meta WHERE key = ?", (f"shard:{shard}",))
+
+    def rebuild(self) -> Dict[str, int]:
+        """One-time importer: drop every row and re-import every saved file and packed shard."""
+        with self._conn:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.execute("DELETE FROM meta")
+        return self.sync(force=True)
+
+    # ---------- queries ----------
+
+    def origins(self, origin: Optional[str] = None) -> List[str]:
+        if origin:
+            sql, params = "SELECT DISTINCT origin FROM entries WHERE origin = ?", (origin,)
+        else:
+            sql, params = "SELECT DISTINCT origin FROM entries", ()
+        return sorted(r[0] for r in self._conn.execute(sql, params))
+
+    def query(
+        self,
+        origin: Optional[str] = None,
+        min_score: Optional[int] = None,
+        min_date: Optional[str] = None,
+    ) -> Iterator[tuple]:
+        """
+        Yield (entry, norm_url) ordered by score desc, then publish_date desc (unknown last).
+
+        `min_date` is an ISO "YYYY-MM-DD" string; entries without a date never pass it.
+        """
+        where, params = [], []
+        if origin:
+            where.append("origin = ?")
+            params.append(origin)
+        if min_score is not None:
+            where.append("score >= ?")
+            params.append(min_score)
+        if min_date:
+            where.append("publish_date >= ?")
+            params.append(min_date)
+
+        sql = "SELECT payload, norm_url FROM entries"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY score DESC, publish_date IS NULL, publish_date DESC"
+
+        for payload, norm_url in self._conn.execute(sql, params):
+            yield json.loads(payload), norm_url
+
+    def has_name(self, file_name: str) -> bool:
+        """True if an entry is saved as `file_name`, as a file or in any packed shard."""
+        row = self._conn.execute(
+            "SELECT 1 FROM entries WHERE file = ? OR (file LIKE ? AND substr(file, -?) = ?) LIMIT 1",
+            (file_name, PACKED_ROW_PREFIX + "%", len(file_name) + 1, "/" + file_name),
+        ).fetchone()
+        return row is not None
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def find_duplicate(self, entry: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        """
+        Return (file name, matched key) of an indexed entry that is the same work as `entry`,
+        checked in order: normalized URL / arXiv id, DOI, then title + publish year
+        (exact, or fuzzy among titles sharing the first TITLE_HEAD_CHARS characters).
+        """
+        ident = entry_identity(entry)
+
+        if ident["norm_url"]:
+            row = self._conn.execute("SELECT file FROM entries WHERE norm_url = ? LIMIT 1", (ident["norm_url"],)).fetchone()
+            if row:
+                return row[0], "url"
+
+        if ident["doi"]:
+            row = self._conn.execute("SELECT file FROM entries WHERE doi = ? LIMIT 1", (ident["doi"],)).fetchone()
+            if row:
+                return row[0], "doi"
+
+        key = ident["title_key"]
+        if ident["year"] and len(key) >= MIN_TITLE_KEY_CHARS:
+            head = key[:TITLE_HEAD_CHARS]
+            rows = self._conn.execute(
+                "SELECT file, title_key FROM entries WHERE year = ? AND title_key >= ? AND title_key < ?",
+                (ident["year"], head, head + "\uffff"),
+            )
+            for file_name, other in rows:
+                if _titles_match(key, other):
+                    return file_name, "title"
+
+        return None
+
+    def duplicate_groups(self) -> List[List[Dict[str, Any]]]:
+        """
+        Group indexed entries that share a canonical identity (see `find_duplicate`).
+
+        Each group is a list of {"file", "score", "size", "mtime"} dicts with the entry
+        to keep first: highest usefulness score, then oldest file. Singletons are omitted.
+        """
+        rows = list(self._conn.execute("SELECT file, norm_url, doi, year, title_key, score, size, mtime FROM entries"))
+        parent = {r[0]: r[0] for r in rows}
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        def union(a, b):
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                parent[rb] = ra
+
+        first_by_key: Dict[tuple, str] = {}
+        heads: Dict[tuple, List[tuple]] = {}
+        for file_name, norm_url, doi, year, tkey, *_ in rows:
+            for key in (("url", norm_url), ("doi", doi)):
+                if key[1]:
+                    union(first_by_key.setdefault(key, file_name), file_name)
+            if year and len(tkey) >= MIN_TITLE_KEY_CHARS:
+                bucket = heads.setdefault((year, tkey[:TITLE_HEAD_CHARS]), [])
+                for other_file, other_key in bucket:
+                    if _titles_match(tkey, other_key):
+                        union(other_file, file_name)
+                        break
+                bucket.append((file_name, tkey))
+
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for file_name, _, _, _, _, score, size, mtime in rows:
+            groups.setdefault(find(file_name), []).append(
+                {"file": file_name, "score": score, "size": size, "mtime": mtime}
+            )
+
+        result = []
+        for members in groups.values():
+            if len(members) > 1:
+                members.sort(key=lambda m: (-m["score"], m["mtime"], m["file"]))
+                result.append(members)
+        return result
+
+
+def open_store(save_dir: Path = SAVE_DIR) -> ResultStore:
+    """Open the index for `save_dir` and sync it with the files on disk."""
+    store = ResultStore(save_dir)
+    store.sync()
+    return store
+
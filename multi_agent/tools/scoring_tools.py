@@ -0,0 +1,527 @@
+import re
+import json
+import math
+import asyncio
+import logging
+from urllib.parse import urlparse
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+from langchain_core.messages import SystemMessage, HumanMessage
+
+from .research_tools import write_json_entries
+from ..utils.utils import normalize_url
+from ..config import FieldConfig
+from ..utils.score_cache import ScoreCache
+from ..utils.factories import load_prompt_config
+from ..utils.dates import to_ddmmyyyy
+from ..utils.metrics import timed_tool
+from ..utils.prerank import PreRanker
+from ..utils.cancellation import check_cancelled
+
+
+# Path to the scoring system prompt
+SCORING_PROMPT_DIR = "./multi_agent/prompts/scoring_prompt.yaml"
+
+# Candidates sent to the LLM per structured-output call
+SCORING_BATCH_SIZE = 10
+# Scoring calls in flight at once on the async path (ascore_candidates)
+SCORING_MAX_CONCURRENCY = 4
+
+# Characters of abstract/content forwarded to the LLM per candidate
+ABSTRACT_MAX_CHARS = 1200
+
+# Reuse scores of already-seen entries (saved/cache/score_cache.sqlite) instead of asking the LLM again
+SCORE_CACHE_ENABLED = True
+
+# Drop candidates with no lexical overlap with the field before any LLM call (see utils/prerank.py).
+# Off: on saved/ any cut > 0 still sends 91% of candidates to the LLM (0.9 calls saved per 100) and
+# drops 8% of the entries the LLM scored >= 60, which are never scored or cached, so never recovered
+PRERANK_ENABLED = False
+# Pre-rank score (0-1) a candidate needs to reach the LLM; check with benchmarks/prerank_bench before enabling
+PRERANK_CUT = 0.25
+# Best-scored fraction of each call's candidates that reaches the LLM whatever its pre-rank score
+PRERANK_KEEP_TOP = 0.1
+
+
+class EntryScore(BaseModel):
+    """LLM judgement for a single candidate of a batch."""
+    index: int = Field(..., description="The index of the candidate exactly as given in the input.")
+    usefulness_score: int = Field(..., ge=0, le=100, description="Relevance to the field, 0-100, per the rubric.")
+    usefulness_reason: str = Field(..., description="Short reasoning about why that score was assigned.")
+    summary: str = Field(..., description="Concise 1-3 sentence summary of the abstract.")
+
+
+class BatchScores(BaseModel):
+    """Structured output for one scoring call: one EntryScore per candidate."""
+    scores: List[EntryScore] = Field(default_factory=list)
+
+
+def load_scoring_prompt(field: str, prompt_dir: str = SCORING_PROMPT_DIR) -> str:
+    return load_prompt_config(prompt_dir)["prompt"].format(field=field)
+
+
+def scoring_prompt_version(prompt_dir: str = SCORING_PROMPT_DIR) -> str:
+    """Bump `version` in the prompt YAML whenever a change should invalidate cached scores."""
+    return str(load_prompt_config(prompt_dir).get("version", 0))
+
+
+def split_field(field: str) -> List[str]:
+    """'A, B, C' -> ['A', 'B', 'C'] (one search query per topic)."""
+    return [t.strip() for t in field.split(",") if t.strip()]
+
+
+def field_topics(fields: Iterable[FieldConfig]) -> List[str]:
+    """Distinct topics over every field, first occurrence first: the queries a multi-field fetch runs once each."""
+    return list(dict.fromkeys(t for f in fields for t in split_field(f.field)))
+
+
+def _site_label(url: str) -> str:
+    """'https://www.spatialedge.co/p/...' -> 'spatialedge', 'https://events2025.github.io' -> 'events2025'."""
+    host = urlparse(url).netloc.lower().split(":")[0]
+    if host.startswith("www."):
+        host = host[4:]
+    labels = [l for l in host.split(".") if l]
+    if not labels:
+        return "blog"
+    if host.endswith(".github.io") or len(labels) == 1:
+        return labels[0]
+    return labels[-2]
+
+
+def arxiv_candidates(tool_output: str) -> List[Dict[str, Any]]:
+    """Candidates from the JSON string returned by `ArxivTool`."""
+    try:
+        payload = json.loads(tool_output)
+    except (TypeError, json.JSONDecodeError):
+        return []
+    return [dict(r) for r in payload.get("results", []) if isinstance(r, dict) and r.get("url")]
+
+
+def blog_candidates(tool_output: Any) -> List[Dict[str, Any]]:
+    """Candidates from the dict returned by `tavily_tool`."""
+    if isinstance(tool_output, str):
+        try:
+            tool_output = json.loads(tool_output)
+        except json.JSONDecodeError:
+            return []
+    if not isinstance(tool_output, dict):
+        return []
+
+    candidates = []
+    for r in tool_output.get("results", []):
+        if not isinstance(r, dict) or not r.get("url"):
+            continue
+        candidates.append({
+            "source": _site_label(r["url"]),
+            "title": r.get("title") or "unknown",
+            "authors": ["unknown"],
+            "publish_date": to_ddmmyyyy(r.get("published_date")),
+            "summary": r.get("content") or "",
+            "url": r["url"],
+        })
+    return candidates
+
+
+def gscholar_candidates(tool_output: Any) -> List[Dict[str, Any]]:
+    """Candidates from the list returned by `get_scholar_papers` (per-author error rows are skipped)."""
+    if not isinstance(tool_output, list):
+        return []
+
+    candidates = []
+    for p in tool_output:
+        if not isinstance(p, dict) or p.get("error") or not p.get("url"):
+            continue
+        authors = p.get("authors") or "unknown"
+        if isinstance(authors, str):
+            authors = [a.strip() for a in authors.split(",") if a.strip()]
+        candidates.append({
+            "source": "gscholar",
+            "title": p.get("title") or "unknown",
+            "authors": authors or ["unknown"],
+            "publish_date": to_ddmmyyyy(p.get("Publish_date"), partial=True),
+            "summary": p.get("abstract") or "",
+            "url": p["url"],
+        })
+    return candidates
+
+
+def dedupe_candidates(candidates: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep the first candidate per normalized URL (queries for overlapping topics return the same papers)."""
+    seen = set()
+    unique = []
+    for c in candidates:
+        key = normalize_url(str(c.get("url", "")))
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        unique.append(c)
+    return unique
+
+
+def _format_batch(batch: List[Dict[str, Any]]) -> str:
+    rows = [
+        {
+            "index": i,
+            "title": c.get("title", ""),
+            "abstract": str(c.get("summary", ""))[:ABSTRACT_MAX_CHARS],
+        }
+        for i, c in enumerate(batch)
+    ]
+    return "Score the following candidates:\n" + json.dumps(rows, ensure_ascii=False, indent=1)
+
+
+class _ScoringRun:
+    """
+    State of one score_candidates / ascore_candidates call: cache lookups and
+    pre-ranking up front, then the LLM batches (sent sync or async by the
+    caller), then the counts.
+    """
+
+    def __init__(self, candidates: List[Dict[str, Any]], field: str, batch_size: int, use_cache: bool, prerank: bool):
+        self.candidates = candidates
+        self.batch_size = batch_size
+        self.entries: List[Dict[str, Any]] = []
+        self.llm_calls = 0
+        self.unscored = 0
+
+        self.cache = ScoreCache() if use_cache else None
+        self.context = ScoreCache.context_key(field, scoring_prompt_version())
+        keys = [normalize_url(str(c.get("url", ""))) for c in candidates]
+
+        pending = list(zip(keys, candidates))
+        if self.cache is not None:
+            cached = self.cache.get_many(keys, self.context)
+            pending = []
+            for key, candidate in zip(keys, candidates):
+                hit = cached.get(key)
+                if hit is None:
+                    pending.append((key, candidate))
+                    continue
+                self.entries.append({
+                    **candidate,
+                    "summary": hit["summary"] or candidate.get("summary", ""),
+                    "usefulness_score": hit["usefulness_score"],
+                    "usefulness_reason": hit["usefulness_reason"],
+                })
+
+        self.pruned = self.llm_calls_saved = 0
+        if prerank and pending:
+            kept, dropped = PreRanker(field).split([c for _, c in pending], PRERANK_CUT, PRERANK_KEEP_TOP)
+            kept_ids = {id(c) for c in kept}
+            self.pruned = len(dropped)
+            self.llm_calls_saved = math.ceil(len(pending) / batch_size) - math.ceil(len(kept) / batch_size)
+            pending = [(key, c) for key, c in pending if id(c) in kept_ids]
+
+        self.pending = pending
+        self.system_prompt = load_scoring_prompt(field)
+
+    def batches(self) -> List[List[tuple]]:
+        return [self.pending[i:i + self.batch_size] for i in range(0, len(self.pending), self.batch_size)]
+
+    def messages(self, batch: List[tuple]) -> list:
+        return [SystemMessage(content=self.system_prompt), HumanMessage(content=_format_batch([c for _, c in batch]))]
+
+    def failed(self, index: int, batch: List[tuple], error: Exception) -> None:
+        self.llm_calls += 1
+        print(f"Scoring batch {index} failed: {error}")
+        self.unscored += len(batch)
+
+    def scored(self, batch: List[tuple], response) -> None:
+        self.llm_calls += 1
+        by_index = {s.index: s for s in getattr(response, "scores", None) or []}
+        fresh = []
+        for i, (key, candidate) in enumerate(batch):
+            s = by_index.get(i)
+            if s is None:
+                self.unscored += 1
+                continue
+            entry = {
+                **candidate,
+                "summary": s.summary or candidate.get("summary", ""),
+                "usefulness_score": s.usefulness_score,
+                "usefulness_reason": s.usefulness_reason,
+            }
+            self.entries.append(entry)
+            fresh.append({"item_key": key, **entry})
+
+        if self.cache is not None and fresh:
+            self.cache.put_many(fresh, self.context)
+
+    def result(self) -> Dict[str, Any]:
+        stats = self.cache.stats() if self.cache is not None else {"hits": 0, "misses": len(self.candidates)}
+        if self.cache is not None:
+            self.cache.close()
+        return {
+            "entries": self.entries,
+            "llm_calls": self.llm_calls,
+            "unscored": self.unscored,
+            "cache_hits": stats["hits"],
+            "cache_misses": stats["misses"],
+            "pruned": self.pruned,
+            "llm_calls_saved": self.llm_calls_saved,
+        }
+
+
+def score_candidates(
+    llm,
+    candidates: List[Dict[str, Any]],
+    field: str,
+    batch_size: int = SCORING_BATCH_SIZE,
+    config: Optional[Dict[str, Any]] = None,
+    use_cache: bool = SCORE_CACHE_ENABLED,
+    prerank: bool = PRERANK_ENABLED,
+) -> Dict[str, Any]:
+    """
+    Score candidates against `field` with one structured-output LLM call per batch.
+
+    The score cache is consulted first: candidates already scored for the same
+    field and prompt version are filled in from it and never reach the LLM.
+    The rest are pre-ranked lexically against the field and those below
+    PRERANK_CUT (outside the top PRERANK_KEEP_TOP) are counted as "pruned" and
+    left out, as if scored below any save threshold.
+    Each returned entry is the candidate with "usefulness_score", "usefulness_reason"
+    and the LLM "summary" filled in. Candidates the model skipped are counted as
+    "unscored" and left out.
+
+    Raises NodeCancelled between batches once the node has timed out (see
+    utils/cancellation.py).
+
+    Returns:
+        {"entries": [...], "llm_calls": int, "unscored": int, "cache_hits": int, "cache_misses": int,
+         "pruned": int, "llm_calls_saved": int}
+    """
+    run = _ScoringRun(candidates, field, batch_size, use_cache, prerank)
+    scorer = llm.with_structured_output(BatchScores)
+    for i, batch in enumerate(run.batches()):
+        # a timed-out node stops here rather than spending further LLM calls
+        check_cancelled(f"scoring batch {i}")
+        try:
+            response = scorer.invoke(run.messages(batch), config=config)
+        except Exception as e:
+            run.failed(i, batch, e)
+            continue
+        run.scored(batch, response)
+    return run.result()
+
+
+async def ascore_candidates(
+    llm,
+    candidates: List[Dict[str, Any]],
+    field: str,
+    batch_size: int = SCORING_BATCH_SIZE,
+    config: Optional[Dict[str, Any]] = None,
+    use_cache: bool = SCORE_CACHE_ENABLED,
+    prerank: bool = PRERANK_ENABLED,
+    max_concurrency: int = SCORING_MAX_CONCURRENCY,
+) -> Dict[str, Any]:
+    """`score_candidates` with up to `max_concurrency` batches awaited at once (same result, same order)."""
+    run = _ScoringRun(candidates, field, batch_size, use_cache, prerank)
+    scorer = llm.with_structured_output(BatchScores)
+    limit = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def score(batch):
+        async with limit:
+            try:
+                return await scorer.ainvoke(run.messages(batch), config=config), None
+            except Exception as e:
+                return None, e
+
+    batches = run.batches()
+    outcomes = await asyncio.gather(*(score(b) for b in batches))
+    for i, (batch, (response, error)) in enumerate(zip(batches, outcomes)):
+        if error is not None:
+            run.failed(i, batch, error)
+        else:
+            run.scored(batch, response)
+    return run.result()
+
+
+def _file_part(text: Any, limit: int = 180) -> str:
+    """Author / title text reduced to [A-Za-z0-9_-], so no dot is left for the ".json"-stripping in _sanitize_filename."""
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", str(text)).strip("_")[:limit]
+
+
+def paper_file_name(entry: Dict[str, Any]) -> str:
+    """"AuthorOne_PublishYear_Title", as the arxiv and gscholar prompts ask for."""
+    authors = entry.get("authors") or ["unknown"]
+    first = str(authors[0]) if isinstance(authors, list) and authors else str(authors)
+    year = str(entry.get("publish_date", ""))[-4:]
+    year = year if year.isdigit() else "unknown"
+    return f"{_file_part(first) or 'unknown'}_{year}_{_file_part(entry.get('title', ''))}"
+
+
+def blog_file_name(entry: Dict[str, Any]) -> str:
+    """"source_title", as the blog prompt asks for."""
+    return f"{_file_part(entry.get('source', 'blog')) or 'blog'}_{_file_part(entry.get('title', ''))}"
+
+
+def save_entries(
+    entries: List[Dict[str, Any]],
+    min_usefulness: int,
+    file_name_fn: Callable[[Dict[str, Any]], str],
+    node: Optional[str] = None,
+) -> Dict[str, int]:
+    """Write every entry with usefulness_score >= min_usefulness in one batch; returns counts per outcome."""
+    keep = [e for e in entries if e.get("usefulness_score", -1) >= min_usefulness]
+    counts = {"saved": 0, "below_threshold": len(entries) - len(keep), "not_saved": 0}
+    if not keep:
+        return counts
+    with timed_tool(node or "unknown", "save_many"):
+        report = write_json_entries(keep, [file_name_fn(e) for e in keep])
+    counts["saved"] = len(report["saved"])
+    counts["not_saved"] = len(report["duplicates"]) + len(report["invalid"])
+    for name, error in report["invalid"]:
+        logging.warning(f"Not saving '{name}': {error}")
+    return counts
+
+
+def _report(candidates: List[Dict[str, Any]], scored: Dict[str, Any], counts: Dict[str, int], min_usefulness: int) -> str:
+    return (
+        f"Scored {len(candidates)} candidates in {scored['llm_calls']} LLM calls "
+        f"({scored['cache_hits']} from score cache, {scored['pruned']} pruned by pre-rank saving {scored['llm_calls_saved']} calls, "
+        f"{scored['unscored']} unscored); saved {counts['saved']} entries >= {min_usefulness}, "
+        f"{counts['below_threshold']} below threshold, {counts['not_saved']} not saved (existing or invalid)."
+    )
+
+
+def score_and_save(
+    llm,
+    candidates: List[Dict[str, Any]],
+    field: str,
+    min_usefulness: int,
+    file_name_fn: Callable[[Dict[str, Any]], str],
+    batch_size: int = SCORING_BATCH_SIZE,
+    config: Optional[Dict[str, Any]] = None,
+    node: Optional[str] = None,
+) -> str:
+    """Dedupe, batch-score and bulk-save candidates; returns a one-line report for the node message."""
+    candidates = dedupe_candidates(candidates)
+    scored = score_candidates(llm, candidates, field, batch_size=batch_size, config=config)
+    counts = save_entries(scored["entries"], min_usefulness, file_name_fn, node=node)
+    return _report(candidates, scored, counts, min_usefulness)
+
+
+async def ascore_and_save(
+    llm,
+    candidates: List[Dict[str, Any]],
+    field: str,
+    min_usefulness: int,
+    file_name_fn: Callable[[Dict[str, Any]], str],
+    batch_size: int = SCORING_BATCH_SIZE,
+    config: Optional[Dict[str, Any]] = None,
+    node: Optional[str] = None,
+) -> str:
+    """`score_and_save` with concurrent scoring batches; the file writes run in a worker thread."""
+    candidates = dedupe_candidates(candidates)
+    scored = await ascore_candidates(llm, candidates, field, batch_size=batch_size, config=config)
+    counts = await asyncio.to_thread(save_entries, scored["entries"], min_usefulness, file_name_fn, node)
+    return _report(candidates, scored, counts, min_usefulness)
+
+
+def merge_field_scores(fields: List[FieldConfig], results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    One entry per candidate from per-field score_candidates results.
+
+    "field_scores" maps each field name that scored the candidate to its
+    score and reason; the top-level usefulness_score / usefulness_reason /
+    summary are those of the best-scoring field, so the posting path keeps
+    working on the top-level score.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for f, scored in zip(fields, results):
+        for e in scored["entries"]:
+            key = normalize_url(str(e.get("url", "")))
+            entry = merged.setdefault(key, {**e, "field_scores": {}})
+            entry["field_scores"][f.name] = {
+                "usefulness_score": e["usefulness_score"],
+                "usefulness_reason": e["usefulness_reason"],
+            }
+            if e["usefulness_score"] > entry["usefulness_score"]:
+                entry.update(summary=e["summary"], usefulness_score=e["usefulness_score"],
+                             usefulness_reason=e["usefulness_reason"])
+    return list(merged.values())
+
+
+def _save_fields(
+    fields: List[FieldConfig],
+    results: List[Dict[str, Any]],
+    min_usefulness: int,
+    file_name_fn: Callable[[Dict[str, Any]], str],
+    node: Optional[str],
+) -> Dict[str, int]:
+    """Save every merged entry that reaches the threshold of at least one field (its own, else min_usefulness)."""
+    thresholds = {f.name: min_usefulness if f.min_usefulness is None else f.min_usefulness for f in fields}
+    entries = merge_field_scores(fields, results)
+    keep = [
+        e for e in entries
+        if any(s["usefulness_score"] >= thresholds[name] for name, s in e["field_scores"].items())
+    ]
+    # `keep` is already filtered per field, so no further threshold here
+    counts = save_entries(keep, 0, file_name_fn, node=node)
+    counts["below_threshold"] = len(entries) - len(keep)
+    return counts
+
+
+def _fields_report(candidates: List[Dict[str, Any]], fields: List[FieldConfig], results: List[Dict[str, Any]],
+                   counts: Dict[str, int], min_usefulness: int) -> str:
+    if len(fields) == 1:
+        threshold = min_usefulness if fields[0].min_usefulness is None else fields[0].min_usefulness
+        return _report(candidates, results[0], counts, threshold)
+    per_field = "; ".join(
+        f"{f.name}: {len(r['entries'])} scored in {r['llm_calls']} LLM calls "
+        f"({r['cache_hits']} from score cache, {r['pruned']} pruned, {r['unscored']} unscored)"
+        for f, r in zip(fields, results)
+    )
+    return (
+        f"Scored {len(candidates)} candidates against {len(fields)} fields ({per_field}); "
+        f"saved {counts['saved']} entries, {counts['below_threshold']} below every field's threshold, "
+        f"{counts['not_saved']} not saved (existing or invalid)."
+    )
+
+
+def score_and_save_fields(
+    llm,
+    candidates: List[Dict[str, Any]],
+    fields: List[FieldConfig],
+    min_usefulness: int,
+    file_name_fn: Callable[[Dict[str, Any]], str],
+    batch_size: int = SCORING_BATCH_SIZE,
+    config: Optional[Dict[str, Any]] = None,
+    node: Optional[str] = None,
+) -> Tuple[str, int]:
+    """
+    `score_and_save` for candidates fetched once for several fields.
+
+    Each field scores the candidates separately (its own pre-rank cut and score
+    cache context, so candidates sharing no words with a field never reach the
+    LLM for it); the results are merged per candidate and saved once.
+
+    Returns (report line for the node message, candidates left unscored summed
+    over the fields). Unscored candidates are those of failed LLM batches
+    (rate limits, outages) or skipped by the model; the caller must not treat
+    them as processed.
+    """
+    candidates = dedupe_candidates(candidates)
+    results = [score_candidates(llm, candidates, f.field, batch_size=batch_size, config=config) for f in fields]
+    counts = _save_fields(fields, results, min_usefulness, file_name_fn, node)
+    return _fields_report(candidates, fields, results, counts, min_usefulness), sum(r["unscored"] for r in results)
+
+
+async def ascore_and_save_fields(
+    llm,
+    candidates: List[Dict[str, Any]],
+    fields: List[FieldConfig],
+    min_usefulness: int,
+    file_name_fn: Callable[[Dict[str, Any]], str],
+    batch_size: int = SCORING_BATCH_SIZE,
+    config: Optional[Dict[str, Any]] = None,
+    node: Optional[str] = None,
+) -> Tuple[str, int]:
+    """`score_and_save_fields` with the fields scored concurrently on the event loop."""
+    candidates = dedupe_candidates(candidates)
+    results = await asyncio.gather(*(
+        ascore_candidates(llm, candidates, f.field, batch_size=batch_size, config=config) for f in fields
+    ))
+    counts = await asyncio.to_thread(_save_fields, fields, list(results), min_usefulness, file_name_fn, node)
+    return _fields_report(candidates, fields, results, counts, min_usefulness), sum(r["unscored"] for r in results)
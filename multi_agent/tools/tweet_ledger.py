@@ -0,0 +1,156 @@
+import os
+import json
+import threading
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from .posting_tools import SAVE_DIR, TWEETS_FILE, _load_tweets, _normalize_url
+from ..utils.identity import IDENTITY_VERSION
+
+
+TWEETS_LEDGER_FILE = SAVE_DIR / "tweets.jsonl"
+
+
+class TweetLedger:
+    """
+    Append-only record of posted items, one JSON object per line:
+
+        {"url": ..., "norm_url": ..., "id_v": ..., "posting_reason": ..., "posted_at": ...}
+
+    The normalized URL is stored with every record, so the duplicate index is
+    rebuilt without re-normalizing anything (only records written under another
+    IDENTITY_VERSION are normalized again). The index is kept in memory and
+    only bytes appended since the last read are parsed. Membership checks are
+    O(1) and recording a tweet appends a single line, whatever the history size.
+
+    A legacy `tweets.json` ({"tweets": [...]} or a bare list) is imported when
+    the ledger file does not exist yet; once it does, the legacy file is
+    ignored. It is never modified or removed (it may be tracked in git); see
+    `manage migrate-tweets` to import it into an existing ledger.
+    """
+
+    def __init__(self, path: Path = TWEETS_LEDGER_FILE, legacy_path: Optional[Path] = TWEETS_FILE):
+        self.path = Path(path)
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._offset = 0
+        self._inode = None
+        if self.legacy_path and self.legacy_path.exists() and not self.path.exists():
+            self.import_legacy(self.legacy_path)
+
+    def _refresh(self) -> None:
+        """Parse lines appended since the last read (everything, if the file was replaced)."""
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            self._index, self._offset, self._inode = {}, 0, None
+            return
+        if st.st_ino != self._inode or st.st_size < self._offset:
+            self._index, self._offset, self._inode = {}, 0, st.st_ino
+        if st.st_size == self._offset:
+            return
+
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        # a line still being written by another process has no newline yet
+        complete = chunk[:chunk.rfind(b"\n") + 1]
+        for raw in complete.splitlines():
+            try:
+                rec = json.loads(raw)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(rec, dict) and rec.get("url"):
+                key = rec.get("norm_url") if rec.get("id_v") == IDENTITY_VERSION else None
+                key = key or _normalize_url(rec["url"])
+                self._index.setdefault(key, rec)
+        self._offset += len(complete)
+
+    def _append(self, records: List[Dict[str, Any]]) -> None:
+        """Append whole lines with one write and fsync them before returning."""
+        if not records:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def import_legacy(self, legacy_path: Path) -> int:
+        """Append the items of a legacy tweets.json not recorded yet; returns how many. The file is left as is."""
+        with self._lock:
+            self._refresh()
+            records, seen = [], set(self._index)
+            for e in _load_tweets(Path(legacy_path)):
+                key = _normalize_url(e["url"])
+                if key in seen:
+                    continue
+                seen.add(key)
+                records.append({"url": e["url"], "norm_url": key, "id_v": IDENTITY_VERSION, "posting_reason": e["posting_reason"], "posted_at": None})
+            self._append(records)
+            if not self.path.exists():
+                # an empty ledger still marks the legacy file as imported
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self.path.touch()
+            self._refresh()
+            return len(records)
+
+    def __contains__(self, url: str) -> bool:
+        return self.get(url) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._index)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return self._index.get(_normalize_url(url))
+
+    def norm_urls(self) -> frozenset:
+        with self._lock:
+            self._refresh()
+            return frozenset(self._index)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return list(self._index.values())
+
+    def record(self, url: str, posting_reason: str) -> Tuple[str, Dict[str, Any]]:
+        """Append a posted item unless its normalized URL is already recorded; returns (status, entry)."""
+        key = _normalize_url(url)
+        with self._lock:
+            self._refresh()
+            if key in self._index:
+                return "duplicate", self._index[key]
+            rec = {
+                "url": url,
+                "norm_url": key,
+                "id_v": IDENTITY_VERSION,
+                "posting_reason": posting_reason,
+                "posted_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+            self._append([rec])
+            self._refresh()
+            return "saved", rec
+
+
+_ledgers: Dict[Path, TweetLedger] = {}
+_ledgers_lock = threading.Lock()
+
+
+def get_ledger(path: Path = TWEETS_LEDGER_FILE) -> TweetLedger:
+    """Process-wide ledger per file, so the in-memory index is built once and then only topped up."""
+    key = Path(path).resolve()
+    with _ledgers_lock:
+        if key not in _ledgers:
+            legacy = TWEETS_FILE if key == TWEETS_LEDGER_FILE.resolve() else None
+            _ledgers[key] = TweetLedger(path, legacy_path=legacy)
+        return _ledgers[key]
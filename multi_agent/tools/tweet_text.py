@@ -0,0 +1,120 @@
+"""
+X (Twitter) tweet length rules and deterministic tweet compaction.
+
+X does not count Python characters: every URL counts as 23 whatever its length,
+and characters outside the Latin/punctuation ranges (CJK, emoji, ...) count as 2.
+`tweet_length` follows the twitter-text v3 configuration closely enough to
+pre-validate a tweet locally before anything is sent.
+"""
+import re
+import unicodedata
+from typing import Optional
+
+
+TWEET_MAX_WEIGHT = 280
+URL_WEIGHT = 23
+
+# twitter-text v3: code point ranges weighing 1; everything else weighs 2
+_LIGHT_RANGES = ((0x0000, 0x10FF), (0x2000, 0x200D), (0x2010, 0x201F), (0x2032, 0x2037))
+
+_URL_RE = re.compile(r"(?:https?://|www\.)[^\s<>\"]*[^\s<>\".,;:!?)\]'’”]", re.IGNORECASE)
+_MD_LINK_RE = re.compile(r"\[([^\]]*)\]\(((?:https?://|www\.)[^)\s]+)\)", re.IGNORECASE)
+_HASHTAG_RE = re.compile(r"(?<![\w#])#(\w+)", re.UNICODE)
+_WS_RE = re.compile(r"\s+")
+_QUOTES = "\"'“”‘’"
+_ELLIPSIS = "…"
+
+
+def _char_weight(ch: str) -> int:
+    cp = ord(ch)
+    return 1 if any(lo <= cp <= hi for lo, hi in _LIGHT_RANGES) else 2
+
+
+def tweet_length(text: str) -> int:
+    """Weighted length of `text` as X counts it (URLs count as URL_WEIGHT)."""
+    text = unicodedata.normalize("NFC", text or "")
+    total, pos = 0, 0
+    for m in _URL_RE.finditer(text):
+        total += sum(_char_weight(c) for c in text[pos:m.start()]) + URL_WEIGHT
+        pos = m.end()
+    return total + sum(_char_weight(c) for c in text[pos:])
+
+
+def fits(text: str, limit: int = TWEET_MAX_WEIGHT) -> bool:
+    return bool(text) and tweet_length(text) <= limit
+
+
+def _unwrap_markdown_link(m: re.Match) -> str:
+    label, url = m.group(1).strip(), m.group(2)
+    if not label or _URL_RE.fullmatch(label) or label.rstrip("/") == url.rstrip("/"):
+        return url
+    return f"{label} {url}"
+
+
+def compact_tweet(text: str, keep_hashtags: int = 1) -> str:
+    """
+    Lossless-in-meaning cleanup of an LLM-written tweet:
+      - "[url](url)" markdown links become the bare URL (X would count it twice)
+      - line breaks and runs of whitespace become single spaces; wrapping quotes are dropped
+      - repeated URLs are kept once
+      - only the last `keep_hashtags` distinct hashtags are kept, moved to the end
+    """
+    s = _MD_LINK_RE.sub(_unwrap_markdown_link, text or "")
+    s = _WS_RE.sub(" ", s).strip()
+    if len(s) >= 2 and s[0] in _QUOTES and s[-1] in _QUOTES:
+        s = s[1:-1].strip()
+
+    seen_urls = set()
+
+    def _dedupe_url(m: re.Match) -> str:
+        key = m.group(0).rstrip("/").lower()
+        if key in seen_urls:
+            return ""
+        seen_urls.add(key)
+        return m.group(0)
+
+    s = _URL_RE.sub(_dedupe_url, s)
+
+    tags = []
+    for tag in _HASHTAG_RE.findall(s):
+        if tag.lower() not in (t.lower() for t in tags):
+            tags.append(tag)
+    kept = tags[-keep_hashtags:] if keep_hashtags > 0 else []
+    s = _HASHTAG_RE.sub("", s)
+    s = _WS_RE.sub(" ", s).strip()
+    s = re.sub(r"\s+([,.;:!?])", r"\1", s)
+    if kept:
+        s = f"{s} {' '.join('#' + t for t in kept)}"
+    return s
+
+
+def truncate_tweet(text: str, limit: int = TWEET_MAX_WEIGHT) -> Optional[str]:
+    """
+    Last resort: shorten the prose at a word boundary (adding an ellipsis) while
+    keeping every URL and the trailing hashtags. None if even that cannot fit.
+    """
+    text = compact_tweet(text, keep_hashtags=len(_HASHTAG_RE.findall(text or "")))
+    if fits(text, limit):
+        return text
+
+    urls = _URL_RE.findall(text)
+    tags = re.findall(r"#\w+", text)
+    prose = _URL_RE.sub("", text)
+    prose = _HASHTAG_RE.sub("", prose)
+    prose = _WS_RE.sub(" ", prose).strip()
+
+    tail = " ".join(urls + tags)
+    budget = limit - tweet_length(tail) - 1 - _char_weight(_ELLIPSIS)
+    if budget <= 0:
+        return None
+    words, out, used = prose.split(" "), [], 0
+    for w in words:
+        cost = tweet_length(w) + (1 if out else 0)
+        if used + cost > budget:
+            break
+        out.append(w)
+        used += cost
+    if not out:
+        return None
+    short = " ".join(out).rstrip(",;:-–—") + _ELLIPSIS
+    return f"{short} {tail}".strip()
@@ -0,0 +1,35 @@
+"""
+Cooperative cancellation of a node that ran out of time.
+
+A thread cannot be killed, so main._run_with_timeout gives each worker a
+cancel event (in the worker's copied context) and sets it when it stops
+waiting. The long loops of a node call `check_cancelled()` between steps
+(scoring batches, entry writes), so an abandoned worker stops at the next
+one instead of writing results after its node has been reported as timed out.
+"""
+import threading
+import contextvars
+from typing import Optional
+
+
+class NodeCancelled(Exception):
+    pass
+
+
+# Cancel event of the node run in this context; None outside a run with a timeout
+_cancel_event: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar("cancel_event", default=None)
+
+
+def set_cancel_event(event: Optional[threading.Event]) -> None:
+    _cancel_event.set(event)
+
+
+def cancelled() -> bool:
+    event = _cancel_event.get()
+    return event is not None and event.is_set()
+
+
+def check_cancelled(where: str = "") -> None:
+    """Raise NodeCancelled if the node running in this context was given up on."""
+    if cancelled():
+        raise NodeCancelled(f"cancelled after timeout{f' ({where})' if where else ''}")
@@ -0,0 +1,347 @@
+import sqlite3
+import asyncio
+import threading
+import contextvars
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+
+CACHE_DIR = Path("./saved/cache")
+CHECKPOINT_FILE = CACHE_DIR / "checkpoints.sqlite"
+# Unfinished runs not started or resumed for this long are deleted (a crashed run nobody resumed)
+CHECKPOINT_MAX_AGE_DAYS = 7
+
+
+def _utcnow_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class SqliteCheckpointer(BaseCheckpointSaver):
+    """
+    LangGraph checkpointer persisted in ./saved/cache/checkpoints.sqlite.
+
+    Each run of the workflow is one thread (thread_id = run id); a ReAct agent
+    run inside a node uses "<run id>:<node>". Besides LangGraph's checkpoints and
+    pending writes it keeps a `runs` table, so the latest unfinished run can be
+    found and resumed. Finished runs are deleted: checkpoints only exist to
+    resume, and the file would otherwise grow with every run's messages.
+    Unfinished runs older than CHECKPOINT_MAX_AGE_DAYS are dropped by
+    `prune_stale_runs()` for the same reason.
+
+    One connection is shared by the threads of a run (LangGraph saves writes
+    from its worker threads) and serialized with a lock.
+    """
+
+    def __init__(self, path: Path = CHECKPOINT_FILE):
+        super().__init__()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                parent_checkpoint_id TEXT,
+                checkpoint_type TEXT NOT NULL,
+                checkpoint BLOB NOT NULL,
+                metadata_type TEXT NOT NULL,
+                metadata BLOB NOT NULL,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+            );
+            CREATE TABLE IF NOT EXISTS writes (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                channel TEXT NOT NULL,
+                value_type TEXT NOT NULL,
+                value BLOB,
+                task_path TEXT NOT NULL DEFAULT '',
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+            );
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                started_at TEXT NOT NULL,
+                resumed_at TEXT
+            );
+            """
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---------- runs ----------
+
+    def start_run(self) -> str:
+        """Register a new run and return its id ("20251017T041500Z", suffixed if taken)."""
+        base = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        with self._lock:
+            taken = {r for (r,) in self._conn.execute("SELECT run_id FROM runs WHERE run_id LIKE ?", (base + "%",))}
+            run_id = base
+            n = 1
+            while run_id in taken:
+                n += 1
+                run_id = f"{base}-{n}"
+            self._conn.execute("INSERT INTO runs (run_id, started_at) VALUES (?, ?)", (run_id, _utcnow_iso()))
+            self._conn.commit()
+        return run_id
+
+    def unfinished_runs(self) -> List[Dict[str, Any]]:
+        """Runs that started but never finished, newest first."""
+        with self._lock:
+            rows = self._conn.execute("SELECT run_id, started_at, resumed_at FROM runs ORDER BY started_at DESC, run_id DESC")
+            return [{"run_id": r, "started_at": s, "resumed_at": ra} for r, s, ra in rows]
+
+    def mark_resumed(self, run_id: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE runs SET resumed_at = ? WHERE run_id = ?", (_utcnow_iso(), run_id))
+            self._conn.commit()
+
+    def _forget_run(self, run_id: str) -> None:
+        for table in ("checkpoints", "writes"):
+            self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ? OR thread_id LIKE ?", (run_id, run_id + ":%"))
+        self._conn.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+
+    def finish_run(self, run_id: str) -> None:
+        """Forget a finished run: its row and the checkpoints of every thread it owns."""
+        with self._lock:
+            self._forget_run(run_id)
+            self._conn.commit()
+
+    def prune_stale_runs(self, max_age_days: float = CHECKPOINT_MAX_AGE_DAYS) -> List[str]:
+        """Forget unfinished runs last started or resumed more than `max_age_days` ago; returns their ids."""
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=max_age_days)).isoformat(timespec="seconds")
+        with self._lock:
+            stale = [r for (r,) in self._conn.execute(
+                "SELECT run_id FROM runs WHERE COALESCE(resumed_at, started_at) < ?", (cutoff,)
+            )]
+            for run_id in stale:
+                self._forget_run(run_id)
+            self._conn.commit()
+        return stale
+
+    # ---------- BaseCheckpointSaver ----------
+
+    def _pending_writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> List[Tuple[str, str, Any]]:
+        rows = self._conn.execute(
+            "SELECT task_id, channel, value_type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return [(task_id, channel, self.serde.loads_typed((t, v))) for task_id, channel, t, v in rows]
+
+    def _tuple(self, thread_id: str, checkpoint_ns: str, row) -> CheckpointTuple:
+        checkpoint_id, parent_id, ck_type, ck, md_type, md = row
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id}},
+            checkpoint=self.serde.loads_typed((ck_type, ck)),
+            metadata=self.serde.loads_typed((md_type, md)),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id}}
+                if parent_id else None
+            ),
+            pending_writes=self._pending_writes(thread_id, checkpoint_ns, checkpoint_id),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_checkpoint_id, checkpoint_type, checkpoint, metadata_type, metadata"
+        with self._lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    f"ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            return self._tuple(thread_id, checkpoint_ns, row) if row else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        where, params = [], []
+        if config:
+            where.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if "checkpoint_ns" in config["configurable"]:
+                where.append("checkpoint_ns = ?")
+                params.append(config["configurable"]["checkpoint_ns"])
+            if checkpoint_id := get_checkpoint_id(config):
+                where.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            where.append("checkpoint_id < ?")
+            params.append(before_id)
+        sql = ("SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, checkpoint_type, checkpoint, "
+               "metadata_type, metadata FROM checkpoints")
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY checkpoint_id DESC"
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        found = 0
+        for thread_id, checkpoint_ns, *row in rows:
+            with self._lock:
+                tup = self._tuple(thread_id, checkpoint_ns, row)
+            if filter and any(tup.metadata.get(k) != v for k, v in filter.items()):
+                continue
+            yield tup
+            found += 1
+            if limit is not None and found >= limit:
+                return
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        ck_type, ck = self.serde.dumps_typed(checkpoint)
+        md_type, md = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                 ck_type, ck, md_type, md),
+            )
+            self._conn.commit()
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        # special channels (errors, interrupts, ...) overwrite; regular writes are saved once per index
+        verb = "INSERT OR REPLACE" if all(c in WRITES_IDX_MAP for c, _ in writes) else "INSERT OR IGNORE"
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            value_type, blob = self.serde.dumps_typed(value)
+            rows.append((thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx),
+                         channel, value_type, blob, task_path))
+        with self._lock:
+            self._conn.executemany(f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            self._conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+            self._conn.commit()
+
+    # async variants run the sqlite calls in a worker thread
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config: Optional[RunnableConfig], **kwargs) -> AsyncIterator[CheckpointTuple]:
+        for tup in await asyncio.to_thread(lambda: list(self.list(config, **kwargs))):
+            yield tup
+
+    async def aput(self, config, checkpoint, metadata, new_versions) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = "") -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+_checkpointers: Dict[Path, SqliteCheckpointer] = {}
+_checkpointers_lock = threading.Lock()
+
+
+def get_checkpointer(path: Path = CHECKPOINT_FILE) -> SqliteCheckpointer:
+    key = Path(path).resolve()
+    with _checkpointers_lock:
+        if key not in _checkpointers:
+            _checkpointers[key] = SqliteCheckpointer(path)
+        return _checkpointers[key]
+
+
+# Run being checkpointed (set by multi_agent.main); nodes hand it to their inner ReAct agents
+_run_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("checkpoint_run_id", default=None)
+
+
+def set_run_id(run_id: Optional[str]) -> None:
+    _run_id.set(run_id)
+
+
+def agent_checkpointer() -> Optional[SqliteCheckpointer]:
+    """The checkpointer for a node's ReAct agent, or None when the run is not checkpointed."""
+    return get_checkpointer() if _run_id.get() else None
+
+
+def invoke_agent(agent, state, config: Dict[str, Any], node: str):
+    """
+    Invoke a node's ReAct agent on the thread "<run id>:<node>" when the run is
+    checkpointed: an agent loop the previous attempt left half-way continues from
+    its last step, and one it already finished returns its final state without
+    any new LLM call. Without a run id this is a plain `agent.invoke`.
+    """
+    run_id = _run_id.get()
+    if run_id is None or getattr(agent, "checkpointer", None) is None:
+        return agent.invoke(state, config=config)
+
+    config = {**config, "configurable": {**config.get("configurable", {}), "thread_id": f"{run_id}:{node}"}}
+    snapshot = agent.get_state(config)
+    if snapshot.next:
+        return agent.invoke(None, config=config)
+    if snapshot.values.get("messages"):
+        return snapshot.values
+    return agent.invoke(state, config=config)
+
+
+async def ainvoke_agent(agent, state, config: Dict[str, Any], node: str):
+    """`invoke_agent` for the async nodes (`aget_state` / `ainvoke`)."""
+    run_id = _run_id.get()
+    if run_id is None or getattr(agent, "checkpointer", None) is None:
+        return await agent.ainvoke(state, config=config)
+
+    config = {**config, "configurable": {**config.get("configurable", {}), "thread_id": f"{run_id}:{node}"}}
+    snapshot = await agent.aget_state(config)
+    if snapshot.next:
+        return await agent.ainvoke(None, config=config)
+    if snapshot.values.get("messages"):
+        return snapshot.values
+    return await agent.ainvoke(state, config=config)
@@ -0,0 +1,99 @@
+"""
+One parser for every publish_date format found in saved entries and tool output.
+
+    parse_date("14-08-2025")                      -> date(2025, 8, 14)   # dd-mm-yyyy (what the nodes save)
+    parse_date("2025-08-14T09:30:00Z")            -> date(2025, 8, 14)   # ISO, with or without time
+    parse_date("Thu, 14 Aug 2025 09:30:00 GMT")   -> date(2025, 8, 14)   # RFC 822 (Tavily)
+    parse_date("2025/8", partial=True)            -> date(2025, 8, 1)    # Google Scholar month / year
+    parse_date("unknown")                         -> None
+
+A single combined regex picks the layout, so no format is tried and thrown away,
+and results are memoized per input string.
+"""
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Optional
+
+
+DATE_CACHE_SIZE = 65536
+
+_MONTHS = {m: i for i, m in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1)}
+
+_DATE_RE = re.compile(
+    r"""^\s*(?:
+        (?P<iy>\d{4})[-/.](?P<im>\d{1,2})[-/.](?P<id>\d{1,2})(?:[T\s].*)?             # yyyy-mm-dd[Thh:mm...]
+      | (?P<ed>\d{1,2})[-/.](?P<em>\d{1,2})[-/.](?P<ey>\d{4}|\d{2})                   # dd-mm-yyyy / dd-mm-yy
+      | (?:[a-z]{3},\s*)?(?P<rd>\d{1,2})\s+(?P<rm>[a-z]{3})[a-z]*\s+(?P<ry>\d{4})(?:\s.*)?  # [Mon, ]dd Mon yyyy ...
+      | (?P<py>\d{4})(?:[-/.](?P<pm>\d{1,2}))?                                         # yyyy[-mm] (partial)
+    )\s*$""",
+    re.IGNORECASE | re.VERBOSE,
+)
+
+
+def _make(y: int, m: int, d: int) -> Optional[date]:
+    try:
+        return date(y, m, d)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse(s: str, partial: bool) -> Optional[date]:
+    m = _DATE_RE.match(s)
+    if not m:
+        return None
+    g = m.groupdict()
+    if g["iy"]:
+        return _make(int(g["iy"]), int(g["im"]), int(g["id"]))
+    if g["ey"]:
+        year = int(g["ey"])
+        if len(g["ey"]) == 2:
+            year += 2000 if year < 69 else 1900  # same pivot as strptime's %y
+        return _make(year, int(g["em"]), int(g["ed"]))
+    if g["ry"]:
+        month = _MONTHS.get(g["rm"].lower())
+        return _make(int(g["ry"]), month, int(g["rd"])) if month else None
+    if partial and g["py"]:
+        return _make(int(g["py"]), int(g["pm"] or 1), 1)
+    return None
+
+
+def parse_date(value: Any, partial: bool = False) -> Optional[date]:
+    """
+    Date of a publish_date-like value, or None if it is empty, "unknown" or unparseable.
+    With `partial=True`, a bare "yyyy" or "yyyy/mm" maps to the first day of that period.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    s = str(value).strip()
+    if not s:
+        return None
+    return _parse(s, partial)
+
+
+def to_iso(value: Any, partial: bool = False) -> Optional[str]:
+    d = parse_date(value, partial)
+    return d.isoformat() if d else None
+
+
+def to_ddmmyyyy(value: Any, partial: bool = False) -> str:
+    """The "dd-mm-yyyy" form the nodes save publish_date in, or "unknown"."""
+    d = parse_date(value, partial)
+    return d.strftime("%d-%m-%Y") if d else "unknown"
+
+
+def entry_date(entry: dict) -> Optional[date]:
+    """
+    publish_date of a saved entry, read from the "publish_date_iso" stored at save
+    time when present, so the posting path does not parse free-form dates again.
+    """
+    iso = entry.get("publish_date_iso")
+    if iso:
+        return parse_date(iso)
+    return parse_date(entry.get("publish_date"))
@@ -0,0 +1,63 @@
+import os
+import yaml
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+
+# Nothing in here runs at import time: the .env file, prompt YAMLs and LLM clients
+# are only loaded the first time a node actually needs them, and then reused.
+
+
+@lru_cache(maxsize=None)
+def load_env() -> None:
+    """Load .env into os.environ once per process (existing variables win)."""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+def env(name: str, default: Optional[str] = None) -> Optional[str]:
+    load_env()
+    return os.getenv(name, default)
+
+
+@lru_cache(maxsize=None)
+def load_prompt_config(prompt_dir: str) -> Dict[str, Any]:
+    with open(prompt_dir, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def render_prompt(prompt_dir: str, **input_vars) -> str:
+    return load_prompt_config(prompt_dir)["prompt"].format(**input_vars)
+
+
+# Builds the model get_llm returns from (model_name, temperature, default factory) when set;
+# utils.record_replay installs one while a run is recorded or replayed
+_llm_hook: Optional[Callable[[str, float, Callable], Any]] = None
+
+
+def set_llm_hook(hook: Optional[Callable[[str, float, Callable], Any]]) -> None:
+    global _llm_hook
+    _llm_hook = hook
+    get_llm.cache_clear()
+
+
+def _new_llm(model_name: str, temperature: float):
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(
+        model=model_name,
+        temperature=temperature,
+        google_api_key=env("GOOGLE_API_KEY"),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_llm(model_name: str, temperature: float = 0):
+    """One ChatGoogleGenerativeAI per (model, temperature), shared by every node that uses it."""
+    if _llm_hook is not None:
+        return _llm_hook(model_name, temperature, _new_llm)
+    return _new_llm(model_name, temperature)
+
+
+def build_react_agent(model_name: str, tools: list, prompt: str, checkpointer=None):
+    from langgraph.prebuilt import create_react_agent
+    return create_react_agent(get_llm(model_name), tools=tools, prompt=prompt, checkpointer=checkpointer)
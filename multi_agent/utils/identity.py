@@ -0,0 +1,107 @@
+"""
+Canonical identity of a URL, shared by every dedupe and "already seen" check.
+
+    canonical_url("https://arxiv.org/pdf/2508.15665v2.pdf")                       -> "arxiv:2508.15665"
+    canonical_url("https://doi.org/10.1371/journal.pone.0331139")                 -> "doi:10.1371/journal.pone.0331139"
+    canonical_url("https://journals.plos.org/plosone/article?id=10.1371/journal.pone.0331139")
+                                                                                  -> "doi:10.1371/journal.pone.0331139"
+    canonical_url("https://www.frontiersin.org/articles/10.3389/fpsyg.2020.01234/full")
+                                                                                  -> "doi:10.3389/fpsyg.2020.01234"
+    canonical_url("https://scholar.google.com/citations?view_op=view_citation&citation_for_view=Wnxq0mgAAAAJ:u5HHmVD_uO8C")
+                                                                                  -> "scholar:wnxq0mgaaaaj:u5hhmvd_uo8c"
+    canonical_url("https://www.Example.co/p/post/?utm_source=x&id=3#top")        -> "http://example.co/p/post?id=3"
+
+Keys are lowercase and canonical_url(key) == key. Any other URL keeps its path
+and its non-tracking query parameters (sorted), with the scheme unified to http
+and "www." dropped.
+"""
+import re
+from functools import lru_cache
+from typing import Optional
+from urllib.parse import urlsplit, parse_qsl, urlencode, unquote
+
+
+# Bump whenever canonical_url() changes its output, so persisted keys get recomputed
+IDENTITY_VERSION = 3
+
+CANONICAL_CACHE_SIZE = 65536
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid",
+    "ref", "ref_src", "ref_url", "_hsenc", "_hsmi",
+})
+TRACKING_PREFIXES = ("utm_",)
+
+_ARXIV_ID = r"(?P<id>\d{4}\.\d{4,5}|[a-z\-]+(?:\.[a-z]{2})?/\d{7})(?:v\d+)?"
+_ARXIV_URL_RE = re.compile(r"arxiv\.org/(?:abs|pdf|html|format)/" + _ARXIV_ID + r"(?:\.pdf)?(?=$|[/?#])", re.IGNORECASE)
+_ARXIV_TAG_RE = re.compile(r"^\s*arxiv:\s*" + _ARXIV_ID + r"\s*$", re.IGNORECASE)
+_DOI_RE = re.compile(r"\b(10\.\d{4,9}/[^\s?#&]+)", re.IGNORECASE)
+# Publisher page suffixes after a DOI in a URL path (".../10.3389/fpsyg.2020.01234/full"); not part of the DOI
+_DOI_PAGE_SUFFIX_RE = re.compile(r"/(?:full|abstract|pdf|epdf|pdfdirect|html|fulltext|summary|references|figures|meta)(?:/.*)?$", re.IGNORECASE)
+_SCHOLAR_HOST_RE = re.compile(r"^scholar\.google\.[a-z.]+$")
+
+
+def extract_arxiv_id(text: str) -> Optional[str]:
+    """arXiv id (without version) from an abs/pdf/html URL or an "arXiv:<id>" tag."""
+    m = _ARXIV_URL_RE.search(text) or _ARXIV_TAG_RE.match(text)
+    return m.group("id").lower() if m else None
+
+
+def extract_doi(text: str) -> Optional[str]:
+    """Lowercased DOI found anywhere in `text` (URL-decoded first), without publisher page suffixes or trailing punctuation."""
+    m = _DOI_RE.search(unquote(text or ""))
+    return _DOI_PAGE_SUFFIX_RE.sub("", m.group(1)).lower().rstrip(".,;)") if m else None
+
+
+def _is_tracking(param: str) -> bool:
+    p = param.lower()
+    return p in TRACKING_PARAMS or p.startswith(TRACKING_PREFIXES)
+
+
+@lru_cache(maxsize=CANONICAL_CACHE_SIZE)
+def canonical_url(url: str) -> str:
+    """Canonical, lowercase identity key for `url` (see the module docstring); "" for empty input."""
+    if not url:
+        return ""
+    u = str(url).strip()
+    if not u:
+        return ""
+
+    arxiv_id = extract_arxiv_id(u)
+    if arxiv_id:
+        return f"arxiv:{arxiv_id}"
+
+    # keys this function returns map to themselves, so a stored key can be passed back in
+    tag = u[:8].lower()
+    if tag.startswith("scholar:"):
+        return u.lower()
+    if tag.startswith("doi:"):
+        doi = extract_doi(u)
+        if doi:
+            return f"doi:{doi}"
+
+    if "://" not in u:
+        u = "http://" + u
+    parts = urlsplit(u)
+    host = parts.netloc.lower().rsplit("@", 1)[-1].split(":")[0]
+    if host.startswith("www."):
+        host = host[4:]
+
+    if _SCHOLAR_HOST_RE.match(host):
+        query = dict(parse_qsl(parts.query))
+        if query.get("citation_for_view"):
+            return f"scholar:{query['citation_for_view'].lower()}"
+        if query.get("cluster"):
+            return f"scholar:cluster:{query['cluster'].lower()}"
+
+    doi = extract_doi(parts.path + "?" + parts.query)
+    if doi:
+        return f"doi:{doi}"
+
+    path = parts.path.rstrip("/")
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k))
+    key = f"http://{host}{path}"
+    if query:
+        key += "?" + urlencode(query)
+    return key.lower()
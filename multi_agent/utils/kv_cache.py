@@ -0,0 +1,79 @@
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+
+class KVCache:
+    """
+    Small persistent JSON key/value cache on SQLite, safe to share between threads.
+
+    Used for responses that are expensive to fetch and (nearly) never change,
+    e.g. Google Scholar citations or arXiv search pages. With `ttl_seconds=None`
+    entries never expire; otherwise stale entries read as misses and are removed
+    by `evict()`.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: Optional[float] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def __enter__(self) -> "KVCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _cutoff(self) -> float:
+        return time.time() - self.ttl_seconds if self.ttl_seconds is not None else float("-inf")
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM kv WHERE key = ? AND created_at >= ?", (key, self._cutoff())
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        return {k: v for k in keys if (v := self.get(k)) is not None}
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO kv VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), time.time()),
+            )
+            self._conn.commit()
+
+    def evict(self) -> int:
+        if self.ttl_seconds is None:
+            return 0
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM kv WHERE created_at < ?", (self._cutoff(),))
+            self._conn.commit()
+            return cur.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            (size,) = self._conn.execute("SELECT COUNT(*) FROM kv").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": size}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
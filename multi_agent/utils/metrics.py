@@ -0,0 +1,240 @@
+import json
+import time
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from .utils import token_usage
+
+
+METRICS_DIR = Path("./saved")
+# Summary of the latest run (overwritten every run)
+METRICS_FILE = METRICS_DIR / "run_metrics.json"
+# Also write the summary in Prometheus text exposition format (e.g. for node_exporter's textfile collector)
+METRICS_PROMETHEUS = False
+METRICS_PROM_FILE = METRICS_DIR / "run_metrics.prom"
+METRICS_PREFIX = "events_agent"
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile, q in [0, 100]."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))  # ceil without float error
+    return ordered[int(rank) - 1]
+
+
+def _latency_stats(values: List[float]) -> Dict[str, Any]:
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "total": sum(values),
+    }
+
+
+class RunMetrics:
+    """
+    Per-run collector of LLM latency, token usage and tool latency per node.
+
+    Callback events are matched by run_id, so nested and concurrent calls each get
+    their own timing. Feed it through `handler(node)` (a LangChain callback
+    handler) and, for code that calls tools directly, `timed_tool(node, name)`.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now(timezone.utc)
+        self._lock = threading.Lock()
+        self._pending: Dict[Any, tuple] = {}
+        self.llm_latency: Dict[str, List[float]] = defaultdict(list)
+        self.tokens: Dict[str, Dict[str, int]] = defaultdict(lambda: {"input_tokens": 0, "output_tokens": 0})
+        self.tool_latency: Dict[tuple, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.node_seconds: Dict[str, float] = {}
+
+    def handler(self, node: str) -> "MetricsHandler":
+        return MetricsHandler(self, node)
+
+    def start(self, run_id, kind: str, node: str, name: Optional[str], parent_run_id=None) -> None:
+        with self._lock:
+            self._pending[run_id] = (kind, node, name, parent_run_id, time.perf_counter())
+
+    def end(self, run_id, usage: Optional[Dict[str, int]] = None, error: bool = False) -> None:
+        with self._lock:
+            pending = self._pending.pop(run_id, None)
+            if pending is None:
+                return
+            kind, node, name, _, t0 = pending
+            elapsed = time.perf_counter() - t0
+            if error:
+                self.errors[node] += 1
+            if kind == "llm":
+                self.llm_latency[node].append(elapsed)
+                for k, v in (usage or {}).items():
+                    self.tokens[node][k] += v
+            else:
+                self.tool_latency[(node, name)].append(elapsed)
+
+    def record_tool(self, node: str, name: str, seconds: float) -> None:
+        with self._lock:
+            self.tool_latency[(node, name)].append(seconds)
+
+    def record_node(self, node: str, seconds: float) -> None:
+        with self._lock:
+            self.node_seconds[node] = seconds
+
+    @contextmanager
+    def timed_tool(self, node: str, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_tool(node, name, time.perf_counter() - t0)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            nodes = sorted(set(self.llm_latency) | set(self.node_seconds) | {n for n, _ in self.tool_latency})
+            per_node = {}
+            for node in nodes:
+                tools = {
+                    name: _latency_stats(values)
+                    for (n, name), values in sorted(self.tool_latency.items()) if n == node
+                }
+                per_node[node] = {
+                    "seconds": self.node_seconds.get(node),
+                    "llm": _latency_stats(self.llm_latency.get(node, [])),
+                    "tokens": dict(self.tokens.get(node, {"input_tokens": 0, "output_tokens": 0})),
+                    "tools": tools,
+                    "tool_calls": sum(t["count"] for t in tools.values()),
+                    "errors": self.errors.get(node, 0),
+                }
+        totals = {
+            "llm_calls": sum(n["llm"]["count"] for n in per_node.values()),
+            "llm_seconds": sum(n["llm"]["total"] for n in per_node.values()),
+            "tool_calls": sum(n["tool_calls"] for n in per_node.values()),
+            "input_tokens": sum(n["tokens"]["input_tokens"] for n in per_node.values()),
+            "output_tokens": sum(n["tokens"]["output_tokens"] for n in per_node.values()),
+            "errors": sum(n["errors"] for n in per_node.values()),
+        }
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "nodes": per_node,
+            "totals": totals,
+        }
+
+    def write_summary(self, path: Optional[Path] = None, prometheus: Optional[bool] = None) -> Dict[str, Any]:
+        """Write the summary JSON (and, if enabled, the Prometheus text file); returns the summary."""
+        summary = self.summary()
+        path = Path(path or METRICS_FILE)
+        prometheus = METRICS_PROMETHEUS if prometheus is None else prometheus
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        if prometheus:
+            METRICS_PROM_FILE.write_text(to_prometheus(summary), encoding="utf-8")
+        return summary
+
+
+def to_prometheus(summary: Dict[str, Any], prefix: str = METRICS_PREFIX) -> str:
+    """Render a RunMetrics summary in the Prometheus text exposition format."""
+    lines = [
+        f"# HELP {prefix}_llm_latency_seconds LLM call latency per node.",
+        f"# TYPE {prefix}_llm_latency_seconds summary",
+    ]
+    for node, m in summary["nodes"].items():
+        llm = m["llm"]
+        for q, key in (("0.5", "p50"), ("0.95", "p95")):
+            if llm[key] is not None:
+                lines.append(f'{prefix}_llm_latency_seconds{{node="{node}",quantile="{q}"}} {llm[key]:.6f}')
+        lines.append(f'{prefix}_llm_latency_seconds_sum{{node="{node}"}} {llm["total"]:.6f}')
+        lines.append(f'{prefix}_llm_latency_seconds_count{{node="{node}"}} {llm["count"]}')
+
+    lines += [
+        f"# HELP {prefix}_tool_latency_seconds Tool call latency per node and tool.",
+        f"# TYPE {prefix}_tool_latency_seconds summary",
+    ]
+    for node, m in summary["nodes"].items():
+        for tool, t in m["tools"].items():
+            labels = f'node="{node}",tool="{tool}"'
+            for q, key in (("0.5", "p50"), ("0.95", "p95")):
+                if t[key] is not None:
+                    lines.append(f'{prefix}_tool_latency_seconds{{{labels},quantile="{q}"}} {t[key]:.6f}')
+            lines.append(f"{prefix}_tool_latency_seconds_sum{{{labels}}} {t['total']:.6f}")
+            lines.append(f"{prefix}_tool_latency_seconds_count{{{labels}}} {t['count']}")
+
+    lines += [
+        f"# HELP {prefix}_tokens_total LLM tokens per node and direction.",
+        f"# TYPE {prefix}_tokens_total counter",
+    ]
+    for node, m in summary["nodes"].items():
+        lines.append(f'{prefix}_tokens_total{{node="{node}",direction="in"}} {m["tokens"]["input_tokens"]}')
+        lines.append(f'{prefix}_tokens_total{{node="{node}",direction="out"}} {m["tokens"]["output_tokens"]}')
+
+    lines += [
+        f"# HELP {prefix}_node_seconds Wall time per node in the last run.",
+        f"# TYPE {prefix}_node_seconds gauge",
+    ]
+    for node, m in summary["nodes"].items():
+        if m["seconds"] is not None:
+            lines.append(f'{prefix}_node_seconds{{node="{node}"}} {m["seconds"]:.6f}')
+    return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(BaseCallbackHandler):
+    """Forwards LLM and tool callbacks of one node to a RunMetrics collector."""
+
+    def __init__(self, metrics: RunMetrics, node: str):
+        self.metrics = metrics
+        self.node = node
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        self.metrics.start(run_id, "llm", self.node, (serialized or {}).get("name"), parent_run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self.metrics.end(run_id, usage=token_usage(response))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self.metrics.end(run_id, error=True)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        self.metrics.start(run_id, "tool", self.node, (serialized or {}).get("name"), parent_run_id)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self.metrics.end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self.metrics.end(run_id, error=True)
+
+
+# Collector of the run in progress, set by the entry point (see multi_agent.main)
+_active: Optional[RunMetrics] = None
+
+
+def set_active(metrics: Optional[RunMetrics]) -> None:
+    global _active
+    _active = metrics
+
+
+def get_active() -> Optional[RunMetrics]:
+    return _active
+
+
+def metrics_callbacks(node: str) -> list:
+    """Callback handlers to add to a node's config: empty unless a run is being measured."""
+    return [_active.handler(node)] if _active is not None else []
+
+
+@contextmanager
+def timed_tool(node: str, name: str):
+    """Time a direct tool call (the batch pipelines call `.func` without callbacks)."""
+    if _active is None:
+        yield
+        return
+    with _active.timed_tool(node, name):
+        yield
@@ -0,0 +1,137 @@
+"""
+Local lexical pre-ranking of candidates against the FIELD keyword list.
+
+Every topic of the field ("Spatio Temporal Point Process, Survey data, ...") is
+scored with BM25's saturated term frequency over the candidate's title and
+summary, and a candidate's score is its best topic's mean over that topic's
+terms, in [0, 1]:
+
+    1.0   every term of some topic appears (about once per average-length text or more)
+    0.5   half of the terms of the best topic appear
+    0.0   no field term at all
+
+Query terms are weighted equally instead of by IDF: a scoring call sees 10-50
+candidates, too few for stable document frequencies, and the FIELD keywords are
+all content words anyway. The whole batch is scored at once on a
+(candidates x query terms) term-frequency matrix.
+"""
+import re
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+
+# BM25 term-frequency saturation and length normalization
+PRERANK_K1 = 1.2
+PRERANK_B = 0.75
+# A text token matches a field term when they share this many leading characters
+# (spatial ~ spatio, temporally ~ temporal, processing ~ process); shorter terms match exactly
+PRERANK_PREFIX_CHARS = 5
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "by", "for", "from", "in", "into", "is", "of", "on", "or",
+    "the", "to", "with", "using", "via",
+})
+
+
+def stem(token: str) -> str:
+    """Minimal plural folding: processes -> process, studies -> study, datasets -> dataset."""
+    if len(token) <= 3:
+        return token
+    if token.endswith("ies"):
+        return token[:-3] + "y"
+    if token.endswith(("sses", "xes", "ches", "shes")):
+        return token[:-2]
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [stem(t) for t in _TOKEN_RE.findall(str(text or "").lower()) if t not in _STOPWORDS]
+
+
+def candidate_text(candidate: Dict) -> str:
+    return f"{candidate.get('title', '')} {candidate.get('summary', '')}"
+
+
+class PreRanker:
+    """BM25-style topic coverage of texts for one field string (comma-separated topics)."""
+
+    def __init__(self, field: str, k1: float = PRERANK_K1, b: float = PRERANK_B, prefix_chars: int = PRERANK_PREFIX_CHARS):
+        self.k1, self.b, self.prefix_chars = k1, b, prefix_chars
+        self.topics = [terms for terms in (tokenize(t) for t in field.split(",")) if terms]
+        self.terms: List[str] = sorted({t for terms in self.topics for t in terms})
+        self._index = {t: i for i, t in enumerate(self.terms)}
+        self._prefixes = {t[:prefix_chars]: i for i, t in enumerate(self.terms) if len(t) > prefix_chars}
+        # "spatiotemporal" counts as "spatio" + "temporal" when the field has them next to each other
+        self._compounds = {
+            a + b: (self._index[a], self._index[b])
+            for terms in self.topics for a, b in zip(terms, terms[1:])
+        }
+        # (terms x topics): column j averages the saturated tf of topic j's terms
+        self._topic_matrix = np.zeros((len(self.terms), len(self.topics)))
+        for j, terms in enumerate(self.topics):
+            for t in set(terms):
+                self._topic_matrix[self._index[t], j] = 1.0 / len(set(terms))
+
+    def _term_counts(self, tokens: Sequence[str]) -> np.ndarray:
+        ids = []
+        for tok in tokens:
+            i = self._index.get(tok)
+            # compounds before prefixes: "spatiotemporal" would otherwise match only "spatio"
+            if i is None and tok in self._compounds:
+                ids.extend(self._compounds[tok])
+                continue
+            if i is None and len(tok) >= self.prefix_chars:
+                i = self._prefixes.get(tok[:self.prefix_chars])
+            if i is not None:
+                ids.append(i)
+        return np.bincount(np.asarray(ids, dtype=np.intp), minlength=len(self.terms))
+
+    def scores(self, texts: Iterable[str]) -> np.ndarray:
+        """Score in [0, 1] for every text (see the module docstring)."""
+        docs = [tokenize(t) for t in texts]
+        if not docs or not self.terms:
+            return np.zeros(len(docs))
+        tf = np.vstack([self._term_counts(d) for d in docs]).astype(float)
+        lengths = np.array([max(len(d), 1) for d in docs], dtype=float)
+        norm = self.k1 * (1 - self.b + self.b * lengths / lengths.mean())
+        # BM25 saturation: one occurrence in an average-length text gives 1.0, capped there
+        sat = np.minimum(tf * (self.k1 + 1) / (tf + norm[:, None]), 1.0)
+        return (sat @ self._topic_matrix).max(axis=1)
+
+    def split(self, candidates: List[Dict], cut: float, keep_top: float = 0.0):
+        """
+        (kept, pruned) candidates, both in input order. Kept: score >= `cut`, plus the
+        best-scored `keep_top` fraction of the batch whatever their score.
+        """
+        if not candidates:
+            return [], []
+        scores = self.scores(candidate_text(c) for c in candidates)
+        keep = scores >= cut
+        n_top = int(np.ceil(len(candidates) * keep_top))
+        if n_top:
+            keep[np.argsort(-scores, kind="stable")[:n_top]] = True
+        kept = [c for c, k in zip(candidates, keep) if k]
+        pruned = [c for c, k in zip(candidates, keep) if not k]
+        return kept, pruned
+
+
+def rank(values: Sequence[float]) -> np.ndarray:
+    """1-based ranks with ties averaged (for Spearman's rho)."""
+    values = np.asarray(values, dtype=float)
+    order = np.argsort(values, kind="stable")
+    ranks = np.empty(len(values))
+    ranks[order] = np.arange(1, len(values) + 1)
+    uniq, inverse = np.unique(values, return_inverse=True)
+    sums = np.bincount(inverse, weights=ranks)
+    counts = np.bincount(inverse)
+    return (sums / counts)[inverse]
+
+
+def spearman(x: Sequence[float], y: Sequence[float]) -> float:
+    if len(x) < 2:
+        return float("nan")
+    return float(np.corrcoef(rank(x), rank(y))[0, 1])
@@ -0,0 +1,414 @@
+"""
+Record the external calls of a run to fixture files, and replay them offline.
+
+    python -m multi_agent.main --record fixtures/2025-10-17          # real run, every response captured
+    python -m multi_agent.benchmarks.pipeline_bench fixtures/2025-10-17   # same run offline, timed
+
+While a Recorder or Replayer is active these calls go through it:
+
+    llm       every model returned by factories.get_llm (structured output and agents included)
+    arxiv     research_tools.search_arxiv
+    tavily    clients from research_tools.get_tavily_client
+    serpapi   research_tools._serpapi_search (Google Scholar)
+    x         clients from posting_tools.get_x_client (create_tweet)
+
+A fixture directory holds:
+
+    cassette.jsonl   one line per call: {"endpoint", "key", "request", "response" | "error", "seconds"}
+    saved/           snapshot of ./saved taken when recording started (logs and derived indexes left out)
+    meta.json        when it was recorded and how many calls per endpoint
+
+Calls are matched on a key built from their arguments, without the parts that
+change from run to run (API keys, arXiv/Tavily "until now" date bounds). A call
+with no recording for its key gets the next unused recording of its endpoint
+instead (counted as a fallback), or raises ReplayMiss with `strict=True`.
+Replay sleeps for the recorded duration of each call times `latency_scale`,
+or a fixed `latency` when one is given. A recorded exception is raised again
+as ReplayedError. The async paths (`ainvoke` of the model and of Tavily
+clients) go through the same cassette and sleep with asyncio.sleep.
+"""
+import os
+import re
+import json
+import time
+import asyncio
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import Field, PrivateAttr
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from ..tools.posting_tools import SAVE_DIR
+
+
+FIXTURE_CASSETTE = "cassette.jsonl"
+FIXTURE_SAVED = "saved"
+FIXTURE_META = "meta.json"
+# Left out of the saved/ snapshot: logs, traces and indexes that are rebuilt on demand
+SNAPSHOT_IGNORE = ("*.log", "*.log.*", "debug*.jsonl*", "results_index.sqlite*", "*.tmp")
+# Set to a placeholder during replay when missing, so nodes do not stop at their "missing key" checks
+REPLAY_ENV_KEYS = (
+    "GOOGLE_API_KEY", "TAVILY_API_KEY", "SERP_API_KEY",
+    "X_API_KEY", "X_API_KEY_SECRET", "X_ACCESS_TOKEN", "X_ACCESS_TOKEN_SECRET",
+)
+
+# arXiv submittedDate bounds (YYYYMMDDHHMMSS); the upper one is "now" and differs every run
+_STAMP_RE = re.compile(r"\b\d{14}\b")
+
+
+class ReplayMiss(LookupError):
+    """No recording left for a call during a strict replay."""
+
+
+class ReplayedError(RuntimeError):
+    """An exception the recorded call raised, raised again on replay."""
+
+
+def _key(*parts) -> str:
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:20]
+
+
+def _message_key(m: BaseMessage) -> list:
+    return [m.type, m.content, [(c["name"], c["args"]) for c in getattr(m, "tool_calls", None) or []]]
+
+
+# Recorder or Replayer currently installed (one at a time per process)
+_active: Optional["_Harness"] = None
+
+
+def get_active() -> Optional["_Harness"]:
+    return _active
+
+
+def _call(endpoint: str, key: str, fn: Callable, request: Any = None,
+          encode: Callable = lambda r: r, decode: Callable = lambda r: r):
+    harness = _active
+    if harness is None:
+        return fn()
+    return harness.call(endpoint, key, fn, request, encode, decode)
+
+
+async def _acall(endpoint: str, key: str, afn: Callable, request: Any = None,
+                 encode: Callable = lambda r: r, decode: Callable = lambda r: r):
+    harness = _active
+    if harness is None:
+        return await afn()
+    return await harness.acall(endpoint, key, afn, request, encode, decode)
+
+
+# ---------- interception points ----------
+
+class RecordReplayChatModel(BaseChatModel):
+    """
+    Chat model standing in for the one get_llm would build. Generations go
+    through the active harness; the real model is only built when a call has
+    to reach it (recording, or no harness active), so replay needs no API key.
+    """
+
+    model_name: str
+    temperature: float = 0
+    inner_factory: Callable = Field(exclude=True)
+    _inner: Any = PrivateAttr(default=None)
+
+    @property
+    def _llm_type(self) -> str:
+        return "record-replay"
+
+    def _inner_model(self):
+        if self._inner is None:
+            self._inner = self.inner_factory(self.model_name, self.temperature)
+        return self._inner
+
+    def bind_tools(self, tools, **kwargs):
+        names = [convert_to_openai_tool(t)["function"]["name"] for t in tools]
+        if isinstance(_active, Replayer):
+            return self.bind(replay_tools=names)
+        # let the real model format the tools, then call our _generate with the same kwargs
+        return self.bind(replay_tools=names, **self._inner_model().bind_tools(tools, **kwargs).kwargs)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        tools = kwargs.pop("replay_tools", None)
+        key = _key(self.model_name, self.temperature, [_message_key(m) for m in messages], tools)
+        message = _call(
+            "llm", key,
+            lambda: self._inner_model()._generate(messages, stop=stop, **kwargs).generations[0].message,
+            encode=message_to_dict,
+            decode=lambda d: messages_from_dict([d])[0],
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        tools = kwargs.pop("replay_tools", None)
+        key = _key(self.model_name, self.temperature, [_message_key(m) for m in messages], tools)
+
+        async def real():
+            result = await self._inner_model()._agenerate(messages, stop=stop, **kwargs)
+            return result.generations[0].message
+
+        message = await _acall(
+            "llm", key, real,
+            encode=message_to_dict,
+            decode=lambda d: messages_from_dict([d])[0],
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def _llm_hook(model_name: str, temperature: float, factory: Callable):
+    return RecordReplayChatModel(model_name=model_name, temperature=temperature, inner_factory=factory)
+
+
+class _TavilyProxy:
+    """What get_tavily_client returns while a harness is active (only `.invoke` / `.ainvoke(query)` are used)."""
+
+    def __init__(self, make_client: Callable, domains, max_results):
+        self._make_client = make_client
+        self._client = None
+        self._config = [sorted(domains or []), max_results]
+
+    def _real_client(self):
+        if self._client is None:
+            self._client = self._make_client()
+        return self._client
+
+    def invoke(self, query, *args, **kwargs):
+        return _call("tavily", _key(query, self._config),
+                     lambda: self._real_client().invoke(query, *args, **kwargs), request=query)
+
+    async def ainvoke(self, query, *args, **kwargs):
+        return await _acall("tavily", _key(query, self._config),
+                            lambda: self._real_client().ainvoke(query, *args, **kwargs), request=query)
+
+
+class _XProxy:
+    """What get_x_client returns while a harness is active (only `create_tweet(text=...)` is used)."""
+
+    def __init__(self, make_client: Callable):
+        self._make_client = make_client
+
+    def create_tweet(self, **kwargs):
+        import tweepy
+        return _call(
+            "x", _key(kwargs), lambda: self._make_client().create_tweet(**kwargs), request=kwargs.get("text"),
+            encode=lambda r: {"data": getattr(r, "data", None)},
+            decode=lambda d: tweepy.Response(d.get("data"), {}, [], {}),
+        )
+
+
+def _patches() -> List[tuple]:
+    """(module, attribute, replacement factory taking the original) for every interception point."""
+    from ..tools import research_tools, posting_tools
+
+    def search_arxiv(original):
+        def patched(query, max_results, ascending=False, use_cache=research_tools.ARXIV_CACHE_ENABLED):
+            request = [_STAMP_RE.sub("<stamp>", query), max_results, ascending]
+            return _call("arxiv", _key(request), lambda: original(query, max_results, ascending, use_cache), request=request)
+        return patched
+
+    def get_tavily_client(original):
+        def patched(api_key, domains_included, start_date, end_date, max_results, *args, **kwargs):
+            return _TavilyProxy(
+                lambda: original(api_key, domains_included, start_date, end_date, max_results, *args, **kwargs),
+                domains_included, max_results,
+            )
+        return patched
+
+    def serpapi_search(original):
+        def patched(params):
+            request = {k: v for k, v in params.items() if k != "api_key"}
+            return _call("serpapi", _key(request), lambda: original(params), request=request)
+        return patched
+
+    def get_x_client(original):
+        def patched(*args, **kwargs):
+            return _XProxy(lambda: original(*args, **kwargs))
+        return patched
+
+    return [
+        (research_tools, "search_arxiv", search_arxiv),
+        (research_tools, "get_tavily_client", get_tavily_client),
+        (research_tools, "_serpapi_search", serpapi_search),
+        (posting_tools, "get_x_client", get_x_client),
+    ]
+
+
+# ---------- harnesses ----------
+
+class _Harness:
+    """Installs the interception points on enter and removes them on exit."""
+
+    def __init__(self, fixture_dir: Path):
+        self.dir = Path(fixture_dir)
+        self.cassette = self.dir / FIXTURE_CASSETTE
+        self._lock = threading.Lock()
+        self._originals: List[tuple] = []
+
+    def call(self, endpoint, key, fn, request, encode, decode):
+        raise NotImplementedError
+
+    async def acall(self, endpoint, key, afn, request, encode, decode):
+        raise NotImplementedError
+
+    def __enter__(self):
+        global _active
+        if _active is not None:
+            raise RuntimeError("A record/replay harness is already active")
+        from .factories import set_llm_hook
+        for module, name, make in _patches():
+            original = getattr(module, name)
+            self._originals.append((module, name, original))
+            setattr(module, name, make(original))
+        set_llm_hook(_llm_hook)
+        _active = self
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        from .factories import set_llm_hook
+        _active = None
+        set_llm_hook(None)
+        for module, name, original in reversed(self._originals):
+            setattr(module, name, original)
+        self._originals.clear()
+        return False
+
+
+class Recorder(_Harness):
+    """Passes every call through and appends its response (or error) and duration to the cassette."""
+
+    def __init__(self, fixture_dir: Path, save_dir: Path = SAVE_DIR):
+        super().__init__(fixture_dir)
+        self.save_dir = Path(save_dir)
+        self.counts: Dict[str, int] = defaultdict(int)
+
+    def __enter__(self):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        snapshot = self.dir / FIXTURE_SAVED
+        if snapshot.exists():
+            shutil.rmtree(snapshot)
+        if self.save_dir.exists():
+            shutil.copytree(self.save_dir, snapshot, ignore=shutil.ignore_patterns(*SNAPSHOT_IGNORE))
+        else:
+            snapshot.mkdir()
+        self.cassette.write_text("", encoding="utf-8")
+        self._started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        return super().__enter__()
+
+    def __exit__(self, *exc):
+        super().__exit__(*exc)
+        meta = {"recorded_at": self._started_at, "calls": dict(self.counts)}
+        (self.dir / FIXTURE_META).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        return False
+
+    def _append(self, row: Dict[str, Any]) -> None:
+        line = json.dumps(row, ensure_ascii=False, default=str)
+        with self._lock:
+            self.counts[row["endpoint"]] += 1
+            with open(self.cassette, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def call(self, endpoint, key, fn, request, encode, decode):
+        t0 = time.perf_counter()
+        row = {"endpoint": endpoint, "key": key, "request": request}
+        try:
+            response = fn()
+        except Exception as e:
+            self._append({**row, "error": f"{type(e).__name__}: {e}", "seconds": time.perf_counter() - t0})
+            raise
+        self._append({**row, "response": encode(response), "seconds": time.perf_counter() - t0})
+        return response
+
+    async def acall(self, endpoint, key, afn, request, encode, decode):
+        t0 = time.perf_counter()
+        row = {"endpoint": endpoint, "key": key, "request": request}
+        try:
+            response = await afn()
+        except Exception as e:
+            self._append({**row, "error": f"{type(e).__name__}: {e}", "seconds": time.perf_counter() - t0})
+            raise
+        self._append({**row, "response": encode(response), "seconds": time.perf_counter() - t0})
+        return response
+
+
+class Replayer(_Harness):
+    """Serves every call from the cassette; nothing reaches the network."""
+
+    def __init__(self, fixture_dir: Path, latency: Optional[float] = None, latency_scale: float = 1.0,
+                 strict: bool = False):
+        super().__init__(fixture_dir)
+        self.latency = latency
+        self.latency_scale = latency_scale
+        self.strict = strict
+        self._by_key: Dict[tuple, deque] = defaultdict(deque)
+        self._by_endpoint: Dict[str, deque] = defaultdict(deque)
+        with open(self.cassette, encoding="utf-8") as f:
+            for i, line in enumerate(f):
+                if line.strip():
+                    row = {**json.loads(line), "id": i}
+                    self._by_key[(row["endpoint"], row["key"])].append(row)
+                    self._by_endpoint[row["endpoint"]].append(row)
+        self._used = set()
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"served": 0, "fallbacks": 0, "misses": 0})
+        self._env_set: List[str] = []
+
+    def __enter__(self):
+        for name in REPLAY_ENV_KEYS:
+            if not os.environ.get(name):
+                os.environ[name] = "replay"
+                self._env_set.append(name)
+        return super().__enter__()
+
+    def __exit__(self, *exc):
+        super().__exit__(*exc)
+        for name in self._env_set:
+            os.environ.pop(name, None)
+        self._env_set.clear()
+        return False
+
+    def _take(self, queue: deque) -> Optional[Dict[str, Any]]:
+        while queue:
+            row = queue.popleft()
+            if row["id"] not in self._used:
+                self._used.add(row["id"])
+                return row
+        return None
+
+    def _next(self, endpoint: str, key: str, request: Any) -> tuple:
+        """The recording to serve for a call and how long to wait before serving it."""
+        with self._lock:
+            row = self._take(self._by_key[(endpoint, key)])
+            stats = self.stats[endpoint]
+            if row is None and not self.strict:
+                row = self._take(self._by_endpoint[endpoint])
+                stats["fallbacks"] += row is not None
+            if row is None:
+                stats["misses"] += 1
+                raise ReplayMiss(f"No recorded {endpoint} call left for {request!r}")
+            stats["served"] += 1
+        delay = self.latency if self.latency is not None else row.get("seconds", 0) * self.latency_scale
+        return row, delay
+
+    @staticmethod
+    def _serve(row: Dict[str, Any], decode: Callable):
+        if "error" in row:
+            raise ReplayedError(row["error"])
+        return decode(row["response"])
+
+    def call(self, endpoint, key, fn, request, encode, decode):
+        row, delay = self._next(endpoint, key, request)
+        if delay > 0:
+            time.sleep(delay)
+        return self._serve(row, decode)
+
+    async def acall(self, endpoint, key, afn, request, encode, decode):
+        row, delay = self._next(endpoint, key, request)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self._serve(row, decode)
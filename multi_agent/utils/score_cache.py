@@ -0,0 +1,126 @@
+import time
+import sqlite3
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+
+CACHE_DIR = Path("./saved/cache")
+SCORE_CACHE_FILE = CACHE_DIR / "score_cache.sqlite"
+
+# Cached scores older than this are treated as misses and evicted
+SCORE_CACHE_TTL_DAYS = 90
+# Oldest rows beyond this count are evicted
+SCORE_CACHE_MAX_ENTRIES = 50_000
+
+
+class ScoreCache:
+    """
+    Persistent cache of LLM relevance scores.
+
+    Rows are keyed by (item_key, context):
+      - item_key: normalized identity of the entry (e.g. "arxiv:2508.15665")
+      - context:  hash of the field string and scoring prompt version, so changing
+                  either one invalidates every cached score at once.
+
+    The cache file is gitignored; the scheduled workflow keeps it between runs
+    with actions/cache, and a lost file only costs LLM calls.
+    One instance holds one sqlite connection; create one per thread.
+    """
+
+    def __init__(
+        self,
+        path: Path = SCORE_CACHE_FILE,
+        ttl_days: float = SCORE_CACHE_TTL_DAYS,
+        max_entries: int = SCORE_CACHE_MAX_ENTRIES,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_days * 86400
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(str(self.path), timeout=30)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scores (
+                item_key TEXT NOT NULL,
+                context TEXT NOT NULL,
+                usefulness_score INTEGER NOT NULL,
+                usefulness_reason TEXT,
+                summary TEXT,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (item_key, context)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS scores_created_at ON scores (created_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def context_key(field: str, prompt_version: Any) -> str:
+        raw = f"{prompt_version}\x00{field.strip().lower()}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+    def get_many(self, item_keys: Iterable[str], context: str) -> Dict[str, Dict[str, Any]]:
+        """Return {item_key: {"usefulness_score", "usefulness_reason", "summary"}} for fresh hits."""
+        keys = list(dict.fromkeys(k for k in item_keys if k))
+        found: Dict[str, Dict[str, Any]] = {}
+        cutoff = time.time() - self.ttl_seconds
+
+        # stay well below sqlite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT item_key, usefulness_score, usefulness_reason, summary FROM scores "
+                f"WHERE context = ? AND created_at >= ? AND item_key IN ({placeholders})",
+                (context, cutoff, *chunk),
+            )
+            for item_key, score, reason, summary in rows:
+                found[item_key] = {
+                    "usefulness_score": score,
+                    "usefulness_reason": reason,
+                    "summary": summary,
+                }
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, item_key: str, context: str) -> Optional[Dict[str, Any]]:
+        return self.get_many([item_key], context).get(item_key)
+
+    def put_many(self, rows: List[Dict[str, Any]], context: str) -> None:
+        """Store rows carrying "item_key", "usefulness_score", "usefulness_reason" and "summary"."""
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (r["item_key"], context, int(r["usefulness_score"]),
+                 r.get("usefulness_reason"), r.get("summary"), now)
+                for r in rows if r.get("item_key")
+            ],
+        )
+        self._conn.commit()
+        self.evict()
+
+    def evict(self) -> int:
+        """Drop expired rows, then the oldest rows beyond max_entries. Returns the number removed."""
+        cur = self._conn.execute("DELETE FROM scores WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        removed = cur.rowcount
+        cur = self._conn.execute(
+            "DELETE FROM scores WHERE rowid IN "
+            "(SELECT rowid FROM scores ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        removed += cur.rowcount
+        self._conn.commit()
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        (size,) = self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": size}
+
+    def close(self) -> None:
+        self._conn.close()
@@ -1,87 +1,284 @@
-import re
+import sys
+import json
 import time
+import queue
+import atexit
+import threading
+from uuid import UUID
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, Optional
 
 from langchain_core.callbacks import BaseCallbackHandler
 from langgraph.graph import MessagesState
 
+from .identity import canonical_url
+from .dates import parse_date
+
 
 class State(MessagesState):
     next: str
 
 
+# Debug log settings
+DEBUG_LOG_DIR = Path("./saved")
+# Echo plain-text log lines to stdout as well (done by the writer thread, off the hot path)
+DEBUG_LOG_ECHO = True
+# Log one JSON object per event to debug.jsonl instead of plain text (`multi_agent.main --debug-jsonl`)
+DEBUG_LOG_STRUCTURED = False
+# Rotate a log file once it grows past this size, keeping this many backups (debug.log.1, ...)
+DEBUG_LOG_MAX_BYTES = 10 * 1024 * 1024
+DEBUG_LOG_BACKUPS = 3
+# Lines written per flush by the writer thread
+DEBUG_LOG_FLUSH_BATCH = 256
+# Prompts / tool inputs longer than this are truncated in the log (None logs them in full)
+DEBUG_LOG_MAX_CHARS = 2000
+
+
+class _LogWriter:
+    """
+    Background writer for one log file.
+
+    Callers only put lines on a queue; a daemon thread keeps the file open,
+    writes whatever has queued up in one batch, flushes once per batch and
+    rotates the file when it exceeds `max_bytes`.
+    """
+
+    def __init__(self, path: Path, max_bytes: int, backups: int, echo: bool):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.echo = echo
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._file = None
+        self._thread = threading.Thread(target=self._run, name=f"log-writer-{path.name}", daemon=True)
+        self._thread.start()
+
+    def write(self, line: str) -> None:
+        self._queue.put(line)
+
+    def flush(self) -> None:
+        """Block until every queued line has been written (returns at once if the writer thread is gone)."""
+        if self._thread.is_alive():
+            self._queue.join()
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _rotate(self) -> None:
+        self._file.close()
+        for i in range(self.backups - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                src.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backups > 0:
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink(missing_ok=True)
+        self._open()
+
+    def _run(self) -> None:
+        # the file is (re)opened inside the try below: a failing open only drops that
+        # batch, and every queued line is still task_done()'d, so flush() never hangs
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < DEBUG_LOG_FLUSH_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                text = "\n".join(batch) + "\n"
+                if self.echo:
+                    sys.stdout.write(text)
+                if self._file is None or self._file.closed:
+                    self._open()
+                self._file.write(text)
+                self._file.flush()
+                if self.max_bytes and self._file.tell() >= self.max_bytes:
+                    self._rotate()
+            except Exception as e:
+                sys.stderr.write(f"DebugHandler: failed to write {self.path}: {e}\n")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+
+_writers: Dict[Path, _LogWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def _get_writer(path: Path, echo: bool) -> _LogWriter:
+    """One writer (thread and file handle) per log file, shared by every DebugHandler."""
+    path = Path(path).resolve()
+    with _writers_lock:
+        writer = _writers.get(path)
+        if writer is None:
+            writer = _writers[path] = _LogWriter(path, DEBUG_LOG_MAX_BYTES, DEBUG_LOG_BACKUPS, echo)
+    return writer
+
+
+@atexit.register
+def flush_debug_logs() -> None:
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.flush()
+
+
+def _preview(value, limit: Optional[int] = DEBUG_LOG_MAX_CHARS) -> str:
+    text = str(value)
+    if limit is not None and len(text) > limit:
+        return text[:limit] + " ..."
+    return text
+
+
+def token_usage(response) -> Dict[str, int]:
+    """{"input_tokens", "output_tokens"} summed over the generations of an LLMResult."""
+    usage = {"input_tokens": 0, "output_tokens": 0}
+    for generations in getattr(response, "generations", None) or []:
+        for gen in generations:
+            meta = getattr(getattr(gen, "message", None), "usage_metadata", None) or {}
+            usage["input_tokens"] += int(meta.get("input_tokens") or 0)
+            usage["output_tokens"] += int(meta.get("output_tokens") or 0)
+    if not any(usage.values()):
+        raw = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+        usage["input_tokens"] = int(raw.get("prompt_tokens") or raw.get("input_tokens") or 0)
+        usage["output_tokens"] = int(raw.get("completion_tokens") or raw.get("output_tokens") or 0)
+    return usage
+
+
 class DebugHandler(BaseCallbackHandler):
-    def __init__(self, log_filename: str = "debug.log"):
-        output_dir = Path("./saved")
+    """
+    Logs LLM, tool, agent and chain events of a run.
+
+    Lines are handed to a shared background writer (see _LogWriter), so logging
+    never blocks the agent loop on file I/O. With `structured=True` (default:
+    DEBUG_LOG_STRUCTURED, read when the handler is created) one JSON object per
+    event is written to `<log_filename stem>.jsonl` instead, carrying run_id,
+    parent_run_id, node, event, name, duration and token usage.
+
+    Start times are kept per run_id, so nested and concurrent calls get their
+    own durations.
+    """
+
+    def __init__(self, log_filename: str = "debug.log", node: Optional[str] = None, structured: Optional[bool] = None):
+        if structured is None:
+            structured = DEBUG_LOG_STRUCTURED
+        output_dir = DEBUG_LOG_DIR
         output_dir.mkdir(parents=True, exist_ok=True)
+        self.structured = structured
+        self.node = node
+        if structured:
+            log_filename = Path(log_filename).stem + ".jsonl"
         self.log_file: Path = output_dir / log_filename
-        self._llm_t0 = None
-        self._tool_t0 = None
+        self._writer = _get_writer(self.log_file, echo=DEBUG_LOG_ECHO and not structured)
+        self._t0: Dict[UUID, float] = {}
 
     def _ts(self) -> str:
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
 
     def _log(self, message: str):
-        line = f"[{self._ts()}] {message}"
-        print(line)
-        with open(self.log_file, "a", encoding="utf-8") as f:
-            f.write(line + "\n")
+        self._writer.write(f"[{self._ts()}] {message}")
+
+    def _start(self, run_id) -> None:
+        if run_id is not None:
+            self._t0[run_id] = time.perf_counter()
+
+    def _elapsed(self, run_id) -> Optional[float]:
+        t0 = self._t0.pop(run_id, None)
+        return time.perf_counter() - t0 if t0 is not None else None
+
+    def _event(self, event: str, kwargs, **fields) -> None:
+        metadata = kwargs.get("metadata") or {}
+        record = {
+            "ts": self._ts(),
+            "run_id": str(kwargs["run_id"]) if kwargs.get("run_id") else None,
+            "parent_run_id": str(kwargs["parent_run_id"]) if kwargs.get("parent_run_id") else None,
+            "node": self.node or metadata.get("langgraph_node"),
+            "event": event,
+            **fields,
+        }
+        self._writer.write(json.dumps(record, ensure_ascii=False, default=str))
+
+    def flush(self) -> None:
+        self._writer.flush()
 
     def on_llm_start(self, serialized, prompts, **kwargs):
-        self._llm_t0 = time.perf_counter()
+        self._start(kwargs.get("run_id"))
+        if self.structured:
+            self._event("llm_start", kwargs, name=(serialized or {}).get("name"), prompts=len(prompts))
+            return
         self._log("\n[LLM START]")
         for i, p in enumerate(prompts):
-            self._log(f"Prompt {i}:\n{p}\n")
+            self._log(f"Prompt {i}:\n{_preview(p)}\n")
 
     def on_llm_end(self, response, **kwargs) -> None:
-        elapsed = None
-        if self._llm_t0 is not None:
-            elapsed = time.perf_counter() - self._llm_t0
-            self._llm_t0 = None
-        usage = getattr(response, "llm_output", {})   
+        elapsed = self._elapsed(kwargs.get("run_id"))
+        if self.structured:
+            self._event("llm_end", kwargs, duration=elapsed, usage=token_usage(response))
+            return
+        usage = getattr(response, "llm_output", {})
         if elapsed is not None:
             self._log(f"[LLM END] elapsed={elapsed:.3f}s | usage: {usage}")
         else:
             self._log(f"[LLM END] usage: {usage}")
 
+    def on_llm_error(self, error, **kwargs):
+        elapsed = self._elapsed(kwargs.get("run_id"))
+        if self.structured:
+            self._event("llm_error", kwargs, duration=elapsed, error=str(error))
+        else:
+            self._log(f"[LLM ERROR] {error}")
+
     def on_agent_action(self, action, **kwargs):
 
         tool_name = getattr(action, "tool", "<unknown>")
         tool_input = getattr(action, "tool_input", "")
 
-        preview = str(tool_input)
-        if len(preview) > 500:
-            preview = preview[:500] + " ..."
-        self._log(f"[AGENT] Plan: call tool '{tool_name}' with input: {preview}")
+        if self.structured:
+            self._event("agent_action", kwargs, name=tool_name)
+            return
+        self._log(f"[AGENT] Plan: call tool '{tool_name}' with input: {_preview(tool_input, 500)}")
 
     def on_agent_finish(self, finish, **kwargs):
 
+        if self.structured:
+            self._event("agent_finish", kwargs)
+            return
         out = getattr(finish, "return_values", {})
-        preview = str(out)
-        if len(preview) > 500:
-            preview = preview[:500] + " ..."
-        self._log(f"[AGENT] Finished with: {preview}")
+        self._log(f"[AGENT] Finished with: {_preview(out, 500)}")
 
     def on_tool_start(self, serialized, input_str, **kwargs):
-        self._tool_t0 = time.perf_counter()
-        self._log(f"\n[TOOL START] {serialized.get('name')}")
-        self._log(f"Input: {input_str}")
+        self._start(kwargs.get("run_id"))
+        name = (serialized or {}).get("name")
+        if self.structured:
+            self._event("tool_start", kwargs, name=name)
+            return
+        self._log(f"\n[TOOL START] {name}")
+        self._log(f"Input: {_preview(input_str)}")
 
     def on_tool_end(self, output, **kwargs):
-        output_str = str(output)
-        preview = output_str[:500]
-        suffix = " ..." if len(output_str) > 500 else ""
-        elapsed = None
-        if self._tool_t0 is not None:
-            elapsed = time.perf_counter() - self._tool_t0
-            self._tool_t0 = None
+        elapsed = self._elapsed(kwargs.get("run_id"))
+        if self.structured:
+            self._event("tool_end", kwargs, name=kwargs.get("name"), duration=elapsed)
+            return
+        preview = _preview(output, 500)
         if elapsed is not None:
-            self._log(f"[TOOL END] elapsed={elapsed:.3f}s | Output: {preview}{suffix}")
+            self._log(f"[TOOL END] elapsed={elapsed:.3f}s | Output: {preview}")
+        else:
+            self._log(f"[TOOL END] Output: {preview}")
+
+    def on_tool_error(self, error, **kwargs):
+        elapsed = self._elapsed(kwargs.get("run_id"))
+        if self.structured:
+            self._event("tool_error", kwargs, name=kwargs.get("name"), duration=elapsed, error=str(error))
         else:
-            self._log(f"[TOOL END] Output: {preview}{suffix}")
+            self._log(f"[TOOL ERROR] {error}")
 
     def on_chain_start(self, serialized, inputs, **kwargs):
+        self._start(kwargs.get("run_id"))
         name = None
         if isinstance(serialized, dict):
             name = serialized.get("name") or serialized.get("id")
@@ -89,6 +286,10 @@ class DebugHandler(BaseCallbackHandler):
             name = serialized
         else:
             name = type(serialized).__name__
+        name = kwargs.get("name") or name
+        if self.structured:
+            self._event("chain_start", kwargs, name=name)
+            return
         try:
             keys = list(inputs.keys()) if isinstance(inputs, dict) else type(inputs).__name__
         except Exception:
@@ -97,25 +298,50 @@ class DebugHandler(BaseCallbackHandler):
 
 
     def on_chain_end(self, outputs, **kwargs):
+        elapsed = self._elapsed(kwargs.get("run_id"))
+        if self.structured:
+            self._event("chain_end", kwargs, duration=elapsed)
+            return
         keys = list(outputs.keys()) if isinstance(outputs, dict) else type(outputs).__name__
         self._log(f"[CHAIN END] Outputs: {keys}")
 
+    def on_chain_error(self, error, **kwargs):
+        elapsed = self._elapsed(kwargs.get("run_id"))
+        if self.structured:
+            self._event("chain_error", kwargs, duration=elapsed, error=str(error))
+        else:
+            self._log(f"[CHAIN ERROR] {error}")
+
  
-def normalize_url(url):
+class RateLimiter:
+    """
+    Thread-safe limiter allowing at most `rate` calls per second across all threads.
+    `wait()` blocks until the caller may issue its request.
+    """
 
-    match = re.search(r"(\d{4}\.\d{4,5})(v\d)?", url)
-    if match:
-        return match.group(1)  
-    return url
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
 
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
 
-def parse_publish_date(d: str):
+ 
+def normalize_url(url):
+    """Same identity key as everywhere else (see identity.canonical_url)."""
+    return canonical_url(url or "")
 
-    if not isinstance(d, str):
-        return datetime.min
-    for fmt in ("%d-%m-%Y", "%d-%m-%y", "%Y-%m-%d"):
-        try:
-            return datetime.strptime(d, fmt)
-        except Exception:
-            pass
-    return datetime.min
\ No newline at end of file
+
+def parse_publish_date(d: str):
+    """datetime of a publish_date string (see dates.parse_date), datetime.min if unknown."""
+    parsed = parse_date(d) if isinstance(d, str) else None
+    return datetime(parsed.year, parsed.month, parsed.day) if parsed else datetime.min
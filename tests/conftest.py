@@ -0,0 +1,19 @@
+import os
+from pathlib import Path
+
+import pytest
+
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent / "multi_agent"
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """
+    Run the test from an empty scratch directory: ./saved starts empty and the
+    prompts are read through a ./multi_agent symlink, as in pipeline_bench.
+    """
+    (tmp_path / "saved").mkdir()
+    os.symlink(PACKAGE_DIR, tmp_path / "multi_agent", target_is_directory=True)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,36 @@
+"""Small fakes shared by the tests."""
+import json
+
+from multi_agent.tools.scoring_tools import BatchScores, EntryScore
+
+
+class FakeScorer:
+    """Stands in for llm.with_structured_output(BatchScores); counts the calls."""
+
+    def __init__(self, llm):
+        self.llm = llm
+
+    def invoke(self, messages, config=None):
+        self.llm.calls += 1
+        if self.llm.fail:
+            raise RuntimeError("429 Resource has been exhausted")
+        rows = json.loads(messages[-1].content.split("\n", 1)[1])
+        self.llm.batch_sizes.append(len(rows))
+        return BatchScores(scores=[
+            EntryScore(index=r["index"], usefulness_score=self.llm.score, usefulness_reason="fake", summary="fake summary")
+            for r in rows
+        ])
+
+
+class FakeLLM:
+    """Chat model stand-in for the batch scorers; `fail=True` makes every call raise, like a Gemini 429."""
+
+    def __init__(self, score: int = 90, fail: bool = False):
+        self.score = score
+        self.fail = fail
+        self.calls = 0
+        self.batch_sizes = []
+
+    def with_structured_output(self, schema):
+        assert schema is BatchScores
+        return FakeScorer(self)
@@ -0,0 +1,107 @@
+import json
+import threading
+from datetime import date, datetime, timezone
+
+import pytest
+
+from multi_agent.ResearchTeam import arxiv_node, blog_node
+from multi_agent.tools import research_tools
+from multi_agent.tools.research_tools import ArxivWatermarks
+
+from fakes import FakeLLM
+
+
+NEWEST = "20251011000000"
+
+
+@pytest.fixture
+def harvest(workdir, monkeypatch):
+    """arxiv_node with a stubbed arXiv harvest returning a few on-topic papers."""
+    def fake_harvest(query, field, start_date, end_date, first_run_results, limit):
+        results = [{
+            "source": "arxiv",
+            "title": f"Spatio temporal point process model {i}",
+            "authors": ["Jane Doe"],
+            "publish_date": "10-10-2025",
+            "summary": "Point process survey data.",
+            "url": f"https://arxiv.org/abs/2510.0{i}000",
+        } for i in range(3)]
+        return json.dumps({"results": results}), NEWEST
+
+    monkeypatch.setattr(arxiv_node, "harvest_arxiv", fake_harvest)
+    arxiv_node._pending_watermarks.clear()
+    yield
+    arxiv_node._pending_watermarks.clear()
+
+
+def _run(monkeypatch, llm):
+    monkeypatch.setattr(arxiv_node, "get_llm", lambda model_name: llm)
+    arxiv_node.arxiv_batch()
+    arxiv_node._commit_watermarks()
+    return ArxivWatermarks().data
+
+
+def test_watermark_advances_when_everything_was_scored(harvest, monkeypatch):
+    marks = _run(monkeypatch, FakeLLM())
+    assert list(marks[arxiv_node.FIELD].values()) == [NEWEST]
+
+
+def test_failed_scoring_keeps_the_watermark(harvest, monkeypatch):
+    llm = FakeLLM(fail=True)
+    marks = _run(monkeypatch, llm)
+    assert llm.calls == 1
+    assert marks.get(arxiv_node.FIELD, {}) == {}
+
+
+class _Clock:
+    """Stand-in for arxiv_node.datetime whose now() is set by the test."""
+    current = datetime(2025, 10, 17, 9, 0, 0, tzinfo=timezone.utc)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.current
+
+
+def test_end_date_is_taken_when_each_search_runs(monkeypatch):
+    seen = []
+
+    def fake_harvest(query, field, start_date, end_date, first_run_results, limit):
+        seen.append(end_date)
+        return "{}", None
+
+    monkeypatch.setattr(arxiv_node, "harvest_arxiv", fake_harvest)
+    monkeypatch.setattr(arxiv_node, "datetime", _Clock)
+
+    arxiv_node._harvest("all:\"a\"")
+    monkeypatch.setattr(_Clock, "current", datetime(2025, 10, 18, 1, 2, 3, tzinfo=timezone.utc))
+    arxiv_node._harvest("all:\"a\"")
+    monkeypatch.setattr(arxiv_node, "END_DATE", "20250601000000")
+    arxiv_node._harvest("all:\"a\"")
+    assert seen == ["20251017090000", "20251018010203", "20250601000000"]
+
+    monkeypatch.setattr(blog_node, "END_DATE", None)
+    assert blog_node._end_date() == date.today().strftime("%Y-%m-%d")
+
+
+def test_search_cache_is_keyed_on_the_window_day(workdir, monkeypatch):
+    class FakeClient:
+        calls = 0
+
+        def results(self, search):
+            FakeClient.calls += 1
+            return [{"url": "https://arxiv.org/abs/2510.00001", "query": search.query}]
+
+    monkeypatch.setattr(research_tools, "get_arxiv_client", lambda page_size: (FakeClient(), threading.Lock()))
+    monkeypatch.setattr(research_tools, "_arxiv_record", lambda r: r)
+
+    def search(end):
+        return research_tools.search_arxiv(f'all:"a" AND submittedDate: [20250101000000 TO {end}]', 10, use_cache=True)
+
+    first = search("20251017090000")
+    assert search("20251017235959") == first  # a later run the same day
+    assert FakeClient.calls == 1
+    search("20251018000001")
+    assert FakeClient.calls == 2
+    # the lower end (a watermark) stays exact
+    research_tools.search_arxiv('all:"a" AND submittedDate: [20250101000001 TO 20251017090000]', 10, use_cache=True)
+    assert FakeClient.calls == 3
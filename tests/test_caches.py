@@ -0,0 +1,77 @@
+from multi_agent.utils import kv_cache, score_cache
+from multi_agent.utils.kv_cache import KVCache
+from multi_agent.utils.score_cache import ScoreCache
+
+
+class _Clock:
+    """Stands in for the `time` module of a cache; `now` is moved by the test."""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+def test_kv_cache_entries_expire_after_ttl(tmp_path, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(kv_cache, "time", clock)
+    with KVCache(tmp_path / "kv.sqlite", ttl_seconds=60) as cache:
+        cache.put("old", {"v": 1})
+        clock.now += 30
+        cache.put("new", [1, 2])
+        clock.now += 40  # "old" is 70s old, "new" 40s
+
+        assert cache.get("old") is None
+        assert cache.get_many(["old", "new"]) == {"new": [1, 2]}
+        assert cache.stats() == {"hits": 1, "misses": 2, "entries": 2}
+
+        assert cache.evict() == 1
+        assert cache.stats()["entries"] == 1
+
+        cache.put("old", {"v": 2})  # a rewrite restarts the clock
+        clock.now += 50
+        assert cache.get("old") == {"v": 2}
+
+
+def test_kv_cache_without_ttl_never_expires(tmp_path, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(kv_cache, "time", clock)
+    with KVCache(tmp_path / "kv.sqlite") as cache:
+        cache.put("k", "v")
+        clock.now += 10 * 365 * 86400
+        assert cache.get("k") == "v"
+        assert cache.evict() == 0
+
+
+def _row(key, score=80):
+    return {"item_key": key, "usefulness_score": score, "usefulness_reason": "r", "summary": "s"}
+
+
+def test_score_cache_ttl_and_size_eviction(tmp_path, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(score_cache, "time", clock)
+    cache = ScoreCache(tmp_path / "scores.sqlite", ttl_days=1, max_entries=3)
+    ctx = ScoreCache.context_key("Point Process", "v1")
+    try:
+        cache.put_many([_row("a"), _row("b")], ctx)
+        clock.now += 0.5 * 86400
+        cache.put_many([_row("c")], ctx)
+        clock.now += 0.6 * 86400  # a and b are 1.1 days old, c 0.6
+
+        assert set(cache.get_many(["a", "b", "c"], ctx)) == {"c"}
+        assert cache.evict() == 2
+        assert cache.stats()["entries"] == 1
+
+        # beyond max_entries the oldest rows go, on every put
+        for i, key in enumerate("defg"):
+            clock.now += 1
+            cache.put_many([_row(key, score=i)], ctx)
+        assert set(cache.get_many(list("cdefg"), ctx)) == {"e", "f", "g"}
+        assert cache.stats()["entries"] == 3
+
+        # another field or prompt version is another context
+        assert cache.get("g", ScoreCache.context_key("Point Process", "v2")) is None
+        assert cache.get("g", ScoreCache.context_key("  point process ", "v1"))["usefulness_score"] == 3
+    finally:
+        cache.close()
@@ -0,0 +1,24 @@
+from multi_agent.utils.checkpoints import SqliteCheckpointer
+
+
+def _threads(cp):
+    return sorted(t for (t,) in cp._conn.execute("SELECT thread_id FROM checkpoints"))
+
+
+def test_prune_drops_only_stale_unfinished_runs(tmp_path):
+    cp = SqliteCheckpointer(tmp_path / "checkpoints.sqlite")
+    old, fresh, resumed = "20250101T000000Z", "20991231T000000Z", "20250102T000000Z"
+    cp._conn.executemany("INSERT INTO runs (run_id, started_at, resumed_at) VALUES (?, ?, ?)", [
+        (old, "2025-01-01T00:00:00+00:00", None),
+        (fresh, "2099-12-31T00:00:00+00:00", None),
+        (resumed, "2025-01-02T00:00:00+00:00", "2099-12-31T00:00:00+00:00"),
+    ])
+    for thread in (old, f"{old}:arxiv", fresh, resumed):
+        cp._conn.execute("INSERT INTO checkpoints VALUES (?, '', '1', NULL, 't', x'', 't', x'')", (thread,))
+    cp._conn.commit()
+
+    assert cp.prune_stale_runs(max_age_days=7) == [old]
+    assert old not in {r["run_id"] for r in cp.unfinished_runs()}
+    assert _threads(cp) == sorted([fresh, resumed])
+    assert cp.prune_stale_runs(max_age_days=7) == []
+    cp.close()
@@ -0,0 +1,53 @@
+from datetime import date, datetime
+
+import pytest
+
+from multi_agent.utils.dates import entry_date, parse_date, to_ddmmyyyy, to_iso
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("14-08-2025", date(2025, 8, 14)),
+    ("4/8/2025", date(2025, 8, 4)),
+    ("14.08.25", date(2025, 8, 14)),
+    ("01-01-70", date(1970, 1, 1)),  # two-digit years pivot like strptime's %y
+    ("2025-08-14", date(2025, 8, 14)),
+    ("2025-08-14T09:30:00Z", date(2025, 8, 14)),
+    ("2025-08-14 09:30:00+02:00", date(2025, 8, 14)),
+    ("Thu, 14 Aug 2025 09:30:00 GMT", date(2025, 8, 14)),
+    ("14 August 2025", date(2025, 8, 14)),
+    ("  14-08-2025  ", date(2025, 8, 14)),
+    (datetime(2025, 8, 14, 23, 59), date(2025, 8, 14)),
+    (date(2025, 8, 14), date(2025, 8, 14)),
+])
+def test_parse_date_layouts(value, expected):
+    assert parse_date(value) == expected
+
+
+@pytest.mark.parametrize("value", [
+    None, "", "unknown", True, "31-02-2025", "2025-13-01", "14 Foo 2025", "yesterday", "2025",
+])
+def test_parse_date_rejects(value):
+    assert parse_date(value) is None
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2025", date(2025, 1, 1)),
+    ("2025/8", date(2025, 8, 1)),
+    ("2025-13", None),
+    ("14-08-2025", date(2025, 8, 14)),
+])
+def test_partial_dates(value, expected):
+    assert parse_date(value, partial=True) == expected
+
+
+def test_formatters_and_entry_date():
+    assert to_iso("Thu, 14 Aug 2025 09:30:00 GMT") == "2025-08-14"
+    assert to_iso("unknown") is None
+    assert to_ddmmyyyy("2025-08-14") == "14-08-2025"
+    assert to_ddmmyyyy("2025/8", partial=True) == "01-08-2025"
+    assert to_ddmmyyyy("n/a") == "unknown"
+
+    # the ISO date stored at save time wins over the free-form publish_date
+    assert entry_date({"publish_date": "01-01-2020", "publish_date_iso": "2025-08-14"}) == date(2025, 8, 14)
+    assert entry_date({"publish_date": "14-08-2025"}) == date(2025, 8, 14)
+    assert entry_date({}) is None
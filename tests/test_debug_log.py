@@ -0,0 +1,49 @@
+import json
+import uuid
+
+from multi_agent.utils import utils
+from multi_agent.utils.utils import DebugHandler, _LogWriter
+
+
+def test_flush_returns_when_log_file_cannot_be_opened(tmp_path, capsys):
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("")
+    writer = _LogWriter(blocker / "debug.log", max_bytes=0, backups=0, echo=False)
+    writer.write("line")
+    writer.flush()  # hung forever when the writer thread died on open()
+    assert "failed to write" in capsys.readouterr().err
+
+
+def test_chain_error_drops_start_time(workdir, monkeypatch):
+    monkeypatch.setattr(utils, "DEBUG_LOG_DIR", workdir / "saved")
+    handler = DebugHandler(node="test")
+    run_id = uuid.uuid4()
+    handler.on_chain_start({"name": "chain"}, {}, run_id=run_id)
+    handler.on_chain_error(RuntimeError("boom"), run_id=run_id)
+    handler.flush()
+    assert handler._t0 == {}
+    assert "[CHAIN ERROR] boom" in (workdir / "saved" / "debug.log").read_text()
+
+
+def test_structured_flag_reaches_every_node_config(workdir, monkeypatch):
+    from multi_agent.ResearchTeam import arxiv_node, blog_node, gscholar_node
+
+    monkeypatch.setattr(utils, "DEBUG_LOG_DIR", workdir / "saved")
+    monkeypatch.setattr(utils, "DEBUG_LOG_STRUCTURED", True)
+    for node in (arxiv_node, blog_node, gscholar_node):
+        handler = node._config("run")["callbacks"][0]
+        assert handler.structured and handler.log_file.name == "debug.jsonl"
+
+    handler.on_chain_start({"name": "chain"}, {}, run_id=uuid.uuid4())
+    handler.flush()
+    record = json.loads((workdir / "saved" / "debug.jsonl").read_text().splitlines()[-1])
+    assert (record["event"], record["node"], record["name"]) == ("chain_start", "gscholar", "chain")
+
+
+def test_main_debug_jsonl_flag(monkeypatch):
+    from multi_agent import main
+
+    monkeypatch.setattr(utils, "DEBUG_LOG_STRUCTURED", False)
+    monkeypatch.setattr(main, "run_workflow", lambda resume=False: None)
+    assert main.main(["--debug-jsonl"]) == 0
+    assert utils.DEBUG_LOG_STRUCTURED is True
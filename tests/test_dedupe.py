@@ -0,0 +1,71 @@
+import json
+import os
+
+import pytest
+
+from multi_agent import manage
+from multi_agent.tools import research_tools
+from multi_agent.tools.result_store import _titles_match, open_store, title_key
+
+
+def _write(save_dir, name, title, score=80, url="", date="01-03-2025", mtime=None, **extra):
+    entry = {"source": "gscholar", "title": title, "authors": ["Jane Doe"], "publish_date": date,
+             "url": url or f"https://example.org/{name}", "usefulness_score": score, **extra}
+    path = save_dir / f"{name}.json"
+    path.write_text(json.dumps(entry), encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+@pytest.mark.parametrize("a, b, same", [
+    ("Spatio-temporal point processes: a survey", "Spatio temporal point processes - a survey.", True),
+    ("Neural Spatio-Temporal Point Processes", "Neural Spatiotemporal Point Process", True),
+    ("Neural point processes for crime forecasting, Part I", "Neural point processes for crime forecasting, Part II", False),
+    ("A review of spatio-temporal point processes (Part 1)", "A review of spatio-temporal point processes (Part 2)", False),
+    ("Hawkes processes for earthquake modelling", "Hawkes processes for earthquake modelling II", False),
+    ("Hawkes processes for earthquake modelling", "Hawkes processes for earthquake modeling", True),
+    ("Hawkes processes for earthquake forecasting", "Hawkes processes for wildfire forecasting", False),
+    ("Survey data", "Survey data", False),  # too short to match on
+])
+def test_titles_match(a, b, same):
+    assert _titles_match(title_key(a), title_key(b)) is same
+
+
+def test_duplicate_groups_keep_the_best_and_spare_series_parts(tmp_path):
+    _write(tmp_path, "a_old", "Spatio-temporal point processes: a survey", score=70, mtime=1_000_000)
+    _write(tmp_path, "a_new", "Spatio temporal point processes - a survey.", score=85, mtime=2_000_000)
+    _write(tmp_path, "a_other_year", "Spatio-temporal point processes: a survey", date="01-03-2021")
+    _write(tmp_path, "p1", "Neural point processes for crime forecasting, Part I")
+    _write(tmp_path, "p2", "Neural point processes for crime forecasting, Part II")
+    _write(tmp_path, "d1", "Some title", url="https://doi.org/10.1000/xyz.1")
+    _write(tmp_path, "d2", "Another title entirely", url="https://publisher.org/article/10.1000/xyz.1/full")
+
+    with open_store(tmp_path) as store:
+        groups = [[m["file"] for m in g] for g in store.duplicate_groups()]
+    assert sorted(groups) == [["a_new.json", "a_old.json"], ["d1.json", "d2.json"]]
+
+
+def test_manage_dedupe_reports_then_applies(tmp_path, capsys):
+    _write(tmp_path, "a_old", "Spatio-temporal point processes: a survey", score=70)
+    _write(tmp_path, "a_new", "Spatio temporal point processes - a survey.", score=85)
+    _write(tmp_path, "p1", "Neural point processes for crime forecasting, Part I")
+    _write(tmp_path, "p2", "Neural point processes for crime forecasting, Part II")
+
+    assert manage.main(["--save-dir", str(tmp_path), "dedupe"]) == 0
+    assert "Would remove 1 duplicate files in 1 groups" in capsys.readouterr().out
+    assert len(list(tmp_path.glob("*.json"))) == 4
+
+    assert manage.main(["--save-dir", str(tmp_path), "dedupe", "--apply"]) == 0
+    assert sorted(p.name for p in tmp_path.glob("*.json")) == ["a_new.json", "p1.json", "p2.json"]
+    with open_store(tmp_path) as store:
+        assert store.count() == 3
+
+
+def test_urlless_entry_is_checked_by_doi_and_title(workdir):
+    _write(workdir / "saved", "kept", "Spatio-temporal point processes: a survey", doi="10.1000/abc")
+    by_title = {"source": "blog", "title": "Spatio temporal point processes - a survey", "publish_date": "05-03-2025"}
+    by_doi = {"source": "blog", "title": "Completely different", "doi": "10.1000/ABC"}
+
+    assert "already saved as 'kept.json' (same title)" in research_tools.write_json_entry(by_title, "t")
+    assert "already saved as 'kept.json' (same doi)" in research_tools.write_json_entry(by_doi, "d")
+    assert not (workdir / "saved" / "t.json").exists()
@@ -0,0 +1,85 @@
+import pytest
+
+from multi_agent.utils.identity import canonical_url, extract_doi
+
+
+ARXIV_FORMS = [
+    "https://arxiv.org/abs/2508.15665",
+    "http://arxiv.org/abs/2508.15665v2",
+    "https://arxiv.org/pdf/2508.15665",
+    "https://arxiv.org/pdf/2508.15665v3.pdf",
+    "https://www.arxiv.org/html/2508.15665v1",
+    "https://ARXIV.org/abs/2508.15665?context=cs#section",
+    "arxiv:2508.15665",
+    "arXiv:2508.15665v4",
+]
+
+DOI_FORMS = [
+    "https://doi.org/10.3389/fpsyg.2020.01234",
+    "https://www.frontiersin.org/articles/10.3389/fpsyg.2020.01234/full",
+    "https://www.frontiersin.org/articles/10.3389/fpsyg.2020.01234/abstract",
+    "https://onlinelibrary.wiley.com/doi/10.3389/fpsyg.2020.01234/epdf",
+    "https://onlinelibrary.wiley.com/doi/pdf/10.3389/fpsyg.2020.01234",
+    "https://doi.org/10.3389%2Ffpsyg.2020.01234",
+]
+
+SAME_PAGE = [
+    "https://www.Example.co/p/post/?utm_source=x&id=3#top",
+    "http://example.co/p/post?id=3",
+    "https://EXAMPLE.co/p/post?utm_medium=email&id=3&fbclid=abc",
+    "example.co/p/post/?id=3&ref=twitter",
+]
+
+SAMPLE_URLS = ARXIV_FORMS + DOI_FORMS + SAME_PAGE + [
+    "https://scholar.google.com/citations?view_op=view_citation&citation_for_view=Wnxq0mgAAAAJ:u5HHmVD_uO8C",
+    "https://scholar.google.com/scholar?cluster=123456789",
+    "https://medium.com/@someone/intro-to-v2-0-of-x-1a2b3c",
+    "https://blog.example.org/posts/b?b=2&a=1",
+    "https://arxiv.org/abs/math/0601001v2",
+    "",
+]
+
+
+@pytest.mark.parametrize("url", ARXIV_FORMS)
+def test_arxiv_forms_collapse_to_one_key(url):
+    assert canonical_url(url) == "arxiv:2508.15665"
+
+
+def test_old_style_arxiv_id():
+    assert canonical_url("https://arxiv.org/pdf/math/0601001v2.pdf") == canonical_url("arxiv:math/0601001") == "arxiv:math/0601001"
+
+
+@pytest.mark.parametrize("url", DOI_FORMS)
+def test_doi_forms_collapse_to_one_key(url):
+    assert canonical_url(url) == "doi:10.3389/fpsyg.2020.01234"
+
+
+@pytest.mark.parametrize("text, doi", [
+    ("https://doi.org/10.1002/sim.9999/full", "10.1002/sim.9999"),
+    ("https://example.com/doi/10.1002/sim.9999/abstract/extra", "10.1002/sim.9999"),
+    ("doi: 10.1016/j.spasta.2024.100801.", "10.1016/j.spasta.2024.100801"),
+    ("https://example.com/no/doi/here", None),
+])
+def test_extract_doi_drops_page_suffixes(text, doi):
+    assert extract_doi(text) == doi
+
+
+@pytest.mark.parametrize("url", SAME_PAGE)
+def test_tracking_params_fragment_case_and_www_are_ignored(url):
+    assert canonical_url(url) == "http://example.co/p/post?id=3"
+
+
+def test_query_parameters_are_sorted():
+    assert canonical_url("https://x.org/a?b=2&a=1") == canonical_url("https://x.org/a?a=1&b=2")
+
+
+def test_distinct_pages_stay_distinct():
+    assert canonical_url("https://example.co/p/post?id=3") != canonical_url("https://example.co/p/post?id=4")
+    assert canonical_url("https://arxiv.org/abs/2508.15665") != canonical_url("https://arxiv.org/abs/2508.15666")
+
+
+@pytest.mark.parametrize("url", SAMPLE_URLS)
+def test_canonical_url_is_idempotent(url):
+    key = canonical_url(url)
+    assert canonical_url(key) == key
+    assert key == key.lower()
@@ -0,0 +1,101 @@
+import json
+from uuid import uuid4
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from multi_agent.utils import metrics
+from multi_agent.utils.metrics import RunMetrics, metrics_callbacks, percentile, to_prometheus
+
+
+@pytest.mark.parametrize("values, q, expected", [
+    ([], 50, None),
+    ([3.0], 95, 3.0),
+    ([4, 1, 3, 2], 50, 2),
+    ([4, 1, 3, 2], 95, 4),
+    (list(range(1, 101)), 95, 95),
+    (list(range(1, 11)), 0, 1),
+])
+def test_percentile_is_nearest_rank(values, q, expected):
+    assert percentile(values, q) == expected
+
+
+def _llm_result(inp, out):
+    message = AIMessage(content="ok", usage_metadata={"input_tokens": inp, "output_tokens": out, "total_tokens": inp + out})
+    return LLMResult(generations=[[ChatGeneration(message=message)]])
+
+
+@pytest.fixture
+def run():
+    m = RunMetrics()
+    arxiv = m.handler("arxiv")
+    for inp, out in ((100, 10), (50, 5)):
+        rid = uuid4()
+        arxiv.on_llm_start({"name": "gemini"}, ["p"], run_id=rid)
+        arxiv.on_llm_end(_llm_result(inp, out), run_id=rid)
+    rid = uuid4()
+    arxiv.on_llm_start({}, ["p"], run_id=rid)
+    arxiv.on_llm_error(RuntimeError("429"), run_id=rid)
+    rid = uuid4()
+    arxiv.on_tool_start({"name": "arxiv_tool"}, "q", run_id=rid)
+    arxiv.on_tool_end("[]", run_id=rid)
+    arxiv.on_llm_end(_llm_result(1, 1), run_id=uuid4())  # never started: ignored
+    m.record_tool("blog", "tavily_search", 0.25)
+    m.record_node("arxiv", 12.5)
+    return m
+
+
+def test_summary_per_node_and_totals(run):
+    s = run.summary()
+    arxiv, blog = s["nodes"]["arxiv"], s["nodes"]["blog"]
+    assert arxiv["llm"]["count"] == 3 and arxiv["errors"] == 1
+    assert arxiv["tokens"] == {"input_tokens": 150, "output_tokens": 15}
+    assert arxiv["tool_calls"] == 1 and list(arxiv["tools"]) == ["arxiv_tool"]
+    assert arxiv["seconds"] == 12.5 and blog["seconds"] is None
+    assert blog["tools"]["tavily_search"] == {"count": 1, "p50": 0.25, "p95": 0.25, "total": 0.25}
+    assert s["totals"] == {
+        "llm_calls": 3, "llm_seconds": pytest.approx(arxiv["llm"]["total"]), "tool_calls": 2,
+        "input_tokens": 150, "output_tokens": 15, "errors": 1,
+    }
+
+
+def test_prometheus_text_format(run):
+    text = to_prometheus(run.summary(), prefix="t")
+    lines = text.splitlines()
+    assert text.endswith("\n")
+    for name, kind in (("llm_latency_seconds", "summary"), ("tool_latency_seconds", "summary"),
+                       ("tokens_total", "counter"), ("node_seconds", "gauge")):
+        assert f"# TYPE t_{name} {kind}" in lines
+        assert any(l.startswith(f"# HELP t_{name} ") for l in lines)
+    assert 't_llm_latency_seconds_count{node="arxiv"} 3' in lines
+    assert 't_tool_latency_seconds_count{node="blog",tool="tavily_search"} 1' in lines
+    assert 't_tool_latency_seconds{node="blog",tool="tavily_search",quantile="0.95"} 0.250000' in lines
+    assert 't_tokens_total{node="arxiv",direction="in"} 150' in lines
+    assert 't_node_seconds{node="arxiv"} 12.500000' in lines
+    # no quantiles for a node without LLM calls, and no gauge for a node without a wall time
+    assert not any(l.startswith('t_llm_latency_seconds{node="blog"') for l in lines)
+    assert not any(l.startswith('t_node_seconds{node="blog"') for l in lines)
+    # every sample line is "name{labels} value"
+    for line in lines:
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            float(value)
+            assert name.startswith("t_") and name.endswith("}")
+
+
+def test_write_summary_and_active_collector(workdir, run):
+    summary = run.write_summary(prometheus=True)
+    assert json.loads((workdir / "saved" / "run_metrics.json").read_text())["totals"] == summary["totals"]
+    assert (workdir / "saved" / "run_metrics.prom").read_text().startswith(f"# HELP {metrics.METRICS_PREFIX}_")
+
+    assert metrics_callbacks("arxiv") == []
+    metrics.set_active(run)
+    try:
+        (handler,) = metrics_callbacks("gscholar")
+        assert handler.metrics is run and handler.node == "gscholar"
+        with metrics.timed_tool("gscholar", "serpapi"):
+            pass
+        assert run.summary()["nodes"]["gscholar"]["tool_calls"] == 1
+    finally:
+        metrics.set_active(None)
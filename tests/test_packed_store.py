@@ -0,0 +1,138 @@
+import os
+import json
+
+import pytest
+
+from multi_agent import manage
+from multi_agent.tools import research_tools
+from multi_agent.tools.packed_store import PackedStore, row_key, shard_name, split_row_key
+from multi_agent.tools.result_store import open_store
+
+# 2025-10-01 12:00 and 2025-11-01 12:00 UTC
+OCT, NOV = 1_759_320_000, 1_761_998_400
+
+
+def _entry(title, score, url, source="arxiv"):
+    return {"source": source, "title": title, "authors": ["Jane Doe"], "publish_date": "01-10-2025",
+            "summary": "s", "url": url, "usefulness_score": score, "usefulness_reason": "r"}
+
+
+def _write(save_dir, name, entry, mtime):
+    path = save_dir / name
+    path.write_text(json.dumps(entry), encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def _index(save_dir):
+    with open_store(save_dir) as store:
+        return {f: s for f, s in store._conn.execute("SELECT file, score FROM entries")}
+
+
+@pytest.fixture
+def packed_backend(workdir, monkeypatch):
+    monkeypatch.setattr(research_tools, "STORAGE_BACKEND", "packed")
+    return workdir / "saved"
+
+
+def test_append_groups_rows_by_save_month(tmp_path):
+    packed = PackedStore(tmp_path)
+    a, b = _entry("A", 70, "https://example.org/a"), _entry("B", 80, "https://example.org/b")
+    assert packed.append([("a.json", a, OCT), ("b.json", b, NOV)]) == {"2025-10.jsonl.gz": 1, "2025-11.jsonl.gz": 1}
+    assert packed.append([]) == {}
+
+    records = list(packed.iter_records())
+    assert [(shard, r["name"], r["saved_at"], r["entry"]) for shard, r in records] == [
+        ("2025-10.jsonl.gz", "a.json", OCT, a),
+        ("2025-11.jsonl.gz", "b.json", NOV, b),
+    ]
+    assert packed.manifest()["shards"]["2025-10.jsonl.gz"]["entries"] == 1
+
+
+def test_uncommitted_tail_is_ignored_and_cut_off(tmp_path):
+    packed = PackedStore(tmp_path)
+    packed.append([("a.json", _entry("A", 70, "https://example.org/a"), OCT)])
+    with open(packed.dir / shard_name(OCT), "ab") as f:
+        f.write(b"\x1f\x8b half a gzip member")  # an append that died before the manifest was replaced
+
+    assert [r["name"] for r in packed.read_shard(shard_name(OCT))] == ["a.json"]
+    packed.append([("b.json", _entry("B", 80, "https://example.org/b"), OCT)])
+    assert [r["name"] for r in packed.read_shard(shard_name(OCT))] == ["a.json", "b.json"]
+
+
+def test_manifest_token_changes_on_every_rewrite(tmp_path):
+    packed = PackedStore(tmp_path)
+    assert packed.manifest_token() == ""
+
+    tokens = set()
+    for i in range(5):
+        # back to back, well within one mtime tick on coarse filesystems
+        packed.append([(f"{i}.json", _entry(str(i), 50, f"https://example.org/{i}"), OCT)])
+        tokens.add(packed.manifest_token())
+    assert len(tokens) == 5
+
+    packed.remove(shard_name(OCT), ["0.json"])
+    assert packed.manifest_token() not in tokens
+    token = packed.manifest_token()
+    assert packed.manifest_token() == token
+
+
+def test_single_and_batch_saves_write_the_same_rows(packed_backend):
+    single = research_tools.write_json_entry(_entry("A", 70, "https://arxiv.org/abs/2510.00001"), "a")
+    report = research_tools.write_json_entries(
+        [_entry("B", 80, "https://arxiv.org/abs/2510.00002"), _entry("C", 90, "https://arxiv.org/abs/2510.00003")],
+        ["b", "c"],
+    )
+    assert single.startswith("OK") and not report["duplicates"] and not report["invalid"]
+    assert list(packed_backend.glob("*.json")) == []
+
+    records = [r for _, r in PackedStore(packed_backend).iter_records()]
+    assert [r["name"] for r in records] == ["a.json", "b.json", "c.json"]
+    assert all(set(r) == {"name", "saved_at", "entry"} and isinstance(r["saved_at"], float) for r in records)
+    assert all(r["entry"]["publish_date_iso"] == "2025-10-01" for r in records)
+
+    shard = shard_name(records[0]["saved_at"])
+    assert row_key(shard, "a.json") in single
+    assert report["saved"] == [os.path.join(research_tools.SAVE_DIR, row_key(shard, n)) for n in ("b.json", "c.json")]
+
+    # packed rows are indexed, queried and deduplicated like files
+    assert _index(packed_backend) == {row_key(shard, "a.json"): 70, row_key(shard, "b.json"): 80, row_key(shard, "c.json"): 90}
+    with open_store(packed_backend) as store:
+        assert [e["title"] for e, _ in store.query()] == ["C", "B", "A"]
+        assert store.has_name("b.json")
+    again = research_tools.write_json_entry(_entry("A", 70, "https://arxiv.org/pdf/2510.00001v2"), "a2")
+    assert again.startswith("ERROR") and "already saved" in again
+
+
+def test_manage_pack_unpack_round_trip(workdir, capsys):
+    saved = workdir / "saved"
+    entries = {
+        "a.json": (_entry("A", 70, "https://example.org/a"), OCT),
+        "b.json": (_entry("B", 80, "https://example.org/b"), OCT + 60),
+        "c.json": (_entry("C", 90, "https://example.org/c", source="spatialedge"), NOV),
+    }
+    for name, (entry, mtime) in entries.items():
+        _write(saved, name, entry, mtime)
+    (saved / "notes.json").write_text('{"not": "an entry"}', encoding="utf-8")
+    assert set(_index(saved)) == set(entries)
+
+    assert manage.main(["pack"]) == 0
+    assert "Packed 3 files into 2 shards." in capsys.readouterr().out
+    assert sorted(p.name for p in saved.glob("*.json")) == ["notes.json"]
+    index = _index(saved)
+    assert {split_row_key(k)[1] for k in index} == set(entries)
+    assert index[row_key("2025-10.jsonl.gz", "b.json")] == 80
+    assert index[row_key("2025-11.jsonl.gz", "c.json")] == 90
+
+    # a file saved under a packed name meanwhile is left alone by both directions
+    _write(saved, "a.json", _entry("A2", 10, "https://example.org/a2"), NOV)
+    assert manage.main(["unpack"]) == 0
+    assert "Kept 1 entries packed" in capsys.readouterr().out
+    (saved / "a.json").unlink()
+    assert manage.main(["unpack"]) == 0
+
+    for name, (entry, mtime) in entries.items():
+        assert json.loads((saved / name).read_text(encoding="utf-8")) == entry
+        assert (saved / name).stat().st_mtime == mtime
+    assert not (saved / "packed" / "manifest.json").exists()
+    assert list((saved / "packed").glob("*.jsonl.gz")) == []
+    assert _index(saved) == {"a.json": 70, "b.json": 80, "c.json": 90}
@@ -0,0 +1,165 @@
+import json
+import sys
+import subprocess
+
+import pytest
+import requests
+import tweepy
+
+from multi_agent.tools import post_queue
+from multi_agent.tools.post_queue import PostQueue, POST_MAX_ATTEMPTS
+from multi_agent.tools.tweet_ledger import TweetLedger
+
+
+def _http_error(cls, status, reason, errors=(), headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.reason = reason
+    response.headers.update(headers or {})
+    response._content = json.dumps({"errors": list(errors)}).encode()
+    return cls(response)
+
+
+class FakeTransport:
+    """tweepy.Client stand-in: `outcomes` are raised (exceptions) or returned in order, one per create_tweet."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.sent = []
+
+    def create_tweet(self, text):
+        self.sent.append(text)
+        outcome = self.outcomes.pop(0) if self.outcomes else {"data": {"id": "1"}}
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def queue(tmp_path):
+    ledger = TweetLedger(tmp_path / "tweets.jsonl", legacy_path=None)
+    q = PostQueue(tmp_path / "post_queue.json", ledger=ledger, clock=lambda: 1000.0)
+    q.enqueue("https://arxiv.org/abs/2508.00001", "first", "test")
+    q.enqueue("https://arxiv.org/abs/2508.00002", "second", "test")
+    return q
+
+
+def test_enqueue_rejects_text_over_the_weighted_limit(queue):
+    status, item = queue.enqueue("https://arxiv.org/abs/2508.00003", "点" * 141, "test")
+    assert (status, item["length"]) == ("too_long", 282)
+    assert queue.enqueue("https://arxiv.org/abs/2508.00003", "", "test")[0] == "too_long"
+    assert queue.queued("https://arxiv.org/abs/2508.00003") is None
+
+
+def test_posts_are_sent_and_recorded(queue):
+    transport = FakeTransport()
+    report = queue.drain(transport)
+    assert transport.sent == ["first", "second"]
+    assert [p["url"] for p in report["posted"]] == ["https://arxiv.org/abs/2508.00001", "https://arxiv.org/abs/2508.00002"]
+    assert queue.items() == []
+    assert "arxiv:2508.00001" in queue.ledger.norm_urls()
+
+
+@pytest.mark.parametrize("error", [
+    _http_error(tweepy.errors.Unauthorized, 401, "Unauthorized"),
+    _http_error(tweepy.errors.Forbidden, 403, "Forbidden", [{"code": 453, "message": "You currently have access to a subset of X API"}]),
+])
+def test_auth_errors_stop_the_drain_and_keep_the_post_pending(queue, error):
+    transport = FakeTransport(error)
+    report = queue.drain(transport)
+    assert transport.sent == ["first"]  # the second post is not tried
+    assert [p["url"] for p in report["halted"]] == ["https://arxiv.org/abs/2508.00001"]
+    assert not report["failed"] and not report["posted"]
+    items = queue.items()
+    assert [(it["status"], it["attempts"]) for it in items] == [("pending", 0), ("pending", 0)]
+    assert queue.norm_urls() == {"arxiv:2508.00001", "arxiv:2508.00002"}
+
+
+def test_duplicate_content_counts_as_posted(queue):
+    duplicate = _http_error(tweepy.errors.Forbidden, 403, "Forbidden", [{"code": 187, "message": "Status is a duplicate."}])
+    report = queue.drain(FakeTransport(duplicate))
+    assert report["posted"][0]["duplicate"] is True
+    assert len(report["posted"]) == 2
+
+
+def test_rate_limit_and_transport_errors_are_retried(queue):
+    rate_limited = _http_error(tweepy.errors.TooManyRequests, 429, "Too Many Requests", headers={"x-rate-limit-reset": "5000"})
+    report = queue.drain(FakeTransport(rate_limited))
+    assert report["retrying"][0]["next_attempt_at"] == 5000.0
+    assert len(report["retrying"]) == 1  # a 429 stops the drain
+
+    queue._clock = lambda: 6000.0
+    report = queue.drain(FakeTransport(requests.exceptions.ConnectionError("connection reset")))
+    assert [p["attempts"] for p in report["retrying"]] == [2]
+    assert [p["url"] for p in report["posted"]] == ["https://arxiv.org/abs/2508.00002"]
+
+
+def test_retries_give_up_after_max_attempts(queue):
+    transport = FakeTransport(*[requests.exceptions.Timeout("timed out")] * POST_MAX_ATTEMPTS)
+    for i in range(POST_MAX_ATTEMPTS):
+        queue._clock = lambda i=i: 1000.0 + i * 10 ** 6
+        report = queue.drain(transport, max_posts=1)
+    assert report["failed"][0]["attempts"] == POST_MAX_ATTEMPTS
+
+
+def test_client_errors_halt_instead_of_failing(queue):
+    # what tweepy.Client raises when a credential is None
+    report = queue.drain(FakeTransport(TypeError("Consumer key must be string or bytes, not NoneType")))
+    assert [p["url"] for p in report["halted"]] == ["https://arxiv.org/abs/2508.00001"]
+    assert not report["failed"] and not report["retrying"]
+    assert [(it["status"], it["attempts"]) for it in queue.items()] == [("pending", 0), ("pending", 0)]
+
+
+def test_unexpected_http_errors_are_not_retried(queue):
+    report = queue.drain(FakeTransport(_http_error(tweepy.errors.NotFound, 404, "Not Found")), max_posts=1)
+    assert report["failed"][0]["attempts"] == 1
+    assert not report["retrying"]
+
+
+def test_failed_posts_do_not_block_their_url(queue):
+    bad_request = _http_error(tweepy.errors.BadRequest, 400, "Bad Request")
+    queue.drain(FakeTransport(bad_request), max_posts=1)
+    assert [it["status"] for it in queue.items()] == ["failed", "pending"]
+    assert queue.norm_urls() == {"arxiv:2508.00002"}
+
+    status, item = queue.enqueue("https://arxiv.org/pdf/2508.00001v2", "first, redrafted", "test")
+    assert status == "requeued"
+    assert (item["status"], item["attempts"], item["text"]) == ("pending", 0, "first, redrafted")
+    assert len(queue.items()) == 2
+
+
+@pytest.fixture
+def x_node(queue, monkeypatch):
+    from multi_agent.PostingTeam import X_node
+
+    monkeypatch.setattr(post_queue, "get_post_queue", lambda: queue)
+    monkeypatch.setattr(X_node, "craft_tweet_text", lambda entry_data: pytest.fail("drafted a tweet"))
+    return X_node
+
+
+def test_missing_credentials_stop_before_selecting_or_drafting(x_node, queue, monkeypatch):
+    monkeypatch.setattr(x_node, "env", lambda name, default=None: None if name == "X_ACCESS_TOKEN" else "key")
+    monkeypatch.setattr(x_node, "get_result", lambda: pytest.fail("selected an entry"))
+    before = queue.items()
+    assert x_node.main() == 1
+    assert queue.items() == before
+
+
+def test_queued_entry_is_not_drafted_again(x_node, queue, monkeypatch):
+    monkeypatch.setattr(x_node, "env", lambda name, default=None: "key")
+    monkeypatch.setattr(x_node, "get_result", lambda: {"result": {"url": "https://arxiv.org/pdf/2508.00001v1"}})
+    transport = FakeTransport()
+    monkeypatch.setattr(x_node.posting_tools, "get_x_client", lambda *keys: transport)
+    assert x_node.main() == 0
+    assert transport.sent == ["first", "second"]
+
+
+def test_x_node_import_stays_light(workdir):
+    # fresh interpreter: the modules imported by the other tests must not hide an eager import
+    snippet = (
+        "import sys, multi_agent.PostingTeam.X_node; "
+        "print(' '.join(m for m in ('tweepy', 'requests', 'langchain_core', 'langgraph') if m in sys.modules))"
+    )
+    proc = subprocess.run([sys.executable, "-c", snippet], cwd=workdir, capture_output=True, text=True, check=True)
+    assert proc.stdout.strip() == ""
+    assert list((workdir / "saved").iterdir()) == []
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from multi_agent.tools.scoring_tools import score_candidates
+from multi_agent.utils.prerank import PreRanker, rank, spearman, stem, tokenize
+
+from fakes import FakeLLM
+
+
+FIELD = "Spatio Temporal Point Process, Survey data"
+
+
+def _candidate(title, summary=""):
+    return {"title": title, "summary": summary, "url": f"https://example.org/{abs(hash(title))}"}
+
+
+@pytest.mark.parametrize("token, stemmed", [
+    ("processes", "process"), ("studies", "study"), ("datasets", "dataset"),
+    ("analysis", "analysis"), ("gaussian", "gaussian"), ("bus", "bus"),
+])
+def test_stem_folds_plurals_only(token, stemmed):
+    assert stem(token) == stemmed
+
+
+def test_tokenize_drops_stopwords():
+    assert tokenize("A Survey of the Point Processes") == ["survey", "point", "process"]
+
+
+def test_scores_order_by_topic_coverage():
+    ranker = PreRanker(FIELD)
+    full, half, none = ranker.scores([
+        "A spatio temporal point process for crime",
+        "A temporal model of arrivals with a process prior",
+        "Large language models for code generation",
+    ])
+    assert full == pytest.approx(1.0)
+    assert 0 < half < full
+    assert none == 0.0
+
+
+def test_prefix_and_compound_matching():
+    ranker = PreRanker(FIELD)
+    compound, = ranker.scores(["spatiotemporal point processes"])
+    prefixed, = ranker.scores(["spatial temporally point processing"])
+    assert compound == pytest.approx(1.0)
+    assert prefixed == pytest.approx(1.0)
+
+
+def test_split_applies_the_cut_in_input_order():
+    ranker = PreRanker(FIELD)
+    candidates = [
+        _candidate("Code generation with transformers"),
+        _candidate("Spatio temporal point process models"),
+        _candidate("Survey data imputation"),
+    ]
+    kept, pruned = ranker.split(candidates, cut=0.5)
+    assert [c["title"] for c in kept] == ["Spatio temporal point process models", "Survey data imputation"]
+    assert [c["title"] for c in pruned] == ["Code generation with transformers"]
+
+
+def test_split_keep_top_rescues_the_best_below_the_cut():
+    ranker = PreRanker(FIELD)
+    candidates = [_candidate("Graph networks"), _candidate("A temporal graph model"), _candidate("Protein folding")]
+    kept, pruned = ranker.split(candidates, cut=0.99, keep_top=0.2)  # ceil(3 * 0.2) = 1
+    assert [c["title"] for c in kept] == ["A temporal graph model"]
+    assert len(pruned) == 2
+    assert ranker.split([], cut=0.5) == ([], [])
+
+
+def test_rank_averages_ties_and_spearman():
+    assert list(rank([10, 20, 20, 5])) == [2.0, 3.5, 3.5, 1.0]
+    assert spearman([1, 2, 3], [10, 20, 30]) == pytest.approx(1.0)
+    assert spearman([1, 2, 3], [3, 2, 1]) == pytest.approx(-1.0)
+    assert np.isnan(spearman([1], [1]))
+
+
+def test_prerank_is_off_by_default_and_prunes_when_on(workdir):
+    candidates = [_candidate("Spatio temporal point process"), _candidate("Protein folding")]
+    default = score_candidates(FakeLLM(), candidates, FIELD, use_cache=False)
+    on = score_candidates(FakeLLM(), candidates, FIELD, use_cache=False, prerank=True)
+    assert default["pruned"] == 0 and len(default["entries"]) == 2
+    assert on["pruned"] == 1 and [e["title"] for e in on["entries"]] == ["Spatio temporal point process"]
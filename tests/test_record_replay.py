@@ -0,0 +1,94 @@
+import os
+import json
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from multi_agent.tools import research_tools
+from multi_agent.utils import record_replay
+from multi_agent.utils.record_replay import Recorder, RecordReplayChatModel, ReplayedError, Replayer, ReplayMiss
+
+
+WINDOW = 'all:"a" AND submittedDate: [20250101000000 TO {end}]'
+
+
+def _offline(*args, **kwargs):
+    pytest.fail("a replayed call reached the network")
+
+
+@pytest.fixture
+def fixture_dir(workdir, monkeypatch):
+    """A cassette recorded against fake arXiv / SerpAPI / LLM backends."""
+    saved = workdir / "saved"
+    (saved / "paper.json").write_text('{"url": "https://arxiv.org/abs/2510.00001"}', encoding="utf-8")
+    (saved / "debug.log").write_text("left out of the snapshot", encoding="utf-8")
+
+    def fake_arxiv(query, max_results, ascending=False, use_cache=True):
+        return [{"query": query, "n": max_results}]
+
+    def fake_serpapi(params):
+        if params.get("author_id") == "broken":
+            raise RuntimeError("503 from SerpAPI")
+        return {"author": params["author_id"]}
+
+    monkeypatch.setattr(research_tools, "search_arxiv", fake_arxiv)
+    monkeypatch.setattr(research_tools, "_serpapi_search", fake_serpapi)
+    llm = RecordReplayChatModel(model_name="m", inner_factory=lambda name, t: FakeListChatModel(responses=["first", "second"]))
+
+    path = workdir / "fixture"
+    with Recorder(path):
+        assert record_replay.get_active() is not None
+        research_tools.search_arxiv(WINDOW.format(end="20251017090000"), 10)
+        research_tools._serpapi_search({"author_id": "x1", "api_key": "secret"})
+        with pytest.raises(RuntimeError):
+            research_tools._serpapi_search({"author_id": "broken", "api_key": "secret"})
+        assert llm.invoke("hello").content == "first"
+        assert llm.invoke("again").content == "second"
+    assert record_replay.get_active() is None
+    assert research_tools.search_arxiv is fake_arxiv  # patches removed on exit
+
+    monkeypatch.setattr(research_tools, "search_arxiv", _offline)
+    monkeypatch.setattr(research_tools, "_serpapi_search", _offline)
+    return path
+
+
+def test_recording_writes_cassette_snapshot_and_meta(fixture_dir):
+    rows = [json.loads(line) for line in (fixture_dir / "cassette.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert [r["endpoint"] for r in rows] == ["arxiv", "serpapi", "serpapi", "llm", "llm"]
+    assert rows[0]["request"][0] == WINDOW.format(end="<stamp>").replace("20250101000000", "<stamp>")
+    assert "api_key" not in rows[1]["request"]
+    assert rows[2]["error"] == "RuntimeError: 503 from SerpAPI"
+    assert all(r["seconds"] >= 0 for r in rows)
+
+    assert json.loads((fixture_dir / "meta.json").read_text())["calls"] == {"arxiv": 1, "serpapi": 2, "llm": 2}
+    assert sorted(p.name for p in (fixture_dir / "saved").iterdir()) == ["paper.json"]
+
+
+def test_replay_serves_recordings_offline(fixture_dir, monkeypatch):
+    monkeypatch.delenv("SERP_API_KEY", raising=False)
+    llm = RecordReplayChatModel(model_name="m", inner_factory=_offline)
+    with Replayer(fixture_dir, latency=0) as replay:
+        assert os.environ["SERP_API_KEY"] == "replay"
+        # the "until now" bound differs from the recorded one and still matches
+        assert research_tools.search_arxiv(WINDOW.format(end="20261231235959"), 10) == [
+            {"query": WINDOW.format(end="20251017090000"), "n": 10}
+        ]
+        assert research_tools._serpapi_search({"author_id": "x1", "api_key": "other"}) == {"author": "x1"}
+        with pytest.raises(ReplayedError, match="503 from SerpAPI"):
+            research_tools._serpapi_search({"author_id": "broken", "api_key": "other"})
+        # matched on the messages, not on the call order
+        assert llm.invoke("again").content == "second"
+        # an unknown prompt gets the endpoint's next unused recording
+        assert llm.invoke("something else").content == "first"
+        with pytest.raises(ReplayMiss):
+            llm.invoke("one too many")
+    assert "SERP_API_KEY" not in os.environ
+    assert dict(replay.stats["llm"]) == {"served": 2, "fallbacks": 1, "misses": 1}
+
+
+def test_strict_replay_and_one_harness_at_a_time(fixture_dir):
+    with Replayer(fixture_dir, latency=0, strict=True):
+        with pytest.raises(ReplayMiss):
+            research_tools.search_arxiv('all:"b"', 10)
+        with pytest.raises(RuntimeError, match="already active"):
+            Replayer(fixture_dir).__enter__()
@@ -0,0 +1,65 @@
+import json
+import os
+
+from multi_agent.tools.result_store import ResultStore, open_store
+
+
+def _entry(title, score, url, date="01-10-2025", source="arxiv"):
+    return {"source": source, "title": title, "authors": ["Jane Doe"], "publish_date": date,
+            "summary": "s", "url": url, "usefulness_score": score, "usefulness_reason": "r"}
+
+
+def _write(save_dir, name, entry, mtime=None):
+    path = save_dir / name
+    path.write_text(json.dumps(entry), encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def _titles(store, **query):
+    return [e["title"] for e, _ in store.query(**query)]
+
+
+def test_query_orders_by_score_then_date(tmp_path):
+    _write(tmp_path, "a.json", _entry("A", 70, "https://arxiv.org/abs/2501.00001"))
+    _write(tmp_path, "b.json", _entry("B", 90, "https://arxiv.org/abs/2501.00002", date="01-01-2025"))
+    _write(tmp_path, "c.json", _entry("C", 90, "https://arxiv.org/abs/2501.00003", date="01-06-2025"))
+    _write(tmp_path, "d.json", _entry("D", 95, "https://example.org/d", source="spatialedge"))
+    with open_store(tmp_path) as store:
+        assert _titles(store) == ["D", "C", "B", "A"]
+        assert _titles(store, origin="arxiv", min_score=80, min_date="2025-03-01") == ["C"]
+        assert store.origins() == ["arxiv", "blog"]
+
+
+def test_sync_picks_up_files_edited_in_place(tmp_path):
+    _write(tmp_path, "a.json", _entry("A", 70, "https://arxiv.org/abs/2501.00001"), mtime=1_000_000)
+    _write(tmp_path, "b.json", _entry("B", 80, "https://arxiv.org/abs/2501.00002"), mtime=1_000_000)
+    with open_store(tmp_path) as store:
+        assert _titles(store) == ["B", "A"]
+
+    dir_mtime = tmp_path.stat().st_mtime_ns
+    _write(tmp_path, "a.json", _entry("A", 99, "https://arxiv.org/abs/2501.00001"), mtime=2_000_000)
+    assert tmp_path.stat().st_mtime_ns == dir_mtime  # an in-place rewrite leaves the directory alone
+
+    with open_store(tmp_path) as store:
+        assert _titles(store) == ["A", "B"]
+        assert [e["usefulness_score"] for e, _ in store.query()] == [99, 80]
+
+
+def test_sync_counts_added_updated_removed(tmp_path):
+    _write(tmp_path, "a.json", _entry("A", 70, "https://arxiv.org/abs/2501.00001"), mtime=1_000_000)
+    _write(tmp_path, "b.json", _entry("B", 80, "https://arxiv.org/abs/2501.00002"))
+    with ResultStore(tmp_path) as store:
+        assert store.sync() == {"added": 2, "updated": 0, "removed": 0}
+        assert store.sync() == {"added": 0, "updated": 0, "removed": 0}
+        _write(tmp_path, "a.json", _entry("A", 75, "https://arxiv.org/abs/2501.00001"), mtime=2_000_000)
+        (tmp_path / "b.json").unlink()
+        assert store.sync() == {"added": 0, "updated": 1, "removed": 1}
+        assert store.count() == 1
+
+
+def test_find_duplicate_matches_url_variants(tmp_path):
+    _write(tmp_path, "a.json", _entry("A paper on point processes", 70, "https://arxiv.org/abs/2501.00001v1"))
+    with open_store(tmp_path) as store:
+        assert store.find_duplicate({"url": "https://arxiv.org/pdf/2501.00001v3.pdf"}) == ("a.json", "url")
+        assert store.find_duplicate({"url": "https://arxiv.org/abs/2501.00002"}) is None
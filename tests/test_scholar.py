@@ -0,0 +1,77 @@
+import time
+import threading
+
+from multi_agent.tools import research_tools
+from multi_agent.tools.research_tools import fetch_scholar_papers
+
+
+ARTICLES = {
+    "author-a": ["cit-1", "cit-2", "cit-3"],
+    "author-b": ["cit-3", "cit-4", "cit-5"],
+}
+
+
+class StubSerpAPI:
+    """Answers author-list and view_citation requests like SerpAPI; records every call."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+        self.times = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, params):
+        with self._lock:
+            self.calls.append(params.get("citation_id") or params["author_id"])
+            self.times.append(time.monotonic())
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            if params.get("view_op") == "view_citation":
+                c = params["citation_id"]
+                return {"citation": {"description": f"abstract {c}", "publication_date": "2025/10/1",
+                                     "link": f"https://scholar.example/{c}"}}
+            return {"articles": [
+                {"title": f"Paper {c}", "authors": "A, B", "citation_id": c} for c in ARTICLES[params["author_id"]]
+            ]}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def test_warm_citation_cache_makes_only_author_calls(tmp_path, monkeypatch):
+    stub = StubSerpAPI()
+    monkeypatch.setattr(research_tools, "_serpapi_search", stub)
+    cache_file = tmp_path / "scholar_citations.sqlite"
+
+    first = fetch_scholar_papers(list(ARTICLES), 3, "key", requests_per_second=0, cache_file=cache_file)
+    assert sorted(stub.calls) == ["author-a", "author-b", "cit-1", "cit-2", "cit-3", "cit-4", "cit-5"]
+
+    stub.calls.clear()
+    second = fetch_scholar_papers(list(ARTICLES), 3, "key", requests_per_second=0, cache_file=cache_file)
+    assert sorted(stub.calls) == ["author-a", "author-b"]
+    assert second == first
+    assert len(second) == 6 and all("error" not in p for p in second)
+
+
+def test_pool_bounds_calls_in_flight(tmp_path, monkeypatch):
+    stub = StubSerpAPI(delay=0.05)
+    monkeypatch.setattr(research_tools, "_serpapi_search", stub)
+
+    fetch_scholar_papers(list(ARTICLES), 3, "key", max_workers=2, requests_per_second=0, cache_file=None)
+    assert len(stub.calls) == 7
+    assert stub.max_in_flight == 2
+
+
+def test_rate_limiter_spaces_calls(tmp_path, monkeypatch):
+    stub = StubSerpAPI()
+    monkeypatch.setattr(research_tools, "_serpapi_search", stub)
+
+    fetch_scholar_papers(list(ARTICLES), 3, "key", max_workers=4, requests_per_second=20, cache_file=None)
+    times = sorted(stub.times)
+    assert len(times) == 7
+    # 20 requests/s: each call starts at least 50 ms after the previous one, whatever the pool size
+    assert min(b - a for a, b in zip(times, times[1:])) >= 0.045
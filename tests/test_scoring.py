@@ -0,0 +1,112 @@
+import threading
+from functools import partial
+
+import pytest
+
+from multi_agent.tools.research_tools import _sanitize_filename
+from multi_agent.tools.scoring_tools import blog_file_name, paper_file_name, score_and_save, score_candidates
+
+from fakes import FakeLLM
+
+
+FIELD = "Spatio Temporal Point Process, Point Process"
+
+
+def _paper(i, **extra):
+    return {
+        "source": "arxiv",
+        "title": f"Spatio temporal point process number {i}",
+        "authors": ["Jane Doe"],
+        "publish_date": "01-10-2025",
+        "summary": "A point process model.",
+        "url": f"https://arxiv.org/abs/2510.{i:05d}",
+        **extra,
+    }
+
+
+def test_llm_calls_scale_with_batches(workdir):
+    llm = FakeLLM()
+    out = score_candidates(llm, [_paper(i) for i in range(23)], FIELD, batch_size=10, use_cache=False, prerank=False)
+
+    assert llm.calls == out["llm_calls"] == 3
+    assert llm.batch_sizes == [10, 10, 3]
+    assert len(out["entries"]) == 23 and out["unscored"] == 0
+    assert all(e["usefulness_score"] == 90 and e["summary"] == "fake summary" for e in out["entries"])
+
+
+def test_score_cache_skips_the_llm_on_repeat(workdir):
+    papers = [_paper(i) for i in range(12)]
+    first, second = FakeLLM(), FakeLLM()
+    score_candidates(first, papers, FIELD, batch_size=5, use_cache=True, prerank=False)
+    out = score_candidates(second, papers, FIELD, batch_size=5, use_cache=True, prerank=False)
+
+    assert first.calls == 3
+    assert second.calls == 0 and out["cache_hits"] == 12
+
+
+def test_score_and_save_writes_every_entry(workdir):
+    papers = [_paper(i, title=t) for i, t in enumerate([
+        "Deep point processes", "A completely different paper", "GPT-4.5 for spatial data", "GPT-4.5 for temporal data",
+    ])]
+    for p in papers:
+        p["authors"] = ["John A. Smith"]
+    llm = FakeLLM()
+    score_and_save(llm, papers, FIELD, 60, paper_file_name, batch_size=10, node="arxiv")
+
+    assert llm.calls == 1
+    assert len(list((workdir / "saved").glob("*.json"))) == 4
+
+
+def test_file_names_keep_the_whole_title():
+    a = paper_file_name({"authors": ["John A. Smith"], "publish_date": "01-02-2025", "title": "Deep point processes"})
+    b = paper_file_name({"authors": ["John A. Smith"], "publish_date": "01-02-2025", "title": "A completely different paper"})
+    c = paper_file_name({"authors": ["Jane Doe"], "publish_date": "01-02-2025", "title": "GPT-4.5 for spatial data"})
+    d = paper_file_name({"authors": ["Jane Doe"], "publish_date": "01-02-2025", "title": "GPT-4.5 for temporal data"})
+
+    names = [_sanitize_filename(n) for n in (a, b, c, d)]
+    assert names == [a, b, c, d]
+    assert len(set(names)) == 4
+    assert a == "John_A_Smith_2025_Deep_point_processes"
+    assert _sanitize_filename(blog_file_name({"source": "medium", "title": "Intro to v2.0 of X"})) == "medium_Intro_to_v2_0_of_X"
+
+
+class _GatedLLM(FakeLLM):
+    """FakeLLM whose scoring calls block until `gate` is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+
+    def with_structured_output(self, schema):
+        scorer = super().with_structured_output(schema)
+        invoke = scorer.invoke
+
+        def gated(messages, config=None):
+            self.gate.wait(5)
+            return invoke(messages, config)
+
+        scorer.invoke = gated
+        return scorer
+
+
+def test_timed_out_node_stops_before_the_next_batch_and_saves_nothing(workdir):
+    from multi_agent import main
+
+    llm = _GatedLLM()
+    run = partial(score_and_save, llm, [_paper(i) for i in range(15)], FIELD, 60, paper_file_name, batch_size=5)
+    with pytest.raises(main.NodeTimeout):
+        main._run_with_timeout("arxiv", run, 0.05)
+
+    # the abandoned worker finishes its current batch, then stops
+    llm.gate.set()
+    worker = next(t for t in threading.enumerate() if t.name == "arxiv-node")
+    worker.join(5)
+    assert not worker.is_alive()
+    assert llm.calls == 1
+    assert list((workdir / "saved").glob("*.json")) == []
+
+    # without a timeout the same work runs to the end; the batch scored before the cancel comes from the cache
+    llm = FakeLLM()
+    assert main._run_with_timeout("arxiv", partial(score_and_save, llm, [_paper(i) for i in range(15)], FIELD, 60,
+                                                   paper_file_name, batch_size=5), None)
+    assert llm.calls == 2 and len(list((workdir / "saved").glob("*.json"))) == 15
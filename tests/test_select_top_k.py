@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from multi_agent.tools import posting_tools
+from multi_agent.tools.posting_tools import save_tweet, select_top_k
+
+
+def _save(saved, i, score, date):
+    entry = {"source": "arxiv", "title": f"Paper {i}", "authors": ["Jane Doe"], "publish_date": date,
+             "summary": "s", "url": f"https://arxiv.org/abs/2510.{i:05d}", "usefulness_reason": "r"}
+    if score is not None:
+        entry["usefulness_score"] = score
+    (saved / f"paper_{i}.json").write_text(json.dumps(entry), encoding="utf-8")
+
+
+def _titles(payload):
+    return [e["title"] for e in payload["results"]]
+
+
+@pytest.fixture
+def saved(workdir):
+    saved = workdir / "saved"
+    # (score, date): scores tie on 90 so the newer date has to win among them
+    for i, (score, date) in enumerate([
+        (70, "01-09-2025"), (90, "01-03-2025"), (95, "unknown"), (90, "01-06-2025"),
+        (60, "15-10-2025"), (85, "01-10-2025"),
+    ]):
+        _save(saved, i, score, date)
+    return saved
+
+
+@pytest.mark.parametrize("k", [1, 2, 3, 6, 10])
+def test_score_mode_stops_after_k_entries(saved, k):
+    payload = select_top_k("arxiv", mode="score", k=k)
+    expected = ["Paper 2", "Paper 3", "Paper 1", "Paper 5", "Paper 0", "Paper 4"][:k]
+    assert _titles(payload) == expected
+    # the index yields entries in score order, so the scan ends once k are in hand
+    assert payload["meta"]["considered"] == min(k, 6)
+    assert payload["meta"]["selection_mode"] == "score"
+
+
+@pytest.mark.parametrize("k", [1, 3])
+def test_date_mode_scans_everything_and_orders_by_date(saved, k):
+    payload = select_top_k("arxiv", mode="date", k=k)
+    assert _titles(payload) == ["Paper 4", "Paper 5", "Paper 0"][:k]
+    assert payload["meta"]["considered"] == 6
+    assert payload["meta"]["selection_mode"] == "date"
+
+
+def test_fallbacks_use_the_second_heap(workdir):
+    saved = workdir / "saved"
+    # no valid score anywhere: score mode falls back to the newest entries
+    _save(saved, 0, None, "01-01-2025")
+    _save(saved, 1, None, "01-05-2025")
+    _save(saved, 2, "high", "unknown")
+    payload = select_top_k("arxiv", mode="score", k=2)
+    assert _titles(payload) == ["Paper 1", "Paper 0"]
+    assert payload["meta"]["selection_mode"] == "date_fallback"
+    assert payload["meta"]["considered"] == 3
+
+    # no date anywhere: date mode falls back to the best scores
+    for p in saved.glob("*.json"):
+        p.unlink()
+    _save(saved, 3, 50, "unknown")
+    _save(saved, 4, 80, "n/a")
+    payload = select_top_k("arxiv", mode="date", k=1)
+    assert _titles(payload) == ["Paper 4"]
+    assert payload["meta"]["selection_mode"] == "score_fallback"
+
+
+def test_filters_and_already_tweeted_entries(saved):
+    save_tweet("https://arxiv.org/pdf/2510.00002v3", "posted before")
+    payload = select_top_k("arxiv", min_usefulness_score=80, date="01-05-2025", mode="score", k=5)
+    assert _titles(payload) == ["Paper 3", "Paper 5"]
+    assert payload["meta"]["already_tweeted_excluded"] == 0  # Paper 2 is undated, filtered before
+
+    payload = select_top_k("arxiv", mode="score", k=1)
+    assert _titles(payload) == ["Paper 3"]
+    assert payload["meta"]["already_tweeted_excluded"] == 1
+
+    assert select_top_k("blog", k=3)["meta"]["selection_mode"] == "none"
+
+
+def test_matches_a_full_sort(saved):
+    for i in range(6, 40):
+        _save(saved, i, (i * 37) % 101, f"{1 + i % 28:02d}-{1 + i % 12:02d}-2025")
+    items = list(posting_tools.iter_eligible_items("all"))
+    for mode, key in (("score", posting_tools._score_key), ("date", posting_tools._date_key)):
+        expected = [e["title"] for e in sorted(items, key=key, reverse=True)[:7]]
+        assert _titles(select_top_k("all", mode=mode, k=7)) == expected
@@ -0,0 +1,127 @@
+import os
+import json
+import threading
+
+from multi_agent import manage
+from multi_agent.tools.tweet_ledger import TweetLedger
+from multi_agent.utils.identity import canonical_url
+
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def _write_legacy(path, urls):
+    path.write_text(json.dumps({"tweets": [{"url": u, "posting_reason": "old"} for u in urls]}), encoding="utf-8")
+
+
+def test_record_appends_one_line_and_rejects_url_variants(tmp_path):
+    ledger = TweetLedger(tmp_path / "tweets.jsonl", legacy_path=None)
+
+    status, rec = ledger.record("https://arxiv.org/abs/2508.00001", "first")
+    assert status == "saved" and rec["norm_url"] == "arxiv:2508.00001"
+    status, rec = ledger.record("https://arxiv.org/pdf/2508.00001v2", "again")
+    assert status == "duplicate" and rec["posting_reason"] == "first"
+    ledger.record("https://example.com/post", "second")
+
+    assert [r["posting_reason"] for r in _lines(ledger.path)] == ["first", "second"]
+    assert len(ledger) == 2
+    assert "https://arxiv.org/abs/2508.00001v1" in ledger
+
+
+def test_reopened_ledger_sees_records_and_appends_from_other_writers(tmp_path):
+    path = tmp_path / "tweets.jsonl"
+    TweetLedger(path, legacy_path=None).record("https://example.com/a", "a")
+
+    reader = TweetLedger(path, legacy_path=None)
+    assert reader.norm_urls() == {canonical_url("https://example.com/a")}
+
+    TweetLedger(path, legacy_path=None).record("https://example.com/b", "b")
+    assert len(reader) == 2
+
+    # a line still being written is picked up once its newline lands
+    with open(path, "ab") as f:
+        f.write(b'{"url": "https://example.com/c", "posting_reason": "c"')
+    assert len(reader) == 2
+    with open(path, "ab") as f:
+        f.write(b"}\n")
+    assert reader.get("https://example.com/c")["posting_reason"] == "c"
+
+
+def test_truncated_or_replaced_file_is_read_again(tmp_path):
+    path = tmp_path / "tweets.jsonl"
+    ledger = TweetLedger(path, legacy_path=None)
+    for name in "abc":
+        ledger.record(f"https://example.com/{name}", name)
+    assert len(ledger) == 3
+
+    # truncated in place (same inode, smaller than the offset read so far)
+    path.write_text(json.dumps({"url": "https://example.com/z", "posting_reason": "z"}) + "\n", encoding="utf-8")
+    assert ledger.norm_urls() == {canonical_url("https://example.com/z")}
+
+    # rotated: a new file moved over the old one (new inode)
+    rotated = tmp_path / "tweets.jsonl.new"
+    rotated.write_text("".join(
+        json.dumps({"url": f"https://example.com/{n}", "posting_reason": n}) + "\n" for n in ("x", "y")
+    ), encoding="utf-8")
+    os.replace(rotated, path)
+    assert ledger.norm_urls() == {canonical_url("https://example.com/x"), canonical_url("https://example.com/y")}
+
+    path.unlink()
+    assert len(ledger) == 0
+    assert ledger.record("https://example.com/x", "after")[0] == "saved"
+
+
+def test_concurrent_records_write_each_url_once(tmp_path):
+    ledger = TweetLedger(tmp_path / "tweets.jsonl", legacy_path=None)
+    urls = [f"https://arxiv.org/abs/2508.{i:05d}" for i in range(20)]
+    statuses = []
+    barrier = threading.Barrier(8)
+
+    def worker(version):
+        barrier.wait()
+        for u in urls:
+            statuses.append(ledger.record(f"{u}v{version}", f"thread {version}")[0])
+
+    threads = [threading.Thread(target=worker, args=(v,)) for v in range(1, 9)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert statuses.count("saved") == len(urls)
+    assert sorted(r["norm_url"] for r in _lines(ledger.path)) == sorted(f"arxiv:{u[-10:]}" for u in urls)
+
+
+def test_legacy_file_is_imported_once_and_left_in_place(tmp_path):
+    legacy = tmp_path / "tweets.json"
+    _write_legacy(legacy, ["https://arxiv.org/pdf/2508.00001v1", "https://example.com/a"])
+    before = legacy.read_bytes()
+
+    ledger = TweetLedger(tmp_path / "tweets.jsonl", legacy_path=legacy)
+    assert ledger.norm_urls() == {"arxiv:2508.00001", canonical_url("https://example.com/a")}
+    assert legacy.read_bytes() == before
+
+    # the ledger exists now: later edits of the legacy file are ignored
+    _write_legacy(legacy, ["https://example.com/late"])
+    assert "https://example.com/late" not in TweetLedger(tmp_path / "tweets.jsonl", legacy_path=legacy)
+
+    # an empty legacy file still leaves a ledger behind
+    _write_legacy(legacy, [])
+    assert len(TweetLedger(tmp_path / "empty.jsonl", legacy_path=legacy)) == 0
+    assert (tmp_path / "empty.jsonl").exists()
+
+
+def test_manage_migrate_tweets_imports_missing_items(workdir, capsys):
+    saved = workdir / "saved"
+    TweetLedger(saved / "tweets.jsonl", legacy_path=None).record("https://example.com/a", "new")
+    _write_legacy(saved / "tweets.json", ["https://example.com/a", "https://example.com/b"])
+
+    assert manage.main(["migrate-tweets"]) == 0
+    assert "Imported 1 items" in capsys.readouterr().out
+    assert [r["url"] for r in _lines(saved / "tweets.jsonl")] == ["https://example.com/a", "https://example.com/b"]
+    assert (saved / "tweets.json").exists()
+
+    assert manage.main(["migrate-tweets", "--remove"]) == 0
+    assert "Imported 0 items" in capsys.readouterr().out
+    assert not (saved / "tweets.json").exists()
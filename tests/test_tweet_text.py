@@ -0,0 +1,59 @@
+import pytest
+
+from multi_agent.tools.tweet_text import TWEET_MAX_WEIGHT, URL_WEIGHT, compact_tweet, fits, truncate_tweet, tweet_length
+
+
+LONG_URL = "https://arxiv.org/abs/2508.15665v2?utm_source=a-very-long-tracking-parameter-value"
+
+
+@pytest.mark.parametrize("url", ["https://x.co", LONG_URL, "http://example.org/a/b/c/d/e/f/g/h", "www.example.org/p"])
+def test_any_url_counts_as_23(url):
+    assert URL_WEIGHT == 23
+    assert tweet_length(url) == URL_WEIGHT
+    assert tweet_length(f"See {url} now") == len("See ") + URL_WEIGHT + len(" now")
+
+
+@pytest.mark.parametrize("text, weight", [
+    ("abc", 3),
+    ("café", 4),                # Latin-1 range weighs 1
+    ("点过程", 6),               # CJK weighs 2
+    ("🙂", 2),                   # emoji weighs 2
+    ("“quoted” — dash", 15),    # quotes and dashes (U+2010-201F) weigh 1
+])
+def test_character_weights(text, weight):
+    assert tweet_length(text) == weight
+
+
+def test_fits_is_inclusive_and_rejects_empty():
+    assert fits("a" * TWEET_MAX_WEIGHT)
+    assert not fits("a" * (TWEET_MAX_WEIGHT + 1))
+    assert not fits("点" * (TWEET_MAX_WEIGHT // 2 + 1))
+    assert not fits("")
+
+
+def test_compact_unwraps_markdown_links_and_keeps_one_hashtag():
+    url = "https://arxiv.org/abs/1706.03762"
+    text = f'"Transformers\n replace recurrence #NLP. [{url}]({url}) {url} #MachineLearning"'
+    assert compact_tweet(text) == f"Transformers replace recurrence. {url} #MachineLearning"
+
+
+PROSE = "Spatio temporal point processes with neural intensities and survey covariates "
+
+
+@pytest.mark.parametrize("text", [
+    PROSE * 10 + LONG_URL + " #PointProcess",
+    "点过程 " * 200 + LONG_URL + " #点过程",
+    "🙂 " * 300 + "https://x.co",
+    "[" + LONG_URL + "](" + LONG_URL + ") " + PROSE * 8 + " #A #B #C",
+])
+def test_compact_and_truncate_never_exceed_280(text):
+    short = truncate_tweet(compact_tweet(text))
+    assert short is not None
+    assert tweet_length(short) <= TWEET_MAX_WEIGHT
+    assert short.endswith(("#PointProcess", "#点过程", "https://x.co", "#C"))
+    assert ("…" in short) == (tweet_length(compact_tweet(text)) > TWEET_MAX_WEIGHT)
+
+
+def test_truncate_keeps_fitting_text_and_gives_up_when_the_tail_alone_is_too_long():
+    assert truncate_tweet("Short tweet https://x.co #A") == "Short tweet https://x.co #A"
+    assert truncate_tweet("words " + " ".join(f"https://x.co/{i}" for i in range(13))) is None